@@ -0,0 +1,94 @@
+"""
+Construction and serialization benchmark for the CRM models.
+
+Times the operations that dominate bulk loads and exports of entities and
+relations:
+
+    python benchmarks/bench_models.py --count 1000000
+"""
+
+import argparse
+import gc
+import time
+from collections.abc import Callable
+from uuid import uuid4
+
+from collie.models.base import CRMRelation
+from collie.models.generated.e_classes import EE21_Person, EE22_HumanMadeObject
+from collie.models.registry import parse_entities
+
+
+def timed(label: str, count: int, func: Callable[[], object]) -> object:
+    """Run ``func`` once and print its total and per-item time."""
+    gc.collect()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed:8.2f} s {elapsed / count * 1e6:8.2f} us/item")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--count", type=int, default=1_000_000, help="Number of entities"
+    )
+    args = parser.parse_args()
+    count = args.count
+    half = count // 2
+
+    print(f"{count} entities, {count} relations")
+    ids = [uuid4() for _ in range(count)]
+
+    def construct():
+        return [
+            EE22_HumanMadeObject(
+                id=ids[i],
+                label=f"Object {i}",
+                type=["E55:Vessel"],
+                produced_by=ids[i - 1],
+            )
+            for i in range(half)
+        ] + [EE21_Person(id=ids[i], label=f"Person {i}") for i in range(half, count)]
+
+    entities = timed("construct entities (kwargs)", count, construct)
+    relations = timed(
+        "construct relations (kwargs)",
+        count,
+        lambda: [
+            CRMRelation(src=ids[i], type="P108", tgt=ids[i - 1]) for i in range(count)
+        ],
+    )
+    records = timed(
+        "model_dump(mode='json') entities",
+        count,
+        lambda: [entity.model_dump(mode="json") for entity in entities],
+    )
+    relation_records = timed(
+        "model_dump(mode='json') relations",
+        count,
+        lambda: [relation.model_dump(mode="json") for relation in relations],
+    )
+    timed(
+        "model_dump_json entities",
+        count,
+        lambda: [entity.model_dump_json() for entity in entities],
+    )
+    timed(
+        "model_validate entities",
+        count,
+        lambda: [
+            type(entity).model_validate(record)
+            for entity, record in zip(entities, records, strict=True)
+        ],
+    )
+    timed("parse_entities (batched)", count, lambda: parse_entities(records))
+    timed(
+        "model_validate relations",
+        count,
+        lambda: [CRMRelation.model_validate(record) for record in relation_records],
+    )
+
+
+if __name__ == "__main__":
+    main()
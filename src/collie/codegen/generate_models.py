@@ -63,7 +63,10 @@ def generate_class_model(
         shortcut["property"]
         alias_field = shortcut["alias_field"]
         field_type = shortcut.get("field_type", "UUID")
-        shortcut_fields.append(f"    {alias_field}: Optional[{field_type}] = None")
+        if field_type == "UUID":
+            # Entity references also accept legacy string identifiers
+            field_type = "EntityRef"
+        shortcut_fields.append(f"    {alias_field}: {field_type} | None = None")
 
     shortcut_fields_str = "\n".join(shortcut_fields) if shortcut_fields else "    pass"
 
@@ -79,11 +82,12 @@ def generate_class_model(
 
 {shortcut_fields_str}
 
-    class Config:
-        json_schema_extra = {{
+    model_config = ConfigDict(
+        json_schema_extra={{
             "description": "{label}",
             "canonical_fields": {canonical_fields}
         }}
+    )
 """
 
 
@@ -97,10 +101,10 @@ Auto-generated CIDOC CRM E-class models.
 Generated from YAML specifications in codegen/specs/
 """
 
-from typing import Optional, List
-from uuid import UUID
-from pydantic import BaseModel, Field
-from ..base import CRMEntity
+from pydantic import ConfigDict
+
+from collie.models.base import CRMEntity
+from collie.models.ids import EntityRef
 
 
 '''
@@ -5,7 +5,30 @@ This module provides PydanticAI-powered extraction of CRM entities and relations
 from unstructured text, supporting biographical, historical, and cultural content.
 """
 
+from .backends import (
+    AgentBackend,
+    CascadeBackend,
+    ExtractionBackend,
+    HedgedBackend,
+    PoolBackend,
+    PoolMember,
+    RecordingBackend,
+    ReplayBackend,
+    StubBackend,
+)
+from .budget import BudgetScheduler
+from .cache import ExtractionCache
+from .chunking import TextChunk, split_into_chunks, split_paragraphs
 from .extractor import InformationExtractor
+from .incremental import DocumentManifest, SegmentRecord
+from .jobs import ExtractionJob, JobManifest
+from .lenient import LenientCIDOCExtractionResult, RejectedItem, parse_lenient
+from .linking import EntityLinkingIndex
+from .mapreduce import EntityRoster
+from .merging import ResultMerger, merge_results
+from .offsets import AnchorResolver
+from .prefilter import SegmentPrefilter, load_gazetteer
+from .usage import Usage, track_usage
 from .models import (
     ExtractedEntity,
     ExtractedRelationship,
@@ -19,6 +42,17 @@ from .models import (
 
 __all__ = [
     "InformationExtractor",
+    "BudgetScheduler",
+    "ExtractionCache",
+    "ExtractionBackend",
+    "AgentBackend",
+    "CascadeBackend",
+    "HedgedBackend",
+    "PoolBackend",
+    "PoolMember",
+    "RecordingBackend",
+    "ReplayBackend",
+    "StubBackend",
     "ExtractedEntity",
     "ExtractedRelationship", 
     "ExtractionResult",
@@ -27,4 +61,23 @@ __all__ = [
     "PlaceExtraction",
     "ObjectExtraction",
     "TimeExtraction",
+    "TextChunk",
+    "split_into_chunks",
+    "split_paragraphs",
+    "DocumentManifest",
+    "ExtractionJob",
+    "JobManifest",
+    "SegmentRecord",
+    "LenientCIDOCExtractionResult",
+    "RejectedItem",
+    "parse_lenient",
+    "EntityLinkingIndex",
+    "EntityRoster",
+    "ResultMerger",
+    "merge_results",
+    "AnchorResolver",
+    "SegmentPrefilter",
+    "load_gazetteer",
+    "Usage",
+    "track_usage",
 ]
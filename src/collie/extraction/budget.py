@@ -0,0 +1,245 @@
+"""
+Budget-aware scheduling of corpus extraction.
+
+A BudgetScheduler predicts the tokens a corpus will consume, orders the
+documents by estimated value and extracts them until a token or time budget
+is spent, so a capped run covers the most valuable documents first. Token
+predictions start from character counts and are corrected by the usage the
+model actually reports as documents complete.
+"""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .extractor import InformationExtractor
+from .models import ExtractionResult
+from .packing import estimate_tokens
+from .prefilter import SegmentPrefilter
+from .throttling import RetryPolicy, TokenBucket
+from .usage import Usage, track_usage
+
+# Output tokens per input token assumed until real usage has been observed
+DEFAULT_OUTPUT_RATIO = 0.5
+
+PRIORITIES = ("score", "density", "length", "input")
+
+
+class BudgetScheduler:
+    """
+    Extract the highest-value documents of a corpus within a budget.
+
+    Documents are ranked by ``priority``:
+
+    - ``"score"``: pre-filter entity score, highest first
+    - ``"density"``: pre-filter score per estimated token, to get the most
+      entities out of a token budget
+    - ``"length"``: longest documents first
+    - ``"input"``: input order
+
+    or by a callable returning a value for a document text. A document is
+    started only if its predicted tokens, plus those of the documents in
+    flight, fit in what is left of ``max_tokens``, and only if a typical call
+    would finish before ``max_seconds``. Documents that do not fit are
+    skipped, and lower-ranked smaller documents may still be extracted.
+    """
+
+    def __init__(
+        self,
+        extractor: InformationExtractor,
+        max_tokens: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        priority: Union[str, Callable[[str], float]] = "score",
+        max_concurrency: int = 8,
+        requests_per_second: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        """
+        Args:
+            extractor: Extractor used for every document
+            max_tokens: Token budget (input and output) for the run
+            max_seconds: Wall-clock budget for the run, in seconds
+            priority: Ranking of documents, see above
+            max_concurrency: Maximum number of concurrent LLM calls
+            requests_per_second: Optional cap on call starts per second
+            retry_policy: Retry policy for transient failures
+        """
+        if isinstance(priority, str) and priority not in PRIORITIES:
+            raise ValueError(
+                f"priority must be one of {', '.join(PRIORITIES)} or a callable"
+            )
+        self.extractor = extractor
+        self.max_tokens = max_tokens
+        self.max_seconds = max_seconds
+        self.priority = priority
+        self.max_concurrency = max_concurrency
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limiter = (
+            TokenBucket(requests_per_second) if requests_per_second else None
+        )
+        self.scorer = extractor.prefilter or SegmentPrefilter()
+        self._prompt_overhead = estimate_tokens(
+            extractor._get_system_prompt() + extractor._create_extraction_prompt("")
+        )
+        self.usage = Usage()
+        self.documents_done = 0
+        self.skipped: List[int] = []
+        # Character-based input estimate of the completed documents
+        self._estimated_input = 0
+
+    def _estimate_input(self, text: str) -> int:
+        return self._prompt_overhead + estimate_tokens(text)
+
+    def predict_tokens(self, text: str) -> Tuple[int, int]:
+        """Predicted (input, output) tokens of extracting one document."""
+        input_tokens = self._estimate_input(text)
+        ratio = DEFAULT_OUTPUT_RATIO
+        if self.usage.input_tokens and self._estimated_input:
+            # Calibrate against the tokens the model actually reported
+            input_tokens = round(
+                input_tokens * self.usage.input_tokens / self._estimated_input
+            )
+            ratio = self.usage.output_tokens / self.usage.input_tokens
+        return input_tokens, round(input_tokens * ratio)
+
+    def seconds_per_document(self) -> Optional[float]:
+        """Mean model time per completed document, once one has completed."""
+        if not self.documents_done:
+            return None
+        return self.usage.llm_seconds / self.documents_done
+
+    def value(self, text: str) -> float:
+        """Value of extracting a document under the configured priority."""
+        if callable(self.priority):
+            return self.priority(text)
+        if self.priority == "score":
+            return self.scorer.score(text)
+        if self.priority == "density":
+            return self.scorer.score(text) / sum(self.predict_tokens(text))
+        if self.priority == "length":
+            return float(len(text))
+        return 0.0
+
+    def estimate(self, texts: Sequence[str]) -> Dict[str, Optional[float]]:
+        """
+        Predict the cost of extracting every document.
+
+        Returns:
+            Dict with the number of documents, predicted input, output and
+            total tokens, and the predicted wall-clock seconds at
+            ``max_concurrency`` (None until a document has completed)
+        """
+        predictions = [self.predict_tokens(text) for text in texts]
+        input_tokens = sum(p[0] for p in predictions)
+        output_tokens = sum(p[1] for p in predictions)
+        per_document = self.seconds_per_document()
+        return {
+            "documents": len(texts),
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "seconds": (
+                per_document * len(texts) / self.max_concurrency
+                if per_document is not None
+                else None
+            ),
+        }
+
+    async def run(
+        self,
+        inputs: Sequence[Union[str, Path]],
+        stop_event: Optional[asyncio.Event] = None,
+    ) -> AsyncIterator[Tuple[int, ExtractionResult]]:
+        """
+        Extract documents in priority order until the budget is spent.
+
+        Args:
+            inputs: Document texts and/or file paths
+            stop_event: When set, no new documents are started
+
+        Yields:
+            (input index, ExtractionResult) tuples in completion order. The
+            indices of documents left out for lack of budget are in
+            ``skipped`` once the iterator is exhausted.
+        """
+        texts: List[str] = []
+        results: Dict[int, ExtractionResult] = {}
+        for index, item in enumerate(inputs):
+            if isinstance(item, Path):
+                try:
+                    item = item.read_text()
+                except OSError as e:
+                    results[index] = self.extractor.failed_result("", e)
+                    item = ""
+            texts.append(item)
+
+        pending = sorted(
+            (i for i in range(len(texts)) if i not in results),
+            key=lambda i: self.value(texts[i]),
+            reverse=True,
+        )
+        self.skipped = []
+        # The budget applies to this run; calibration carries over between runs
+        spent = Usage()
+        reserved = 0
+        started = time.monotonic()
+        finished: asyncio.Queue = asyncio.Queue()
+        for item in results.items():
+            finished.put_nowait(item)
+
+        def next_document() -> Optional[int]:
+            if self.max_seconds is not None:
+                per_document = self.seconds_per_document() or 0.0
+                if time.monotonic() - started + per_document > self.max_seconds:
+                    return None
+            for position, index in enumerate(pending):
+                if self.max_tokens is None:
+                    return pending.pop(position)
+                cost = sum(self.predict_tokens(texts[index]))
+                if spent.total_tokens + reserved + cost <= self.max_tokens:
+                    return pending.pop(position)
+            return None
+
+        async def worker() -> None:
+            nonlocal reserved
+            try:
+                while stop_event is None or not stop_event.is_set():
+                    index = next_document()
+                    if index is None:
+                        return
+                    cost = sum(self.predict_tokens(texts[index]))
+                    reserved += cost
+                    try:
+                        with track_usage() as usage:
+                            result = await self.extractor.extract_with_retry(
+                                texts[index], self.retry_policy, self.rate_limiter
+                            )
+                    finally:
+                        reserved -= cost
+                        spent.add(usage)
+                        self.usage.add(usage)
+                        self._estimated_input += self._estimate_input(texts[index])
+                    self.documents_done += 1
+                    await finished.put((index, result))
+            finally:
+                # Tell the consumer this worker is done
+                finished.put_nowait(None)
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(min(self.max_concurrency, len(pending)))
+        ]
+        try:
+            active = len(workers)
+            while active or not finished.empty():
+                item = await finished.get()
+                if item is None:
+                    active -= 1
+                    continue
+                yield item
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self.skipped = sorted(pending)
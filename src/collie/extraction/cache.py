@@ -0,0 +1,157 @@
+"""
+Persistent, content-addressed cache for structured LLM extraction output.
+
+Entries are keyed by a hash of everything that determines the model's answer:
+the prompt, the system prompt, the model name and the JSON schema of the
+structured output type. The raw structured output is stored as JSON so a
+cached call can be replayed without contacting the provider.
+"""
+
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Type, TypeVar, Union
+
+from pydantic import BaseModel
+
+OutputT = TypeVar("OutputT", bound=BaseModel)
+
+DEFAULT_MAX_ENTRIES = 100_000
+
+
+@functools.lru_cache(maxsize=None)
+def _schema_fingerprint(output_type: Type[BaseModel]) -> str:
+    """Stable fingerprint of a structured output type's JSON schema."""
+    schema = json.dumps(output_type.model_json_schema(), sort_keys=True)
+    return hashlib.sha256(schema.encode()).hexdigest()
+
+
+class ExtractionCache:
+    """
+    SQLite-backed LRU cache of structured extraction responses.
+
+    The cache holds at most ``max_entries`` responses; when the cap is
+    exceeded the least recently used entries are evicted. Hit, miss and
+    eviction counters are kept for the lifetime of the instance.
+    """
+
+    def __init__(self, path: Union[str, Path], max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Open (or create) a cache database.
+
+        Args:
+            path: SQLite database file, or ":memory:" for a process-local cache
+            max_entries: Maximum number of cached responses
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                output TEXT NOT NULL,
+                last_used INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)"
+        )
+        self._conn.commit()
+        # Logical clock for LRU ordering; survives restarts via the stored maximum
+        (self._clock,) = self._conn.execute(
+            "SELECT COALESCE(MAX(last_used), 0) FROM responses"
+        ).fetchone()
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    @staticmethod
+    def make_key(
+        prompt: str,
+        system_prompt: str,
+        model_name: str,
+        output_type: Type[BaseModel],
+    ) -> str:
+        """Content hash identifying one structured LLM call."""
+        payload = json.dumps(
+            [prompt, system_prompt, model_name, _schema_fingerprint(output_type)]
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str, output_type: Type[OutputT]) -> Optional[OutputT]:
+        """Return the cached output for ``key``, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT output FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?", (self._tick(), key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return output_type.model_validate_json(row[0])
+
+    def put(self, key: str, output: BaseModel) -> None:
+        """Store a structured output, evicting least recently used entries if needed."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, output, last_used) VALUES (?, ?, ?)",
+                (key, output.model_dump_json(), self._tick()),
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    """
+                    DELETE FROM responses WHERE key IN (
+                        SELECT key FROM responses ORDER BY last_used ASC LIMIT ?
+                    )
+                    """,
+                    (overflow,),
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return count
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
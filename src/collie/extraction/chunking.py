@@ -0,0 +1,140 @@
+"""
+Text chunking utilities for long-document extraction.
+
+Long documents are split into overlapping windows on paragraph or sentence
+boundaries so that each window fits comfortably in a single LLM call and the
+windows can be extracted concurrently.
+"""
+
+import re
+from typing import List, Tuple
+
+from pydantic import BaseModel, Field
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+
+DEFAULT_CHUNK_CHARS = 8000
+DEFAULT_CHUNK_OVERLAP = 500
+
+
+class TextChunk(BaseModel):
+    """A window of a source document with its character offsets."""
+
+    index: int = Field(..., description="Position of the chunk in the document")
+    start: int = Field(..., description="Start offset in the source text")
+    end: int = Field(..., description="End offset in the source text (exclusive)")
+    text: str = Field(..., description="Chunk text")
+
+
+def _split_spans(
+    text: str, start: int, end: int, pattern: re.Pattern
+) -> List[Tuple[int, int]]:
+    """Split text[start:end] on a separator pattern, trimming whitespace from each span."""
+    spans = []
+    cursor = start
+    for match in pattern.finditer(text, start, end):
+        spans.append((cursor, match.start()))
+        cursor = match.end()
+    spans.append((cursor, end))
+
+    trimmed = []
+    for span_start, span_end in spans:
+        while span_start < span_end and text[span_start].isspace():
+            span_start += 1
+        while span_end > span_start and text[span_end - 1].isspace():
+            span_end -= 1
+        if span_start < span_end:
+            trimmed.append((span_start, span_end))
+    return trimmed
+
+
+def split_paragraphs(text: str) -> List[TextChunk]:
+    """Split text into paragraphs (separated by blank lines) with their offsets."""
+    return [
+        TextChunk(index=i, start=start, end=end, text=text[start:end])
+        for i, (start, end) in enumerate(
+            _split_spans(text, 0, len(text), _PARAGRAPH_BREAK)
+        )
+    ]
+
+
+def _segment_spans(text: str, max_chars: int) -> List[Tuple[int, int]]:
+    """
+    Break text into paragraph spans no longer than max_chars.
+
+    Oversized paragraphs are split on sentence boundaries, and oversized
+    sentences are hard-split as a last resort.
+    """
+    segments = []
+    for para_start, para_end in _split_spans(text, 0, len(text), _PARAGRAPH_BREAK):
+        if para_end - para_start <= max_chars:
+            segments.append((para_start, para_end))
+            continue
+        for sent_start, sent_end in _split_spans(
+            text, para_start, para_end, _SENTENCE_BREAK
+        ):
+            while sent_end - sent_start > max_chars:
+                segments.append((sent_start, sent_start + max_chars))
+                sent_start += max_chars
+            segments.append((sent_start, sent_end))
+    return segments
+
+
+def split_into_chunks(
+    text: str,
+    max_chars: int = DEFAULT_CHUNK_CHARS,
+    overlap: int = DEFAULT_CHUNK_OVERLAP,
+) -> List[TextChunk]:
+    """
+    Split text into overlapping windows on paragraph or sentence boundaries.
+
+    Whole segments are packed greedily into each window. Consecutive windows
+    share the trailing segments of the previous window, up to ``overlap``
+    characters, so entities spanning a boundary are seen by both calls.
+
+    Args:
+        text: Source document
+        max_chars: Maximum window size in characters
+        overlap: Maximum number of characters shared by consecutive windows
+
+    Returns:
+        List of chunks in document order
+    """
+    if max_chars <= 0:
+        raise ValueError("max_chars must be positive")
+    if overlap < 0:
+        raise ValueError("overlap must not be negative")
+    if overlap >= max_chars:
+        raise ValueError("overlap must be smaller than max_chars")
+
+    if len(text) <= max_chars:
+        return [TextChunk(index=0, start=0, end=len(text), text=text)]
+
+    segments = _segment_spans(text, max_chars)
+    chunks = []
+    i = 0
+    while i < len(segments):
+        window_start = segments[i][0]
+        j = i
+        while j + 1 < len(segments) and segments[j + 1][1] - window_start <= max_chars:
+            j += 1
+        window_end = segments[j][1]
+        chunks.append(
+            TextChunk(
+                index=len(chunks),
+                start=window_start,
+                end=window_end,
+                text=text[window_start:window_end],
+            )
+        )
+        if j == len(segments) - 1:
+            break
+
+        # Step back over trailing segments that fit in the overlap budget,
+        # always advancing by at least one segment.
+        k = j + 1
+        while k - 1 > i and window_end - segments[k - 1][0] <= overlap:
+            k -= 1
+        i = k
+    return chunks
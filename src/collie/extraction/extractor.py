@@ -6,10 +6,16 @@ from unstructured text using structured LLM output with CIDOC CRM standards enfo
 """
 
 import asyncio
+import hashlib
 import os
-from typing import List, Optional
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple, Type, TypeVar, Union
 import uuid
 
+from pydantic import BaseModel
+
 from pydantic_ai import Agent
 from pydantic_ai.models.google import GoogleModel
 from pydantic_ai.providers.google import GoogleProvider
@@ -32,8 +38,97 @@ from .llm_models import (
     CIDOCObject,
     CIDOCTime,
     CIDOCRelationship,
+    CIDOCPackedExtractionResult,
+    CIDOCLinkingResult,
     CIDOC_PROPERTIES,
 )
+from .backends import AgentBackend, ExtractionBackend, PoolBackend, PoolMember
+from .cache import ExtractionCache
+from .chunking import (
+    DEFAULT_CHUNK_CHARS,
+    DEFAULT_CHUNK_OVERLAP,
+    TextChunk,
+    split_into_chunks,
+    split_paragraphs,
+)
+from .incremental import DocumentManifest, fingerprint_segment, splice_results
+from .label_index import LabelIndex
+from .lenient import (
+    LenientCIDOCExtractionResult,
+    RejectedItem,
+    create_reask_prompt,
+    extend_result,
+    parse_lenient,
+)
+from .linking import EntityLinkingIndex
+from .mapreduce import (
+    DEFAULT_CONTEXT_CHARS,
+    EntityRoster,
+    create_reduce_prompt,
+    resolve_linked_relationships,
+    select_context,
+)
+from .merging import ResultMerger
+from .offsets import AnchorResolver, anchor_spans, shift_spans
+from .packing import (
+    DEFAULT_PACK_DOCUMENTS,
+    DEFAULT_PACK_TOKENS,
+    estimate_tokens,
+    format_documents,
+    pack_documents,
+)
+from .prefilter import SegmentPrefilter
+from .throttling import AdaptiveConcurrencyLimiter, RetryPolicy, TokenBucket
+from .usage import Usage, track_usage
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+OutputT = TypeVar("OutputT", bound=BaseModel)
+
+_EXTRACTION_INSTRUCTIONS = """Extract the following information:
+
+1. **Persons (E21)**: All people mentioned with biographical details
+   - Include birth/death dates and places when mentioned
+   - Include nationality, occupation, and other biographical facts
+   - Extract family relationships and professional connections
+
+2. **Events (E5)**: All significant events mentioned
+   - Births, deaths, marriages, graduations
+   - Achievements, awards, publications, inventions
+   - Work events, travel, meetings
+   - Include dates, locations, and participants
+
+3. **Places (E53)**: All geographical locations and institutions
+   - Cities, countries, regions
+   - Universities, institutes, organizations
+   - Buildings, landmarks, specific locations
+
+4. **Objects (E22)**: All physical and conceptual objects
+   - Theories, formulas, concepts
+   - Awards, publications, patents
+   - Institutions, organizations
+   - Artifacts, inventions
+
+5. **Time Periods (E52)**: All temporal references
+   - Specific dates, years, decades
+   - Periods, eras, time spans
+   - Duration references
+
+6. **Relationships**: All connections between entities
+   - Use proper CIDOC CRM property codes (P-codes)
+   - Include person-place relationships (birth, death, work)
+   - Include person-object relationships (created, won, published)
+   - Include event relationships (participants, locations, times)
+
+Focus on extracting factual, verifiable information with high confidence.
+Be thorough but accurate - it's better to extract fewer high-confidence entities than many uncertain ones.
+"""
+
+_ANCHOR_INSTRUCTION = """
+For every source_text field, do not quote the passage. Copy only a short anchor:
+3 to 8 consecutive words exactly as they appear in the text, from the sentence
+that supports the entity or relationship.
+"""
 
 
 class InformationExtractor:
@@ -44,24 +139,125 @@ class InformationExtractor:
     from unstructured text according to CIDOC CRM standards.
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache: Optional[ExtractionCache] = None,
+        backend: Optional[ExtractionBackend] = None,
+        prefilter: Optional[SegmentPrefilter] = None,
+        source_offsets: bool = False,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        lenient: bool = False,
+        reask_rejected: bool = False,
+        linking_index: Optional[EntityLinkingIndex] = None,
+    ):
         """
         Initialize the information extractor.
         
         Args:
             api_key: Google API key for PydanticAI. If None, will try to get from environment.
+            cache: Optional persistent cache of structured LLM responses
+            backend: Model backend to use instead of Google Gemini, e.g. a
+                ReplayBackend or StubBackend for offline runs. No API key is
+                needed when a backend is given.
+            prefilter: Optional local scorer; segments it rejects are not
+                sent to the model and yield an empty result
+            source_offsets: Ask the model for short anchors instead of source
+                snippets and store (start, end) spans into a shared
+                ``source_document`` on the result
+            concurrency_limiter: Optional adaptive limiter shared by every
+                model call made through this extractor
+            lenient: Validate the model output item by item, keeping valid
+                entities and relationships and reporting rejected ones in
+                ``extraction_metadata["rejected_items"]``
+            reask_rejected: In lenient mode, ask the model once more for
+                corrected versions of only the rejected items
+            linking_index: Optional persistent index giving entities seen
+                in earlier runs their canonical IDs
         """
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
-        if not self.api_key:
-            raise ValueError("Google API key is required. Set GOOGLE_API_KEY environment variable.")
+        self.cache = cache
+        self.prefilter = prefilter
+        self.source_offsets = source_offsets
+        self.concurrency_limiter = concurrency_limiter
+        self.lenient = lenient
+        self.reask_rejected = reask_rejected
+        self.linking_index = linking_index
+        self.provider: Optional[GoogleProvider] = None
+        # Tokens and model time of every call made through this extractor
+        self.usage = Usage()
+        
+        if backend is None:
+            backend = self.create_agent_backend(DEFAULT_MODEL)
+            self.agent = backend.agent
+            self.model = self.agent.model
+        
+        self.backend = backend
+    
+    def create_agent_backend(self, model_name: str, api_key: Optional[str] = None) -> AgentBackend:
+        """
+        Create a Gemini backend using this extractor's API key and system prompt.
+        
+        Args:
+            model_name: Gemini model name, e.g. ``"gemini-2.5-pro"``
+            api_key: API key to use instead of the extractor's own, e.g. for
+                one member of a PoolBackend
+            
+        Returns:
+            AgentBackend for the model, e.g. to use as the stronger tier of a
+            CascadeBackend
+        """
+        if api_key is not None:
+            provider = GoogleProvider(api_key=api_key)
+        else:
+            if not self.api_key:
+                raise ValueError("Google API key is required. Set GOOGLE_API_KEY environment variable.")
+            if self.provider is None:
+                self.provider = GoogleProvider(api_key=self.api_key)
+            provider = self.provider
         
-        self.provider = GoogleProvider(api_key=self.api_key)
-        self.model = GoogleModel("gemini-2.5-flash", provider=self.provider)
-        self.agent = Agent(
-            self.model,
+        agent = Agent(
+            GoogleModel(model_name, provider=provider),
             output_type=CIDOCExtractionResult,
             system_prompt=self._get_system_prompt()
         )
+        return AgentBackend(agent, model_name)
+    
+    def create_pool_backend(
+        self,
+        api_keys: Iterable[str],
+        model_names: Optional[Iterable[str]] = None,
+        requests_per_minute: Optional[float] = None,
+        **pool_options,
+    ) -> PoolBackend:
+        """
+        Create a Gemini backend balancing calls across several API keys and models.
+        
+        Args:
+            api_keys: API keys, each with its own quota
+            model_names: Models to serve from every key. Defaults to the default model.
+            requests_per_minute: Request quota of each key and model pair
+            **pool_options: Health and cooldown options passed to PoolBackend
+            
+        Returns:
+            PoolBackend with one member per key and model
+        """
+        model_names = list(model_names or [DEFAULT_MODEL])
+        members = [
+            PoolMember(
+                self.create_agent_backend(model_name, api_key=key),
+                requests_per_minute=requests_per_minute,
+                name=f"key{i}:{model_name}",
+            )
+            for i, key in enumerate(api_keys)
+            for model_name in model_names
+        ]
+        return PoolBackend(members, **pool_options)
+    
+    @property
+    def model_name(self) -> str:
+        """Name of the model behind the current backend."""
+        return self.backend.model_name
     
     def _get_system_prompt(self) -> str:
         """Get the system prompt for CIDOC CRM extraction."""
@@ -109,29 +305,662 @@ Confidence Scores: 0.0 (no confidence) to 1.0 (absolute certainty).
         Returns:
             ExtractionResult containing extracted entities and relationships
         """
+        skipped = self._prefiltered_result(text)
+        if skipped is not None:
+            return skipped
+        
+        with track_usage() as usage:
+            try:
+                result = await self._extract(text)
+                
+            except Exception as e:
+                print(f"Error in LLM extraction: {e}")
+                # Return empty result rather than falling back to patterns
+                result = self.failed_result(text, e)
+        result.extraction_metadata["usage"] = usage.model_dump()
+        return result
+    
+    async def extract_from_long_text(
+        self,
+        text: str,
+        max_chunk_chars: int = DEFAULT_CHUNK_CHARS,
+        chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+        max_concurrency: int = 4,
+    ) -> ExtractionResult:
+        """
+        Extract CRM entities and relationships from a long document.
+        
+        The text is split into overlapping windows on paragraph or sentence
+        boundaries, the windows are extracted concurrently (at most
+        ``max_concurrency`` calls in flight) and the per-chunk results are
+        merged, deduplicating entities seen in more than one window.
+        
+        Args:
+            text: Input text to analyze
+            max_chunk_chars: Maximum window size in characters
+            chunk_overlap: Characters shared by consecutive windows
+            max_concurrency: Maximum number of concurrent LLM calls
+            
+        Returns:
+            Merged ExtractionResult for the whole document
+        """
+        chunks = split_into_chunks(text, max_chunk_chars, chunk_overlap)
+        if len(chunks) == 1:
+            return await self.extract_from_text(text)
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def extract_chunk(chunk_text: str) -> ExtractionResult:
+            async with semaphore:
+                return await self.extract_from_text(chunk_text)
+        
+        results = await asyncio.gather(*(extract_chunk(chunk.text) for chunk in chunks))
+        
+        # Merge in document order so entity IDs are deterministic
+        merger = ResultMerger()
+        for chunk, result in zip(chunks, results, strict=True):
+            merger.add(shift_spans(result, chunk.start))
+        
+        methods = [r.extraction_metadata.get("extraction_method") for r in results]
+        usage = Usage()
+        for result in results:
+            usage.add(Usage.from_metadata(result.extraction_metadata))
+        merged = merger.result()
+        merged.extraction_metadata = {
+            "source_text_length": len(text),
+            "extraction_method": "llm_structured_chunked",
+            "model": self.model_name,
+            "chunks": len(chunks),
+            "failed_chunks": methods.count("llm_failed"),
+            "skipped_chunks": methods.count("prefiltered"),
+            "max_chunk_chars": max_chunk_chars,
+            "chunk_overlap": chunk_overlap,
+            "total_entities": len(merged.entities),
+            "total_relationships": len(merged.relationships),
+            "usage": usage.model_dump(),
+        }
+        if self.source_offsets:
+            merged.source_document = text
+        return merged
+    
+    async def extract_map_reduce(
+        self,
+        text: str,
+        max_chunk_chars: int = DEFAULT_CHUNK_CHARS,
+        chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+        max_concurrency: int = 4,
+        max_context_chars: int = DEFAULT_CONTEXT_CHARS,
+    ) -> ExtractionResult:
+        """
+        Extract a long document in two phases to keep cross-chunk relationships.
+        
+        The map phase is :meth:`extract_from_long_text`: windows are extracted
+        concurrently and merged. The reduce phase makes one more call with a
+        roster of the merged entities (numeric IDs, classes and labels only)
+        and the sentences that mention them, and adds the relationships it
+        returns. Relationships between entities found in different windows
+        are recovered without sending the whole document in one prompt.
+        
+        Args:
+            text: Input text to analyze
+            max_chunk_chars: Maximum window size in characters
+            chunk_overlap: Characters shared by consecutive windows
+            max_concurrency: Maximum number of concurrent LLM calls in the map phase
+            max_context_chars: Maximum characters of sentences sent to the reduce phase
+            
+        Returns:
+            Merged ExtractionResult. If the reduce call fails, the map result
+            is returned with ``reduce_error`` in its metadata.
+        """
+        mapped = await self.extract_from_long_text(text, max_chunk_chars, chunk_overlap, max_concurrency)
+        roster = EntityRoster(mapped.entities)
+        if "chunks" not in mapped.extraction_metadata or len(roster) < 2:
+            # A single window already saw every entity together
+            return mapped
+        
+        context = select_context(text, roster, max_context_chars)
+        reduce_error = None
+        with track_usage() as reduce_usage:
+            try:
+                linking, _ = await self._call_model(
+                    create_reduce_prompt(text, roster, context), CIDOCLinkingResult
+                )
+                linked = resolve_linked_relationships(roster, linking)
+            except Exception as e:
+                print(f"Error in relationship pass: {e}")
+                linked = []
+                reduce_error = str(e)
+        
+        if self.source_offsets:
+            resolver = AnchorResolver(text)
+            for rel in linked:
+                rel.source_span = resolver.resolve(rel.source_text)
+                rel.source_text = None
+        
+        merger = ResultMerger()
+        merger.add(mapped)
+        added = merger.add(ExtractionResult(relationships=linked))
+        usage = Usage.from_metadata(mapped.extraction_metadata).add(reduce_usage)
+        result = merger.result({
+            **mapped.extraction_metadata,
+            "extraction_method": "llm_map_reduce",
+            "roster_size": len(roster),
+            "context_sentences": len(context),
+            "linked_relationships": len(added.relationships),
+            "usage": usage.model_dump(),
+        })
+        result.extraction_metadata["total_relationships"] = len(result.relationships)
+        if reduce_error is not None:
+            result.extraction_metadata["reduce_error"] = reduce_error
+        result.source_document = mapped.source_document
+        return result
+    
+    async def extract_stream(
+        self,
+        text: str,
+        max_chunk_chars: int = DEFAULT_CHUNK_CHARS,
+        chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+        max_concurrency: int = 4,
+    ) -> AsyncIterator[ExtractionResult]:
+        """
+        Extract a document chunk by chunk, yielding partial results as they arrive.
+        
+        Each yielded ExtractionResult contains only the entities and
+        relationships that are new since the previous one. Entities already
+        emitted by an earlier chunk are not repeated; relationships that
+        mention them point at the IDs emitted first, so consumers can build a
+        graph or emit Cypher incrementally while later chunks are in flight.
+        
+        Args:
+            text: Input text to analyze
+            max_chunk_chars: Maximum window size in characters
+            chunk_overlap: Characters shared by consecutive windows
+            max_concurrency: Maximum number of concurrent LLM calls
+            
+        Yields:
+            Partial ExtractionResults in chunk completion order
+        """
+        chunks = split_into_chunks(text, max_chunk_chars, chunk_overlap)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def extract_chunk(chunk: TextChunk) -> Tuple[TextChunk, ExtractionResult]:
+            async with semaphore:
+                return chunk, await self.extract_from_text(chunk.text)
+        
+        merger = ResultMerger()
+        tasks = [asyncio.create_task(extract_chunk(chunk)) for chunk in chunks]
         try:
-            # Create extraction prompt
-            prompt = self._create_extraction_prompt(text)
+            for next_done in asyncio.as_completed(tasks):
+                chunk, result = await next_done
+                delta = merger.add(shift_spans(result, chunk.start))
+                if self.source_offsets:
+                    delta.source_document = text
+                delta.extraction_metadata.update({
+                    "chunk_index": chunk.index,
+                    "chunk_start": chunk.start,
+                    "chunk_end": chunk.end,
+                    "chunks": len(chunks),
+                    "usage": Usage.from_metadata(result.extraction_metadata).model_dump(),
+                })
+                yield delta
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def extract_incremental(
+        self,
+        text: str,
+        previous: Optional[ExtractionResult] = None,
+        manifest: Optional[DocumentManifest] = None,
+        max_concurrency: int = 4,
+    ) -> Tuple[ExtractionResult, DocumentManifest]:
+        """
+        Re-extract only the paragraphs that changed since the previous run.
+        
+        Paragraphs whose fingerprint appears in ``manifest`` are not sent to
+        the LLM; their entities and relationships are carried over from
+        ``previous`` with the same IDs. Added or edited paragraphs are
+        extracted concurrently and spliced in, reusing the previous ID of any
+        entity that was already known. Without a previous result every
+        paragraph is extracted, which produces the first manifest.
+        
+        Args:
+            text: Current document text
+            previous: Result returned by the previous run
+            manifest: Manifest returned by the previous run
+            max_concurrency: Maximum number of concurrent LLM calls
+            
+        Returns:
+            Tuple of the updated ExtractionResult and its manifest
+        """
+        paragraphs = split_paragraphs(text)
+        known = manifest.by_fingerprint() if manifest is not None and previous is not None else {}
+        changed = [p for p in paragraphs if fingerprint_segment(p.text) not in known]
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def extract_paragraph(paragraph: TextChunk) -> ExtractionResult:
+            async with semaphore:
+                return await self.extract_from_text(paragraph.text)
+        
+        results = await asyncio.gather(*(extract_paragraph(p) for p in changed))
+        new_results = {
+            p.index: shift_spans(r, p.start) for p, r in zip(changed, results, strict=True)
+        }
+        
+        merged, new_manifest = splice_results(paragraphs, new_results, previous, manifest)
+        usage = Usage()
+        for result in results:
+            usage.add(Usage.from_metadata(result.extraction_metadata))
+        merged.extraction_metadata.update({
+            "source_text_length": len(text),
+            "model": self.model_name,
+            "usage": usage.model_dump(),
+        })
+        if self.source_offsets:
+            merged.source_document = text
+        return merged, new_manifest
+    
+    async def extract_many(
+        self,
+        inputs: Iterable[Union[str, Path]],
+        max_concurrency: int = 8,
+        requests_per_second: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        deduplicate: bool = True,
+        stop_event: Optional[asyncio.Event] = None,
+        max_shared_results: int = 1000,
+    ) -> AsyncIterator[Tuple[int, ExtractionResult]]:
+        """
+        Extract many documents concurrently, yielding results as they finish.
+        
+        Strings are treated as document text and ``Path`` objects as files to
+        read. At most ``max_concurrency`` calls are in flight, call starts are
+        paced by a token-bucket rate limiter, and transient failures (rate
+        limits, server errors, timeouts) are retried with jittered
+        exponential backoff. A document that still fails yields an empty
+        ``llm_failed`` result, as :meth:`extract_from_text` does. With a
+        ``concurrency_limiter`` on the extractor, ``max_concurrency`` is only
+        an upper bound and the limiter decides how many calls run at once.
+        
+        Verbatim duplicate inputs are extracted once per run: a duplicate of
+        a document that is still in flight waits for that call, and a
+        duplicate of one of the ``max_shared_results`` most recently finished
+        documents is served from memory unless that extraction failed. Each
+        duplicate receives its own copy of the result, marked with
+        ``duplicate_of`` in its metadata and with empty usage, so usage summed
+        over all results counts each call once.
+        
+        Args:
+            inputs: Document texts and/or file paths
+            max_concurrency: Maximum number of concurrent LLM calls
+            requests_per_second: Optional cap on call starts per second
+            retry_policy: Retry policy for transient failures
+            deduplicate: Coalesce identical inputs into a single call
+            stop_event: When set, no new documents are started; documents
+                already in flight finish and are yielded before the
+                iterator ends
+            max_shared_results: Number of finished results kept for
+                duplicates, so memory does not grow with the corpus
+            
+        Yields:
+            (input index, ExtractionResult) tuples in completion order
+        """
+        retry_policy = retry_policy or RetryPolicy()
+        rate_limiter = TokenBucket(requests_per_second) if requests_per_second else None
+        
+        pending: asyncio.Queue = asyncio.Queue()
+        for item in enumerate(inputs):
+            pending.put_nowait(item)
+        total = pending.qsize()
+        finished: asyncio.Queue = asyncio.Queue()
+        # Fingerprint -> (index of first occurrence, future of its result),
+        # for documents in flight and, least recently used first, for the
+        # most recently finished ones
+        in_flight: Dict[str, Tuple[int, asyncio.Future]] = {}
+        recent: OrderedDict[str, Tuple[int, asyncio.Future]] = OrderedDict()
+        
+        async def extract_once(index: int, text: str) -> ExtractionResult:
+            if not deduplicate:
+                return await self.extract_with_retry(text, retry_policy, rate_limiter)
             
-            # Use PydanticAI to extract structured data
-            result = await self.agent.run(prompt)
+            key = hashlib.sha256(text.encode()).hexdigest()
+            if key in recent:
+                recent.move_to_end(key)
+            shared = in_flight.get(key) or recent.get(key)
+            if shared is not None:
+                first_index, future = shared
+                result = (await asyncio.shield(future)).model_copy(deep=True)
+                result.extraction_metadata["duplicate_of"] = first_index
+                # The copy made no calls of its own; only the first carries usage
+                result.extraction_metadata["usage"] = Usage().model_dump()
+                return result
             
-            # Convert LLM result to internal format
-            return self._convert_llm_result(result, text)
+            future = asyncio.get_running_loop().create_future()
+            in_flight[key] = (index, future)
+            try:
+                result = await self.extract_with_retry(text, retry_policy, rate_limiter)
+            except BaseException:
+                future.cancel()
+                raise
+            finally:
+                del in_flight[key]
+            future.set_result(result.model_copy(deep=True))
+            # A failure is not kept, so a later duplicate tries again
+            failed = result.extraction_metadata.get("extraction_method") == "llm_failed"
+            if max_shared_results > 0 and not failed:
+                recent[key] = (index, future)
+                if len(recent) > max_shared_results:
+                    recent.popitem(last=False)
+            return result
+        
+        async def worker() -> None:
+            try:
+                while stop_event is None or not stop_event.is_set():
+                    try:
+                        index, item = pending.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    if isinstance(item, Path):
+                        try:
+                            text = item.read_text()
+                        except OSError as e:
+                            await finished.put((index, self.failed_result("", e)))
+                            continue
+                    else:
+                        text = item
+                    result = await extract_once(index, text)
+                    await finished.put((index, result))
+            finally:
+                # Tell the consumer this worker is done
+                finished.put_nowait(None)
+        
+        workers = [asyncio.create_task(worker()) for _ in range(min(max_concurrency, total))]
+        try:
+            active = len(workers)
+            while active:
+                item = await finished.get()
+                if item is None:
+                    active -= 1
+                    continue
+                yield item
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+    
+    async def extract_packed(
+        self,
+        texts: List[str],
+        max_batch_tokens: int = DEFAULT_PACK_TOKENS,
+        max_batch_documents: int = DEFAULT_PACK_DOCUMENTS,
+        max_concurrency: int = 4,
+    ) -> List[ExtractionResult]:
+        """
+        Extract many short documents, several per LLM call.
+        
+        Consecutive documents are packed into batches within an estimated
+        token budget, each batch is sent as one request with per-document
+        delimiters, and the structured response is split back into one
+        ExtractionResult per document. This amortizes the system prompt and
+        instructions over short records such as catalogue cards.
+        
+        Args:
+            texts: Document texts
+            max_batch_tokens: Estimated tokens of document text per call
+            max_batch_documents: Maximum number of documents per call
+            max_concurrency: Maximum number of concurrent LLM calls
             
-        except Exception as e:
-            print(f"Error in LLM extraction: {e}")
-            # Return empty result rather than falling back to patterns
-            return ExtractionResult(
-                entities=[],
-                relationships=[],
-                extraction_metadata={
-                    "source_text_length": len(text),
-                    "extraction_method": "llm_failed",
-                    "model": "gemini-2.5-flash",
-                    "error": str(e)
-                }
+        Returns:
+            ExtractionResults in the same order as ``texts``. A document whose
+            batch failed, or that is missing from the response, gets an empty
+            ``llm_failed`` result.
+        """
+        results: List[Optional[ExtractionResult]] = [None] * len(texts)
+        candidates = []
+        for index, text in enumerate(texts):
+            skipped = self._prefiltered_result(text)
+            if skipped is not None:
+                results[index] = skipped
+            else:
+                candidates.append(index)
+        
+        batches = [
+            [candidates[i] for i in batch]
+            for batch in pack_documents(
+                [texts[i] for i in candidates], max_batch_tokens, max_batch_documents
             )
+        ]
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def extract_batch(batch: List[int]) -> None:
+            async with semaphore:
+                with track_usage() as usage:
+                    try:
+                        packed, cache_hit = await self._call_model(
+                            self._create_packed_prompt([texts[i] for i in batch]),
+                            CIDOCPackedExtractionResult,
+                        )
+                    except Exception as e:
+                        print(f"Error in LLM extraction: {e}")
+                        packed = None
+                        for index in batch:
+                            results[index] = self.failed_result(texts[index], e)
+            
+            if packed is not None:
+                documents = {document.document_id: document for document in packed.documents}
+                for document_id, index in enumerate(batch):
+                    document = documents.get(document_id)
+                    if document is None:
+                        results[index] = self.failed_result(
+                            texts[index], ValueError("Document missing from packed response")
+                        )
+                        continue
+                    result = self._convert_llm_result(document, texts[index])
+                    result.extraction_metadata.update({
+                        "extraction_method": "llm_structured_packed",
+                        "packed_documents": len(batch),
+                    })
+                    if cache_hit is not None:
+                        result.extraction_metadata["cache_hit"] = cache_hit
+                    results[index] = result
+            
+            # Split the call's usage by document length; the request counts
+            # once, against the first document, so per-document usage sums up
+            batch_chars = sum(len(texts[i]) for i in batch) or 1
+            for position, index in enumerate(batch):
+                share = len(texts[index]) / batch_chars
+                results[index].extraction_metadata["usage"] = Usage(
+                    requests=usage.requests if position == 0 else 0,
+                    input_tokens=round(usage.input_tokens * share),
+                    output_tokens=round(usage.output_tokens * share),
+                    llm_seconds=usage.llm_seconds * share,
+                    estimated=usage.estimated,
+                ).model_dump()
+        
+        await asyncio.gather(*(extract_batch(batch) for batch in batches))
+        return results
+    
+    async def extract_with_retry(
+        self,
+        text: str,
+        retry_policy: RetryPolicy,
+        rate_limiter: Optional[TokenBucket] = None,
+    ) -> ExtractionResult:
+        """
+        Extract one document with rate limiting and retries.
+        
+        This is the per-document step of :meth:`extract_many`, for schedulers
+        that decide themselves which documents to run and when.
+        
+        Args:
+            text: Document text
+            retry_policy: Retry policy for transient failures
+            rate_limiter: Optional token bucket to acquire before each call
+            
+        Returns:
+            ExtractionResult, or an empty ``llm_failed`` result when the call
+            still fails after retries
+        """
+        skipped = self._prefiltered_result(text)
+        if skipped is not None:
+            return skipped
+        
+        attempt = 0
+        with track_usage() as usage:
+            while True:
+                if rate_limiter is not None:
+                    await rate_limiter.acquire()
+                try:
+                    result = await self._extract(text)
+                except Exception as e:
+                    if retry_policy.should_retry(e, attempt):
+                        await asyncio.sleep(retry_policy.backoff(attempt))
+                        attempt += 1
+                        continue
+                    print(f"Error in LLM extraction: {e}")
+                    result = self.failed_result(text, e)
+                break
+        result.extraction_metadata["attempts"] = attempt + 1
+        # Includes the calls of failed attempts
+        result.extraction_metadata["usage"] = usage.model_dump()
+        return result
+    
+    async def _extract(self, text: str) -> ExtractionResult:
+        """Run a single extraction call, raising on failure."""
+        # Create extraction prompt
+        prompt = self._create_extraction_prompt(text)
+        if self.lenient:
+            return await self._extract_lenient(prompt, text)
+        
+        llm_result, cache_hit = await self._call_model(prompt, CIDOCExtractionResult)
+        
+        # Convert LLM result to internal format
+        result = self._convert_llm_result(llm_result, text)
+        if cache_hit is not None:
+            result.extraction_metadata["cache_hit"] = cache_hit
+        return result
+    
+    async def _extract_lenient(self, prompt: str, text: str) -> ExtractionResult:
+        """Extract with per-item validation, optionally re-asking for rejected items."""
+        raw, cache_hit = await self._call_model(prompt, LenientCIDOCExtractionResult)
+        llm_result, rejected = parse_lenient(raw)
+        
+        recovered = 0
+        still_rejected: List[RejectedItem] = []
+        reask_error = None
+        if self.reask_rejected and any(r.index is not None for r in rejected):
+            try:
+                raw_fix, _ = await self._call_model(
+                    create_reask_prompt(text, rejected), LenientCIDOCExtractionResult
+                )
+                fixed, still_rejected = parse_lenient(raw_fix)
+                extended = extend_result(llm_result, fixed)
+                recovered = (
+                    extended.total_entities + extended.total_relationships
+                    - llm_result.total_entities - llm_result.total_relationships
+                )
+                llm_result = extended
+            except Exception as e:
+                # The valid part of the first answer is still usable
+                reask_error = str(e)
+        
+        result = self._convert_llm_result(llm_result, text)
+        result.extraction_metadata["rejected_items"] = [r.model_dump(mode="json") for r in rejected]
+        if self.reask_rejected:
+            result.extraction_metadata["recovered_items"] = recovered
+            result.extraction_metadata["reask_rejected_items"] = [
+                r.model_dump(mode="json") for r in still_rejected
+            ]
+            if reask_error is not None:
+                result.extraction_metadata["reask_error"] = reask_error
+        if cache_hit is not None:
+            result.extraction_metadata["cache_hit"] = cache_hit
+        return result
+    
+    async def _call_model(
+        self, prompt: str, output_type: Type[OutputT]
+    ) -> Tuple[OutputT, Optional[bool]]:
+        """
+        Get structured output for a prompt, through the cache if there is one.
+        
+        Returns:
+            Tuple of the output and whether it was a cache hit (None without a cache)
+        """
+        if self.cache is None:
+            return await self._run_agent(prompt, output_type), None
+        
+        # Replay a cached structured response when the same call was made before
+        key = self.cache.make_key(prompt, self._get_system_prompt(), self.model_name, output_type)
+        output = self.cache.get(key, output_type)
+        if output is not None:
+            return output, True
+        output = await self._run_agent(prompt, output_type)
+        self.cache.put(key, output)
+        return output, False
+    
+    async def _run_agent(
+        self, prompt: str, output_type: Type[OutputT] = CIDOCExtractionResult
+    ) -> OutputT:
+        """Use the model backend to extract structured data."""
+        if self.concurrency_limiter is None:
+            return await self._run_backend(prompt, output_type)
+        async with self.concurrency_limiter.slot():
+            return await self._run_backend(prompt, output_type)
+    
+    async def _run_backend(self, prompt: str, output_type: Type[OutputT]) -> OutputT:
+        """Call the backend, accounting for its tokens and latency."""
+        output = None
+        start = time.monotonic()
+        with track_usage() as usage:
+            try:
+                output = await self.backend.run(prompt, output_type)
+            finally:
+                usage.llm_seconds = time.monotonic() - start
+                if not usage.requests:
+                    # The backend does not report usage (stub, replay, failed call)
+                    usage.add(Usage(
+                        requests=1,
+                        input_tokens=estimate_tokens(self._get_system_prompt() + prompt),
+                        output_tokens=estimate_tokens(output.model_dump_json()) if output is not None else 0,
+                        estimated=True,
+                    ))
+                self.usage.add(usage)
+        return output
+    
+    def _prefiltered_result(self, text: str) -> Optional[ExtractionResult]:
+        """Return an empty result if the pre-filter rejects the text, else None."""
+        if self.prefilter is None or self.prefilter.accept(text):
+            return None
+        return ExtractionResult(
+            entities=[],
+            relationships=[],
+            extraction_metadata={
+                "source_text_length": len(text),
+                "extraction_method": "prefiltered",
+                "model": self.model_name,
+                "prefilter_threshold": self.prefilter.threshold,
+            }
+        )
+    
+    def failed_result(self, text: str, error: Exception) -> ExtractionResult:
+        """
+        Build the empty ``llm_failed`` result returned when extraction fails.
+        
+        Args:
+            text: Text that failed; only its length is recorded
+            error: Error that caused the failure
+        """
+        return ExtractionResult(
+            entities=[],
+            relationships=[],
+            extraction_metadata={
+                "source_text_length": len(text),
+                "extraction_method": "llm_failed",
+                "model": self.model_name,
+                "error": str(error)
+            }
+        )
     
     def _create_extraction_prompt(self, text: str) -> str:
         """Create a detailed prompt for entity extraction."""
@@ -140,44 +969,21 @@ Analyze the following text and extract CIDOC CRM entities and relationships.
 
 Text: {text}
 
-Extract the following information:
-
-1. **Persons (E21)**: All people mentioned with biographical details
-   - Include birth/death dates and places when mentioned
-   - Include nationality, occupation, and other biographical facts
-   - Extract family relationships and professional connections
-
-2. **Events (E5)**: All significant events mentioned
-   - Births, deaths, marriages, graduations
-   - Achievements, awards, publications, inventions
-   - Work events, travel, meetings
-   - Include dates, locations, and participants
-
-3. **Places (E53)**: All geographical locations and institutions
-   - Cities, countries, regions
-   - Universities, institutes, organizations
-   - Buildings, landmarks, specific locations
+""" + _EXTRACTION_INSTRUCTIONS + (_ANCHOR_INSTRUCTION if self.source_offsets else "")
+    
+    def _create_packed_prompt(self, texts: List[str]) -> str:
+        """Create a prompt extracting several delimited documents in one call."""
+        return f"""
+Analyze each of the following documents separately and extract CIDOC CRM entities and relationships.
 
-4. **Objects (E22)**: All physical and conceptual objects
-   - Theories, formulas, concepts
-   - Awards, publications, patents
-   - Institutions, organizations
-   - Artifacts, inventions
+Documents:
 
-5. **Time Periods (E52)**: All temporal references
-   - Specific dates, years, decades
-   - Periods, eras, time spans
-   - Duration references
+{format_documents(texts)}
 
-6. **Relationships**: All connections between entities
-   - Use proper CIDOC CRM property codes (P-codes)
-   - Include person-place relationships (birth, death, work)
-   - Include person-object relationships (created, won, published)
-   - Include event relationships (participants, locations, times)
+Return one entry in "documents" per document, with its document_id. Entities and
+relationships of an entry must only come from that document.
 
-Focus on extracting factual, verifiable information with high confidence.
-Be thorough but accurate - it's better to extract fewer high-confidence entities than many uncertain ones.
-"""
+""" + _EXTRACTION_INSTRUCTIONS + (_ANCHOR_INSTRUCTION if self.source_offsets else "")
     
     def _convert_llm_result(self, llm_result: CIDOCExtractionResult, source_text: str) -> ExtractionResult:
         """Convert LLM structured result to internal format."""
@@ -260,27 +1066,32 @@ Be thorough but accurate - it's better to extract fewer high-confidence entities
             entities.append(entity)
         
         # Convert times
-        for time in llm_result.times:
+        for time_span in llm_result.times:
             entity = TimeExtraction(
-                label=time.label,
-                description=time.description,
-                confidence=time.confidence,
-                source_text=time.source_text,
-                time_type=time.time_type,
+                label=time_span.label,
+                description=time_span.description,
+                confidence=time_span.confidence,
+                source_text=time_span.source_text,
+                time_type=time_span.time_type,
                 properties={
-                    "start_date": time.start_date,
-                    "end_date": time.end_date,
+                    "start_date": time_span.start_date,
+                    "end_date": time_span.end_date,
                     "extraction_method": "llm_structured",
                     "cidoc_class": "E52"
                 }
             )
             entities.append(entity)
         
-        # Convert relationships
+        # Known entities keep the IDs they got in earlier runs
+        if self.linking_index is not None:
+            self.linking_index.link(entities)
+        
+        # Convert relationships, resolving endpoints through a label index
+        label_index = LabelIndex(entities)
         for rel in llm_result.relationships:
             # Find source and target entities
-            source_entity = self._find_entity_by_label(entities, rel.source_label)
-            target_entity = self._find_entity_by_label(entities, rel.target_label)
+            source_entity = label_index.find(rel.source_label)
+            target_entity = label_index.find(rel.target_label)
             
             if source_entity and target_entity:
                 relationship = ExtractedRelationship(
@@ -298,13 +1109,13 @@ Be thorough but accurate - it's better to extract fewer high-confidence entities
                 )
                 relationships.append(relationship)
         
-        return ExtractionResult(
+        result = ExtractionResult(
             entities=entities,
             relationships=relationships,
             extraction_metadata={
                 "source_text_length": len(source_text),
                 "extraction_method": "llm_structured",
-                "model": "gemini-2.5-flash",
+                "model": self.model_name,
                 "llm_confidence": llm_result.extraction_confidence,
                 "total_entities": llm_result.total_entities,
                 "total_relationships": llm_result.total_relationships,
@@ -317,22 +1128,15 @@ Be thorough but accurate - it's better to extract fewer high-confidence entities
                 }
             }
         )
+        
+        # Offsets mode: snippets are anchors to resolve against the source text
+        if self.source_offsets:
+            anchor_spans(result, source_text)
+        return result
     
     def _find_entity_by_label(self, entities: List[ExtractedEntity], label: str) -> Optional[ExtractedEntity]:
         """Find entity by label with fuzzy matching."""
-        label_lower = label.lower().strip()
-        
-        # First try exact match
-        for entity in entities:
-            if entity.label.lower() == label_lower:
-                return entity
-        
-        # Try partial matching
-        for entity in entities:
-            if label_lower in entity.label.lower() or entity.label.lower() in label_lower:
-                return entity
-        
-        return None
+        return LabelIndex(entities).find(label)
     
     def get_cidoc_property_info(self, property_code: str) -> dict:
         """Get information about a CIDOC CRM property code."""
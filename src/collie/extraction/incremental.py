@@ -0,0 +1,199 @@
+"""
+Incremental re-extraction support.
+
+A DocumentManifest records, for every paragraph of a document, a fingerprint
+of its text and the IDs of the entities and relationships it produced. When
+the document is edited, only paragraphs whose fingerprint is new need to be
+sent to the LLM; everything else is carried over from the previous result
+with its IDs unchanged.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, TypeVar, Union
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from .chunking import TextChunk
+from .merging import ResultMerger, normalize_label
+from .models import ExtractedEntity, ExtractedRelationship, ExtractionResult
+
+ItemT = TypeVar("ItemT", ExtractedEntity, ExtractedRelationship)
+
+
+def fingerprint_segment(text: str) -> str:
+    """Whitespace-insensitive fingerprint of a text segment."""
+    return hashlib.sha256(" ".join(text.split()).encode()).hexdigest()
+
+
+class SegmentRecord(BaseModel):
+    """Provenance of one paragraph in an extraction result."""
+
+    fingerprint: str = Field(..., description="Fingerprint of the paragraph text")
+    start: int = Field(
+        0, description="Character offset of the paragraph in the document"
+    )
+    end: int = Field(0, description="End offset of the paragraph in the document")
+    entity_ids: List[UUID] = Field(
+        default_factory=list, description="Entities found in the paragraph"
+    )
+    relationship_ids: List[UUID] = Field(
+        default_factory=list, description="Relationships found in the paragraph"
+    )
+
+
+class DocumentManifest(BaseModel):
+    """Per-paragraph fingerprint manifest of an extracted document."""
+
+    segments: List[SegmentRecord] = Field(default_factory=list)
+
+    def by_fingerprint(self) -> Dict[str, SegmentRecord]:
+        """Index segment records by fingerprint."""
+        return {record.fingerprint: record for record in self.segments}
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the manifest as JSON."""
+        Path(path).write_text(self.model_dump_json(indent=2))
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "DocumentManifest":
+        """Read a manifest written by :meth:`save`."""
+        return cls.model_validate_json(Path(path).read_text())
+
+
+def _moved(item: ItemT, moves: List[Tuple[int, int, int]]) -> ItemT:
+    """Copy of a carried-over item with its source span moved to the paragraph's new position."""
+    if item.source_span is None:
+        return item
+    start, end = item.source_span
+    for old_start, old_end, delta in moves:
+        if old_start <= start < old_end:
+            return item.model_copy(update={"source_span": (start + delta, end + delta)})
+    # Its paragraph was removed
+    return item.model_copy(update={"source_span": None})
+
+
+def splice_results(
+    paragraphs: List[TextChunk],
+    new_results: Dict[int, ExtractionResult],
+    previous: Optional[ExtractionResult] = None,
+    manifest: Optional[DocumentManifest] = None,
+) -> Tuple[ExtractionResult, DocumentManifest]:
+    """
+    Combine the reusable part of a previous result with freshly extracted paragraphs.
+
+    Args:
+        paragraphs: Paragraphs of the current document
+        new_results: Extraction results for re-extracted paragraphs, by paragraph index
+        previous: Result of the previous run, if any
+        manifest: Manifest of the previous run, if any
+
+    Returns:
+        Tuple of the spliced ExtractionResult and the manifest for the current document
+    """
+    known = (
+        manifest.by_fingerprint()
+        if manifest is not None and previous is not None
+        else {}
+    )
+    fingerprints = [fingerprint_segment(p.text) for p in paragraphs]
+
+    # Carry over entities and relationships of unchanged paragraphs
+    kept_entity_ids = set()
+    kept_relationship_ids = set()
+    moves = []
+    for paragraph, fp in zip(paragraphs, fingerprints, strict=True):
+        if fp in known:
+            kept_entity_ids.update(known[fp].entity_ids)
+            kept_relationship_ids.update(known[fp].relationship_ids)
+            moves.append(
+                (known[fp].start, known[fp].end, paragraph.start - known[fp].start)
+            )
+
+    merger = ResultMerger()
+    previous_ids_by_key = {}
+    if previous is not None:
+        merger.add(
+            ExtractionResult(
+                entities=[
+                    _moved(e, moves)
+                    for e in previous.entities
+                    if e.id in kept_entity_ids
+                ],
+                relationships=[
+                    _moved(r, moves)
+                    for r in previous.relationships
+                    if r.id in kept_relationship_ids
+                    and r.source_id in kept_entity_ids
+                    and r.target_id in kept_entity_ids
+                ],
+            )
+        )
+        for entity in previous.entities:
+            previous_ids_by_key.setdefault(
+                (entity.class_code, normalize_label(entity.label)), entity.id
+            )
+
+    records = []
+    failed = 0
+    for paragraph, fp in zip(paragraphs, fingerprints, strict=True):
+        if fp in known:
+            records.append(
+                known[fp].model_copy(
+                    update={"start": paragraph.start, "end": paragraph.end}
+                )
+            )
+            continue
+
+        result = new_results.get(paragraph.index)
+        if (
+            result is None
+            or result.extraction_metadata.get("extraction_method") == "llm_failed"
+        ):
+            # No record, so the paragraph is retried on the next run
+            failed += 1
+            continue
+
+        # Entities the previous run already knew keep their IDs
+        remap = {}
+        for entity in result.entities:
+            previous_id = previous_ids_by_key.get(
+                (entity.class_code, normalize_label(entity.label))
+            )
+            if previous_id is not None:
+                remap[entity.id] = previous_id
+                entity.id = previous_id
+        for rel in result.relationships:
+            rel.source_id = remap.get(rel.source_id, rel.source_id)
+            rel.target_id = remap.get(rel.target_id, rel.target_id)
+
+        merger.add(result)
+        records.append(
+            SegmentRecord(
+                fingerprint=fp,
+                start=paragraph.start,
+                end=paragraph.end,
+                entity_ids=list(
+                    dict.fromkeys(merger.id_map[e.id] for e in result.entities)
+                ),
+                relationship_ids=list(
+                    dict.fromkeys(
+                        merger.relationship_id_map[r.id] for r in result.relationships
+                    )
+                ),
+            )
+        )
+
+    merged = merger.result(
+        {
+            "extraction_method": "llm_structured_incremental",
+            "segments": len(paragraphs),
+            "reused_segments": sum(1 for fp in fingerprints if fp in known),
+            "extracted_segments": len(new_results),
+            "failed_segments": failed,
+        }
+    )
+    merged.extraction_metadata["total_entities"] = len(merged.entities)
+    merged.extraction_metadata["total_relationships"] = len(merged.relationships)
+    return merged, DocumentManifest(segments=records)
@@ -0,0 +1,266 @@
+"""
+Checkpointed, resumable extraction jobs.
+
+A job extracts a corpus with :meth:`InformationExtractor.extract_many` and
+appends every document's result to a JSONL file as soon as it completes,
+alongside a small JSON manifest describing progress. Re-running the job on
+the same output directory skips documents that already succeeded, so a
+crash, quota exhaustion or Ctrl-C costs at most the documents in flight.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import signal
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from pydantic import BaseModel, Field
+
+from .budget import BudgetScheduler
+from .extractor import InformationExtractor
+from .models import ExtractionResult
+from .throttling import RetryPolicy
+from .usage import Usage
+
+RESULTS_FILE = "results.jsonl"
+MANIFEST_FILE = "manifest.json"
+
+logger = logging.getLogger(__name__)
+
+
+def input_key(item: Union[str, Path]) -> str:
+    """Stable identifier of a job input: the path for files, a content hash for text."""
+    if isinstance(item, Path):
+        return f"file:{item}"
+    return f"text:{hashlib.sha256(item.encode()).hexdigest()}"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobManifest(BaseModel):
+    """Progress of an extraction job."""
+
+    status: str = Field(
+        "running",
+        description="running, interrupted, budget_exhausted, completed_with_failures or completed",
+    )
+    total: int = Field(0, description="Number of inputs in the job")
+    completed: int = Field(0, description="Inputs with a successful result")
+    failed: int = Field(0, description="Inputs whose latest attempt failed")
+    resumed: int = Field(
+        0, description="Inputs skipped because an earlier run completed them"
+    )
+    over_budget: int = Field(
+        0, description="Inputs left out of this run by the token or time budget"
+    )
+    usage: Usage = Field(
+        default_factory=Usage, description="Tokens and model time of all runs"
+    )
+    started_at: str = Field(default_factory=_now)
+    updated_at: str = Field(default_factory=_now)
+
+
+class ExtractionJob:
+    """
+    Resumable corpus extraction writing results durably as they complete.
+
+    Each line of ``results.jsonl`` holds the input key, the input path (for
+    files), whether extraction succeeded and the serialized ExtractionResult.
+    Failed documents are retried on the next run. The first SIGINT stops
+    starting new documents and lets the ones in flight finish; a second one
+    interrupts immediately. With a token or time budget, documents are
+    scheduled by a BudgetScheduler and the most valuable ones go first.
+    """
+
+    def __init__(
+        self,
+        extractor: InformationExtractor,
+        output_dir: Union[str, Path],
+        max_concurrency: int = 8,
+        requests_per_second: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        fsync: bool = True,
+        max_tokens: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        priority: str = "score",
+    ):
+        """
+        Args:
+            extractor: Extractor used for every document
+            output_dir: Directory holding ``results.jsonl`` and ``manifest.json``
+            max_concurrency: Maximum number of concurrent LLM calls
+            requests_per_second: Optional cap on call starts per second
+            retry_policy: Retry policy for transient failures
+            fsync: Flush every result to disk before continuing
+            max_tokens: Token budget of one run
+            max_seconds: Wall-clock budget of one run, in seconds
+            priority: Document ranking used under a budget, see BudgetScheduler
+        """
+        self.extractor = extractor
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.results_path = self.output_dir / RESULTS_FILE
+        self.manifest_path = self.output_dir / MANIFEST_FILE
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.retry_policy = retry_policy
+        self.fsync = fsync
+        self.scheduler: Optional[BudgetScheduler] = None
+        if max_tokens is not None or max_seconds is not None:
+            self.scheduler = BudgetScheduler(
+                extractor,
+                max_tokens=max_tokens,
+                max_seconds=max_seconds,
+                priority=priority,
+                max_concurrency=max_concurrency,
+                requests_per_second=requests_per_second,
+                retry_policy=retry_policy,
+            )
+        self._stop = asyncio.Event()
+
+    def _records(self) -> Iterator[dict]:
+        if not self.results_path.exists():
+            return
+        with self.results_path.open() as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut short by a crash; the document is redone
+                    continue
+
+    def completed_keys(self) -> set:
+        """Keys of inputs whose latest recorded attempt succeeded."""
+        latest: Dict[str, bool] = {}
+        for record in self._records():
+            latest[record["key"]] = record["ok"]
+        return {key for key, ok in latest.items() if ok}
+
+    def results(self) -> Iterator[Tuple[str, ExtractionResult]]:
+        """Latest successful result per input key, in completion order."""
+        latest: Dict[str, dict] = {}
+        for record in self._records():
+            if record["ok"]:
+                latest[record["key"]] = record
+        for key, record in latest.items():
+            yield key, ExtractionResult.model_validate(record["result"])
+
+    def load_manifest(self) -> Optional[JobManifest]:
+        """Manifest written by the last run, if any."""
+        if not self.manifest_path.exists():
+            return None
+        return JobManifest.model_validate_json(self.manifest_path.read_text())
+
+    def _write_manifest(self, manifest: JobManifest) -> None:
+        manifest.updated_at = _now()
+        tmp = self.manifest_path.with_suffix(".tmp")
+        tmp.write_text(manifest.model_dump_json(indent=2))
+        os.replace(tmp, self.manifest_path)
+
+    def stop(self) -> None:
+        """Stop starting new documents; in-flight documents still finish."""
+        self._stop.set()
+
+    async def run(self, inputs: Iterable[Union[str, Path]]) -> JobManifest:
+        """
+        Extract every input not completed by an earlier run.
+
+        Args:
+            inputs: Document texts and/or file paths
+
+        Returns:
+            Final JobManifest of this run
+        """
+        inputs = list(inputs)
+        keys = [input_key(item) for item in inputs]
+        done = self.completed_keys()
+        todo: List[int] = [i for i, key in enumerate(keys) if key not in done]
+
+        previous = self.load_manifest()
+        manifest = JobManifest(
+            total=len(inputs),
+            completed=len(inputs) - len(todo),
+            resumed=len(inputs) - len(todo),
+            started_at=previous.started_at if previous else _now(),
+            usage=previous.usage if previous else Usage(),
+        )
+        self._write_manifest(manifest)
+
+        self._stop.clear()
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGINT, self._on_sigint)
+            handling_sigint = True
+        except (NotImplementedError, RuntimeError):
+            handling_sigint = False
+
+        try:
+            with self.results_path.open("a") as out:
+                if self.scheduler is not None:
+                    batch = self.scheduler.run(
+                        [inputs[i] for i in todo], stop_event=self._stop
+                    )
+                else:
+                    batch = self.extractor.extract_many(
+                        [inputs[i] for i in todo],
+                        max_concurrency=self.max_concurrency,
+                        requests_per_second=self.requests_per_second,
+                        retry_policy=self.retry_policy,
+                        stop_event=self._stop,
+                    )
+                async for position, result in batch:
+                    index = todo[position]
+                    ok = (
+                        result.extraction_metadata.get("extraction_method")
+                        != "llm_failed"
+                    )
+                    item = inputs[index]
+                    record = {
+                        "key": keys[index],
+                        "input": str(item) if isinstance(item, Path) else None,
+                        "ok": ok,
+                        "result": result.model_dump(mode="json"),
+                    }
+                    out.write(json.dumps(record) + "\n")
+                    out.flush()
+                    if self.fsync:
+                        os.fsync(out.fileno())
+
+                    if ok:
+                        manifest.completed += 1
+                    else:
+                        manifest.failed += 1
+                    manifest.usage.add(Usage.from_metadata(result.extraction_metadata))
+                    self._write_manifest(manifest)
+                if self.scheduler is not None and not self._stop.is_set():
+                    manifest.over_budget = len(self.scheduler.skipped)
+        finally:
+            if handling_sigint:
+                loop.remove_signal_handler(signal.SIGINT)
+            finished = manifest.completed + manifest.failed == manifest.total
+            if finished:
+                manifest.status = (
+                    "completed_with_failures" if manifest.failed else "completed"
+                )
+            elif manifest.over_budget:
+                manifest.status = "budget_exhausted"
+            else:
+                manifest.status = "interrupted"
+            self._write_manifest(manifest)
+        return manifest
+
+    def _on_sigint(self) -> None:
+        if self._stop.is_set():
+            # Second Ctrl-C: fall back to the default handler and interrupt now
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGINT)
+            raise KeyboardInterrupt
+        logger.warning(
+            "Stopping after documents in flight; press Ctrl-C again to abort"
+        )
+        self.stop()
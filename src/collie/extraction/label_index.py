@@ -0,0 +1,103 @@
+"""
+Label index for resolving relationship endpoints to extracted entities.
+
+Relationships returned by the LLM refer to entities by label. The index is
+built once per extraction result and answers lookups with the same semantics
+as a linear scan (exact match first, then substring match in either
+direction, first entity wins) without comparing the label against every
+entity.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set
+
+from .merging import normalize_label
+from .models import ExtractedEntity
+
+_GRAM = 3
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i : i + _GRAM] for i in range(len(text) - _GRAM + 1)}
+
+
+class LabelIndex:
+    """
+    Exact and partial label lookup over a fixed list of entities.
+
+    Labels are normalized (case-folded, whitespace-collapsed). Exact matches
+    come from a dict. Partial matches use a trigram inverted index to find
+    candidates that could contain the query, or be contained in it, and
+    verify them with a substring check. Ties are broken deterministically in
+    favour of the entity extracted first.
+    """
+
+    def __init__(self, entities: Iterable[ExtractedEntity]):
+        self._entities: List[ExtractedEntity] = list(entities)
+        self._labels: List[str] = []
+        self._exact: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._gram_counts: List[int] = []
+        self._short: List[int] = []
+
+        for position, entity in enumerate(self._entities):
+            label = normalize_label(entity.label)
+            self._labels.append(label)
+            self._exact.setdefault(label, position)
+
+            grams = _trigrams(label)
+            self._gram_counts.append(len(grams))
+            if not grams:
+                if label:
+                    self._short.append(position)
+                continue
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(position)
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def find(self, label: str) -> Optional[ExtractedEntity]:
+        """Find the entity matching a label, or None."""
+        query = normalize_label(label)
+        if not query:
+            return None
+
+        position = self._exact.get(query)
+        if position is not None:
+            return self._entities[position]
+
+        matches = self._containing(query) | self._contained_in(query)
+        if not matches:
+            return None
+        return self._entities[min(matches)]
+
+    def _containing(self, query: str) -> Set[int]:
+        """Positions of entities whose label contains the query."""
+        grams = _trigrams(query)
+        if not grams:
+            # Queries shorter than a trigram cannot use the index
+            return {i for i, label in enumerate(self._labels) if query in label}
+
+        postings = sorted((self._postings.get(gram, []) for gram in grams), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return candidates
+        return {i for i in candidates if query in self._labels[i]}
+
+    def _contained_in(self, query: str) -> Set[int]:
+        """Positions of entities whose label is contained in the query."""
+        hits: Dict[int, int] = {}
+        for gram in _trigrams(query):
+            for position in self._postings.get(gram, ()):
+                hits[position] = hits.get(position, 0) + 1
+
+        # An entity label can only be a substring if all its trigrams occur in the query
+        matches = {
+            position
+            for position, count in hits.items()
+            if count == self._gram_counts[position] and self._labels[position] in query
+        }
+        matches.update(i for i in self._short if self._labels[i] in query)
+        return matches
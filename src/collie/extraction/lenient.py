@@ -0,0 +1,206 @@
+"""
+Lenient parsing of structured LLM output.
+
+With strict parsing a single invalid item, such as one relationship with a
+malformed property code, fails validation of the whole response and the call
+has to be repeated. The lenient output type presents the model with the same
+JSON schema as CIDOCExtractionResult but accepts raw items, which are then
+validated one by one: valid items are kept and invalid ones are reported
+together with their validation errors.
+"""
+
+import json
+from typing import Annotated, Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, Field, ValidationError, WithJsonSchema
+
+from .llm_models import (
+    CIDOCEvent,
+    CIDOCExtractionResult,
+    CIDOCObject,
+    CIDOCPerson,
+    CIDOCPlace,
+    CIDOCRelationship,
+    CIDOCTime,
+)
+
+ITEM_MODELS: Dict[str, Type[BaseModel]] = {
+    "persons": CIDOCPerson,
+    "events": CIDOCEvent,
+    "places": CIDOCPlace,
+    "objects": CIDOCObject,
+    "times": CIDOCTime,
+    "relationships": CIDOCRelationship,
+}
+
+
+def _raw_items(item_model: Type[BaseModel]):
+    """Unvalidated list field advertising the item model's schema."""
+    return Annotated[
+        Any, WithJsonSchema({"type": "array", "items": item_model.model_json_schema()})
+    ]
+
+
+_Confidence = Annotated[
+    Any, WithJsonSchema({"type": "number", "minimum": 0.0, "maximum": 1.0})
+]
+_Count = Annotated[Any, WithJsonSchema({"type": "integer"})]
+
+
+class LenientCIDOCExtractionResult(BaseModel):
+    """Output type with the CIDOCExtractionResult schema whose items are validated locally."""
+
+    persons: _raw_items(CIDOCPerson) = Field(
+        default_factory=list, description="List of extracted persons (E21)"
+    )
+    events: _raw_items(CIDOCEvent) = Field(
+        default_factory=list, description="List of extracted events (E5)"
+    )
+    places: _raw_items(CIDOCPlace) = Field(
+        default_factory=list, description="List of extracted places (E53)"
+    )
+    objects: _raw_items(CIDOCObject) = Field(
+        default_factory=list, description="List of extracted objects (E22)"
+    )
+    times: _raw_items(CIDOCTime) = Field(
+        default_factory=list, description="List of extracted time periods (E52)"
+    )
+    relationships: _raw_items(CIDOCRelationship) = Field(
+        default_factory=list, description="List of extracted relationships"
+    )
+    extraction_confidence: _Confidence = Field(
+        None, description="Overall extraction confidence"
+    )
+    total_entities: _Count = Field(
+        None, description="Total number of entities extracted"
+    )
+    total_relationships: _Count = Field(
+        None, description="Total number of relationships extracted"
+    )
+
+
+class RejectedItem(BaseModel):
+    """An item of the LLM output that failed validation."""
+
+    field: str = Field(
+        ..., description="Output field the item belongs to, e.g. 'relationships'"
+    )
+    index: Optional[int] = Field(None, description="Position of the item in that field")
+    item: Any = Field(None, description="The raw item as returned by the model")
+    errors: List[str] = Field(
+        default_factory=list, description="Validation error messages"
+    )
+
+
+def _error_messages(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in e['loc']) or 'item'}: {e['msg']}"
+        for e in error.errors()
+    ]
+
+
+def parse_lenient(
+    raw: LenientCIDOCExtractionResult,
+) -> Tuple[CIDOCExtractionResult, List[RejectedItem]]:
+    """
+    Validate a lenient output item by item.
+
+    Args:
+        raw: Unvalidated structured output
+
+    Returns:
+        Tuple of a CIDOCExtractionResult holding every valid item and the list
+        of rejected items. Totals are recomputed from the kept items; an
+        invalid overall confidence is replaced by the mean entity confidence.
+    """
+    kept: Dict[str, List[BaseModel]] = {}
+    rejected: List[RejectedItem] = []
+    for field, item_model in ITEM_MODELS.items():
+        items = getattr(raw, field)
+        kept[field] = []
+        if items is None:
+            continue
+        if not isinstance(items, list):
+            rejected.append(
+                RejectedItem(field=field, item=items, errors=["expected a list"])
+            )
+            continue
+        for index, item in enumerate(items):
+            try:
+                kept[field].append(item_model.model_validate(item))
+            except ValidationError as e:
+                rejected.append(
+                    RejectedItem(
+                        field=field, index=index, item=item, errors=_error_messages(e)
+                    )
+                )
+
+    entities = [
+        e for field in ITEM_MODELS if field != "relationships" for e in kept[field]
+    ]
+    confidence = raw.extraction_confidence
+    if not isinstance(confidence, (int, float)) or not 0.0 <= confidence <= 1.0:
+        if confidence is not None:
+            rejected.append(
+                RejectedItem(
+                    field="extraction_confidence",
+                    item=confidence,
+                    errors=["expected a number between 0 and 1"],
+                )
+            )
+        confidence = (
+            sum(e.confidence for e in entities) / len(entities) if entities else 0.0
+        )
+
+    result = CIDOCExtractionResult(
+        **kept,
+        extraction_confidence=confidence,
+        total_entities=len(entities),
+        total_relationships=len(kept["relationships"]),
+    )
+    return result, rejected
+
+
+def _item_key(item: BaseModel) -> Tuple[str, ...]:
+    if isinstance(item, CIDOCRelationship):
+        return (item.source_label, item.property_code, item.target_label)
+    return (item.label,)
+
+
+def extend_result(
+    base: CIDOCExtractionResult, extra: CIDOCExtractionResult
+) -> CIDOCExtractionResult:
+    """Append the new items of ``extra`` to ``base``, keeping the base confidence."""
+    items = {}
+    for field in ITEM_MODELS:
+        existing = getattr(base, field)
+        seen = {_item_key(item) for item in existing}
+        items[field] = existing + [
+            item for item in getattr(extra, field) if _item_key(item) not in seen
+        ]
+    return CIDOCExtractionResult(
+        **items,
+        extraction_confidence=base.extraction_confidence,
+        total_entities=sum(len(v) for k, v in items.items() if k != "relationships"),
+        total_relationships=len(items["relationships"]),
+    )
+
+
+def create_reask_prompt(text: str, rejected: List[RejectedItem]) -> str:
+    """Prompt asking the model to correct only the rejected items."""
+    listing = "\n".join(
+        f"- {r.field}[{r.index}]: {json.dumps(r.item, default=str)}\n  errors: {'; '.join(r.errors)}"
+        for r in rejected
+        if r.index is not None
+    )
+    return f"""
+Some items you extracted from the text below failed validation.
+Return corrected versions of only these items, in the same output structure,
+fixing the listed errors. Leave out any item that cannot be corrected and do
+not repeat items that were not listed.
+
+Text: {text}
+
+Rejected items:
+{listing}
+"""
@@ -0,0 +1,167 @@
+"""
+Persistent entity linking across extraction runs.
+
+Every extraction mints fresh UUIDs, so the same person extracted from two
+documents becomes two graph nodes. The linking index stores, for every
+entity it has seen, a blocking key (CIDOC class and normalized label) and a
+key year, and maps them to a canonical UUID. The extractor consults it when
+converting model output, so known entities keep their IDs from run to run.
+"""
+
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from uuid import UUID
+
+from .models import ExtractedEntity
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_YEAR = re.compile(r"\b(\d{3,4})\b")
+
+# Entity fields whose year tells apart entities sharing a label
+KEY_DATE_FIELDS = (
+    "birth_date",
+    "start_date",
+    "creation_date",
+    "death_date",
+    "end_date",
+)
+
+
+def blocking_key(class_code: str, label: str) -> str:
+    """Class code and case-, punctuation- and whitespace-normalized label."""
+    return f"{class_code}|{' '.join(_PUNCTUATION.sub(' ', label.lower()).split())}"
+
+
+def key_year(entity: ExtractedEntity) -> Optional[str]:
+    """Year of the entity's first known key date, if any."""
+    for field in KEY_DATE_FIELDS:
+        value = getattr(entity, field, None) or entity.properties.get(field)
+        if value:
+            match = _YEAR.search(str(value))
+            if match:
+                return match.group(1)
+    return None
+
+
+class EntityLinkingIndex:
+    """
+    SQLite-backed index mapping entity keys to canonical UUIDs.
+
+    Lookups go through an indexed blocking key, so their cost does not grow
+    with the number of documents processed. Entities sharing a blocking key
+    are told apart by their key year: an entity links to a known one whose
+    year is equal or unknown, and otherwise gets a new canonical ID.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open (or create) a linking index.
+
+        Args:
+            path: SQLite database file, or ":memory:" for a process-local index
+        """
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.linked = 0
+        self.created = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entities (
+                id TEXT PRIMARY KEY,
+                block_key TEXT NOT NULL,
+                class_code TEXT NOT NULL,
+                label TEXT NOT NULL,
+                year TEXT
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entities_block_key ON entities (block_key)"
+        )
+        self._conn.commit()
+
+    def _match(
+        self, key: str, year: Optional[str]
+    ) -> Optional[Tuple[str, Optional[str]]]:
+        rows = self._conn.execute(
+            "SELECT id, year FROM entities WHERE block_key = ? ORDER BY rowid", (key,)
+        ).fetchall()
+        for row in rows:
+            if year is not None and row[1] == year:
+                return row
+        for row in rows:
+            if year is None or row[1] is None:
+                return row
+        return None
+
+    def lookup(self, entity: ExtractedEntity) -> Optional[UUID]:
+        """Canonical ID of a known entity matching ``entity``, or None."""
+        with self._lock:
+            row = self._match(
+                blocking_key(entity.class_code, entity.label), key_year(entity)
+            )
+        return UUID(row[0]) if row is not None else None
+
+    def link(self, entities: List[ExtractedEntity]) -> Dict[UUID, UUID]:
+        """
+        Give entities their canonical IDs, registering unknown ones.
+
+        IDs are replaced in place. A known entity whose year was unknown
+        adopts the year of the entity linked to it.
+
+        Returns:
+            Mapping from each entity's previous ID to its canonical ID
+        """
+        remap = {}
+        with self._lock:
+            for entity in entities:
+                key = blocking_key(entity.class_code, entity.label)
+                year = key_year(entity)
+                row = self._match(key, year)
+                if row is None:
+                    self._conn.execute(
+                        """
+                        INSERT OR IGNORE INTO entities (id, block_key, class_code, label, year)
+                        VALUES (?, ?, ?, ?, ?)
+                        """,
+                        (str(entity.id), key, entity.class_code, entity.label, year),
+                    )
+                    self.created += 1
+                    remap[entity.id] = entity.id
+                    continue
+
+                canonical = UUID(row[0])
+                if row[1] is None and year is not None:
+                    self._conn.execute(
+                        "UPDATE entities SET year = ? WHERE id = ?", (year, row[0])
+                    )
+                self.linked += 1
+                remap[entity.id] = canonical
+                entity.id = canonical
+            self._conn.commit()
+        return remap
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM entities").fetchone()
+        return count
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Number of known entities and how many lookups reused an ID."""
+        lookups = self.linked + self.created
+        return {
+            "entities": len(self),
+            "linked": self.linked,
+            "created": self.created,
+            "link_rate": self.linked / lookups if lookups else 0.0,
+        }
@@ -6,7 +6,7 @@ ensuring compliance with CIDOC CRM standards.
 """
 
 from typing import List, Optional, Dict, Any, Literal
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, field_validator
 import uuid
 
 
@@ -23,7 +23,8 @@ class CIDOCPerson(BaseModel):
     confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence score")
     source_text: str = Field(..., description="Relevant text snippet")
     
-    @validator('confidence')
+    @field_validator('confidence')
+    @classmethod
     def validate_confidence(cls, v):
         if not 0.0 <= v <= 1.0:
             raise ValueError('Confidence must be between 0.0 and 1.0')
@@ -43,7 +44,8 @@ class CIDOCEvent(BaseModel):
     confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence score")
     source_text: str = Field(..., description="Relevant text snippet")
     
-    @validator('confidence')
+    @field_validator('confidence')
+    @classmethod
     def validate_confidence(cls, v):
         if not 0.0 <= v <= 1.0:
             raise ValueError('Confidence must be between 0.0 and 1.0')
@@ -61,7 +63,8 @@ class CIDOCPlace(BaseModel):
     confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence score")
     source_text: str = Field(..., description="Relevant text snippet")
     
-    @validator('confidence')
+    @field_validator('confidence')
+    @classmethod
     def validate_confidence(cls, v):
         if not 0.0 <= v <= 1.0:
             raise ValueError('Confidence must be between 0.0 and 1.0')
@@ -79,7 +82,8 @@ class CIDOCObject(BaseModel):
     confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence score")
     source_text: str = Field(..., description="Relevant text snippet")
     
-    @validator('confidence')
+    @field_validator('confidence')
+    @classmethod
     def validate_confidence(cls, v):
         if not 0.0 <= v <= 1.0:
             raise ValueError('Confidence must be between 0.0 and 1.0')
@@ -96,7 +100,8 @@ class CIDOCTime(BaseModel):
     confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence score")
     source_text: str = Field(..., description="Relevant text snippet")
     
-    @validator('confidence')
+    @field_validator('confidence')
+    @classmethod
     def validate_confidence(cls, v):
         if not 0.0 <= v <= 1.0:
             raise ValueError('Confidence must be between 0.0 and 1.0')
@@ -113,13 +118,15 @@ class CIDOCRelationship(BaseModel):
     confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence score")
     source_text: str = Field(..., description="Relevant text snippet")
     
-    @validator('property_code')
+    @field_validator('property_code')
+    @classmethod
     def validate_property_code(cls, v):
         if not v.startswith('P'):
             raise ValueError('Property code must start with P')
         return v
     
-    @validator('confidence')
+    @field_validator('confidence')
+    @classmethod
     def validate_confidence(cls, v):
         if not 0.0 <= v <= 1.0:
             raise ValueError('Confidence must be between 0.0 and 1.0')
@@ -140,13 +147,51 @@ class CIDOCExtractionResult(BaseModel):
     total_entities: int = Field(..., description="Total number of entities extracted")
     total_relationships: int = Field(..., description="Total number of relationships extracted")
     
-    @validator('extraction_confidence')
+    @field_validator('extraction_confidence')
+    @classmethod
     def validate_confidence(cls, v):
         if not 0.0 <= v <= 1.0:
             raise ValueError('Confidence must be between 0.0 and 1.0')
         return v
 
 
+class CIDOCDocumentExtraction(CIDOCExtractionResult):
+    """Extraction result for one document of a packed request."""
+    document_id: int = Field(..., description="ID of the document the entities were extracted from")
+
+
+class CIDOCPackedExtractionResult(BaseModel):
+    """Structured result for a request bundling several documents."""
+    documents: List[CIDOCDocumentExtraction] = Field(
+        default_factory=list, description="One extraction result per input document"
+    )
+
+
+class CIDOCLinkedRelationship(BaseModel):
+    """Relationship between two entities of a roster, referenced by roster ID."""
+    source_id: int = Field(..., description="Roster ID of the source entity")
+    target_id: int = Field(..., description="Roster ID of the target entity")
+    property_code: str = Field(..., description="CIDOC CRM property code (P-code)")
+    property_label: str = Field(..., description="Human-readable property label")
+    description: str = Field(..., description="Relationship description")
+    confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence score")
+    source_text: str = Field(..., description="Relevant text snippet")
+    
+    @field_validator('property_code')
+    @classmethod
+    def validate_property_code(cls, v):
+        if not v.startswith('P'):
+            raise ValueError('Property code must start with P')
+        return v
+
+
+class CIDOCLinkingResult(BaseModel):
+    """Structured result of the relationship pass over an entity roster."""
+    relationships: List[CIDOCLinkedRelationship] = Field(
+        default_factory=list, description="Relationships between roster entities"
+    )
+
+
 # CIDOC CRM Property Code Mappings
 CIDOC_PROPERTIES = {
     # Person properties
@@ -0,0 +1,146 @@
+"""
+Map/reduce extraction of long documents.
+
+Chunked extraction only finds relationships whose endpoints appear in the
+same window. In map/reduce mode the windows are still extracted in parallel
+(the map phase), and one more call (the reduce phase) sees a compact roster
+of every entity found, labels and short IDs only, together with the
+sentences of the document that mention them. The model then links entities
+across the whole document without receiving the whole document.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+from .llm_models import CIDOCLinkingResult
+from .merging import normalize_label
+from .models import ExtractedEntity, ExtractedRelationship
+from .offsets import Span, sentence_spans
+
+DEFAULT_CONTEXT_CHARS = 12000
+
+
+class EntityRoster:
+    """Entities of a document numbered with short IDs for the reduce prompt."""
+
+    def __init__(self, entities: List[ExtractedEntity]):
+        self.entities = list(entities)
+        self._by_label: Dict[str, List[int]] = {}
+        for roster_id, entity in enumerate(self.entities, start=1):
+            self._by_label.setdefault(normalize_label(entity.label), []).append(
+                roster_id
+            )
+        labels = sorted(
+            (label for label in self._by_label if label), key=len, reverse=True
+        )
+        self._pattern = (
+            re.compile(
+                r"\b(?:" + "|".join(re.escape(label) for label in labels) + r")\b",
+                re.IGNORECASE,
+            )
+            if labels
+            else None
+        )
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def entity(self, roster_id: int) -> Optional[ExtractedEntity]:
+        """Entity with a roster ID, or None for an unknown ID."""
+        if 1 <= roster_id <= len(self.entities):
+            return self.entities[roster_id - 1]
+        return None
+
+    def mentions(self, text: str) -> List[int]:
+        """Roster IDs of the entities whose label occurs in ``text``."""
+        if self._pattern is None:
+            return []
+        found: Dict[int, None] = {}
+        for match in self._pattern.finditer(text):
+            for roster_id in self._by_label.get(normalize_label(match.group()), ()):
+                found[roster_id] = None
+        return list(found)
+
+    def format(self) -> str:
+        """One ``ID | class | label`` line per entity."""
+        return "\n".join(
+            f"{roster_id} | {entity.class_code} | {entity.label}"
+            for roster_id, entity in enumerate(self.entities, start=1)
+        )
+
+
+def select_context(
+    document: str, roster: EntityRoster, max_chars: int = DEFAULT_CONTEXT_CHARS
+) -> List[Span]:
+    """
+    Pick the sentences the reduce phase needs to see.
+
+    Only sentences mentioning at least one roster entity qualify. Sentences
+    mentioning more distinct entities are preferred until ``max_chars`` is
+    reached; the selection is returned in document order.
+    """
+    candidates = []
+    for start, end in sentence_spans(document):
+        mentioned = len(roster.mentions(document[start:end]))
+        if mentioned:
+            candidates.append((mentioned, start, end))
+
+    selected = []
+    used = 0
+    for _mentioned, start, end in sorted(candidates, key=lambda c: (-c[0], c[1])):
+        if used + end - start > max_chars:
+            continue
+        selected.append((start, end))
+        used += end - start
+    return sorted(selected)
+
+
+def create_reduce_prompt(
+    document: str, roster: EntityRoster, context: List[Span]
+) -> str:
+    """Prompt asking for relationships between roster entities."""
+    passages = "\n".join(
+        f"[{i}] {' '.join(document[start:end].split())}"
+        for i, (start, end) in enumerate(context, start=1)
+    )
+    return f"""
+The entities below were extracted from different parts of one document.
+Using the passages from that document, identify CIDOC CRM relationships
+between the entities, in particular between entities that are mentioned in
+different passages. Refer to entities only by their numeric ID from the list,
+and use proper CIDOC CRM property codes (P-codes).
+
+Entities (ID | CIDOC class | label):
+{roster.format()}
+
+Passages:
+{passages}
+"""
+
+
+def resolve_linked_relationships(
+    roster: EntityRoster, linking: CIDOCLinkingResult
+) -> List[ExtractedRelationship]:
+    """Relationships of a reduce response; links to unknown IDs or to the same entity are dropped."""
+    relationships = []
+    for rel in linking.relationships:
+        source = roster.entity(rel.source_id)
+        target = roster.entity(rel.target_id)
+        if source is None or target is None or source.id == target.id:
+            continue
+        relationships.append(
+            ExtractedRelationship(
+                source_id=source.id,
+                target_id=target.id,
+                property_code=rel.property_code,
+                property_label=rel.property_label,
+                confidence=rel.confidence,
+                source_text=rel.source_text,
+                properties={
+                    "description": rel.description,
+                    "extraction_method": "llm_map_reduce",
+                    "cidoc_property": rel.property_code,
+                },
+            )
+        )
+    return relationships
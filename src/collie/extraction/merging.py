@@ -0,0 +1,119 @@
+"""
+Merging of partial extraction results.
+
+Chunked extraction produces one ExtractionResult per window. Because windows
+overlap, the same entity is usually extracted more than once; the merger
+collapses those duplicates and rewrites relationship endpoints accordingly.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from .models import ExtractedEntity, ExtractedRelationship, ExtractionResult
+
+
+def normalize_label(label: str) -> str:
+    """Normalize a label for duplicate detection."""
+    return " ".join(label.lower().split())
+
+
+class ResultMerger:
+    """
+    Incrementally merge ExtractionResults into a single deduplicated result.
+
+    Entities are considered duplicates when they share a CIDOC class code and
+    a normalized label. The first occurrence keeps its ID; later duplicates are
+    mapped onto it. Relationships are deduplicated on
+    (source, property, target) after their endpoints have been remapped.
+    The merger works on copies, so the results it is given are not modified.
+    """
+
+    def __init__(self):
+        self._entities: Dict[Tuple[str, str], ExtractedEntity] = {}
+        self._relationships: Dict[Tuple[UUID, str, UUID], ExtractedRelationship] = {}
+        self._id_map: Dict[UUID, UUID] = {}
+        self._relationship_id_map: Dict[UUID, UUID] = {}
+
+    @property
+    def id_map(self) -> Dict[UUID, UUID]:
+        """Mapping from every merged entity ID to its canonical ID."""
+        return self._id_map
+
+    @property
+    def relationship_id_map(self) -> Dict[UUID, UUID]:
+        """Mapping from every merged relationship ID to its canonical ID."""
+        return self._relationship_id_map
+
+    def add(self, result: ExtractionResult) -> ExtractionResult:
+        """
+        Merge one partial result.
+
+        Args:
+            result: Partial extraction result, e.g. from one chunk
+
+        Returns:
+            ExtractionResult holding only the entities and relationships that
+            were new to the merger, with endpoints already remapped.
+        """
+        new_entities = []
+        for entity in result.entities:
+            key = (entity.class_code, normalize_label(entity.label))
+            existing = self._entities.get(key)
+            if existing is None:
+                # Merged entities are updated later; leave the caller's intact
+                entity = entity.model_copy()
+                self._entities[key] = entity
+                self._id_map[entity.id] = entity.id
+                new_entities.append(entity)
+                continue
+
+            self._id_map[entity.id] = existing.id
+            if entity.confidence > existing.confidence:
+                existing.confidence = entity.confidence
+            if not existing.description and entity.description:
+                existing.description = entity.description
+
+        new_relationships = []
+        for rel in result.relationships:
+            source_id = self._id_map.get(rel.source_id, rel.source_id)
+            target_id = self._id_map.get(rel.target_id, rel.target_id)
+            key = (source_id, rel.property_code, target_id)
+            existing = self._relationships.get(key)
+            if existing is not None:
+                existing.confidence = max(existing.confidence, rel.confidence)
+                self._relationship_id_map[rel.id] = existing.id
+                continue
+
+            rel = rel.model_copy(
+                update={"source_id": source_id, "target_id": target_id}
+            )
+            self._relationships[key] = rel
+            self._relationship_id_map[rel.id] = rel.id
+            new_relationships.append(rel)
+
+        return ExtractionResult(
+            entities=new_entities,
+            relationships=new_relationships,
+            extraction_metadata=dict(result.extraction_metadata),
+        )
+
+    def result(
+        self, extraction_metadata: Optional[Dict[str, Any]] = None
+    ) -> ExtractionResult:
+        """Build the merged result from everything added so far."""
+        return ExtractionResult(
+            entities=list(self._entities.values()),
+            relationships=list(self._relationships.values()),
+            extraction_metadata=extraction_metadata or {},
+        )
+
+
+def merge_results(
+    results: List[ExtractionResult],
+    extraction_metadata: Optional[Dict[str, Any]] = None,
+) -> ExtractionResult:
+    """Merge several partial results, in order, into one deduplicated result."""
+    merger = ResultMerger()
+    for result in results:
+        merger.add(result)
+    return merger.result(extraction_metadata)
@@ -5,7 +5,7 @@ These models define the structure for extracting CIDOC CRM entities and relation
 from unstructured text using AI-powered analysis.
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 from uuid import UUID, uuid4
 
 from pydantic import BaseModel, Field
@@ -20,6 +20,9 @@ class ExtractedEntity(BaseModel):
     description: Optional[str] = Field(None, description="Detailed description")
     confidence: float = Field(0.0, ge=0.0, le=1.0, description="Extraction confidence score")
     source_text: Optional[str] = Field(None, description="Original text snippet")
+    source_span: Optional[Tuple[int, int]] = Field(
+        None, description="(start, end) character offsets into the result's source document"
+    )
     properties: Dict[str, Any] = Field(default_factory=dict, description="Additional properties")
 
 
@@ -33,6 +36,9 @@ class ExtractedRelationship(BaseModel):
     property_label: str = Field(..., description="Human-readable property label")
     confidence: float = Field(0.0, ge=0.0, le=1.0, description="Extraction confidence score")
     source_text: Optional[str] = Field(None, description="Original text snippet")
+    source_span: Optional[Tuple[int, int]] = Field(
+        None, description="(start, end) character offsets into the result's source document"
+    )
     properties: Dict[str, Any] = Field(default_factory=dict, description="Additional properties")
 
 
@@ -42,6 +48,20 @@ class ExtractionResult(BaseModel):
     entities: List[ExtractedEntity] = Field(default_factory=list)
     relationships: List[ExtractedRelationship] = Field(default_factory=list)
     extraction_metadata: Dict[str, Any] = Field(default_factory=dict)
+    source_document: Optional[str] = Field(
+        None, description="Shared source text that source spans point into"
+    )
+    
+    def source_text_of(
+        self, item: Union[ExtractedEntity, ExtractedRelationship]
+    ) -> Optional[str]:
+        """Get the source snippet of an entity or relationship, from its span if needed."""
+        if item.source_text is not None:
+            return item.source_text
+        if item.source_span is None or self.source_document is None:
+            return None
+        start, end = item.source_span
+        return self.source_document[start:end]
     
     def get_entities_by_class(self, class_code: str) -> List[ExtractedEntity]:
         """Get all entities of a specific CRM class."""
@@ -0,0 +1,119 @@
+"""
+Source offsets for extracted entities and relationships.
+
+In offsets mode the LLM returns a short verbatim anchor instead of a full
+source snippet. Anchors are resolved locally to (start, end) character spans
+of the sentence they occur in, and the result keeps a single shared copy of
+the source document instead of one snippet per entity and relationship.
+"""
+
+import bisect
+import re
+from typing import List, Optional, Tuple
+
+from .models import ExtractionResult
+
+Span = Tuple[int, int]
+
+_SENTENCE_END = re.compile(r"[.!?](?=\s)|\n\s*\n")
+
+
+def sentence_spans(document: str) -> List[Span]:
+    """Spans of the sentences of a document, without leading whitespace or blank ones."""
+    spans = []
+    start = 0
+    for end in [m.end() for m in _SENTENCE_END.finditer(document)] + [len(document)]:
+        while start < end and document[start].isspace():
+            start += 1
+        if start < end:
+            spans.append((start, end))
+        start = end
+    return spans
+
+
+class AnchorResolver:
+    """Resolve short anchors to sentence spans in one source document."""
+
+    def __init__(self, document: str):
+        self.document = document
+        # Whitespace-collapsed, case-folded copy with a map back to document offsets
+        chars: List[str] = []
+        self._positions: List[int] = []
+        previous_space = True
+        for position, char in enumerate(document):
+            if char.isspace():
+                if previous_space:
+                    continue
+                char = " "
+            previous_space = char == " "
+            chars.append(char.lower())
+            self._positions.append(position)
+        self._normalized = "".join(chars)
+        self._sentence_ends = [m.end() for m in _SENTENCE_END.finditer(document)]
+
+    def resolve(self, anchor: Optional[str]) -> Optional[Span]:
+        """Span of the sentence containing ``anchor``, or None if it does not occur."""
+        if not anchor or not anchor.strip():
+            return None
+
+        start = self.document.find(anchor)
+        if start >= 0:
+            end = start + len(anchor)
+        else:
+            query = " ".join(anchor.lower().split())
+            found = self._normalized.find(query)
+            if found < 0:
+                return None
+            start = self._positions[found]
+            end = self._positions[found + len(query) - 1] + 1
+        return self._sentence_span(start, end)
+
+    def _sentence_span(self, start: int, end: int) -> Span:
+        i = bisect.bisect_right(self._sentence_ends, start)
+        sentence_start = self._sentence_ends[i - 1] if i else 0
+        j = bisect.bisect_left(self._sentence_ends, end)
+        sentence_end = (
+            self._sentence_ends[j]
+            if j < len(self._sentence_ends)
+            else len(self.document)
+        )
+        while sentence_start < start and self.document[sentence_start].isspace():
+            sentence_start += 1
+        return sentence_start, max(sentence_end, end)
+
+
+def anchor_spans(result: ExtractionResult, document: str) -> ExtractionResult:
+    """
+    Replace anchor snippets with source spans, in place.
+
+    Each entity's and relationship's ``source_text`` is treated as an anchor
+    and resolved to a span; entities whose anchor cannot be found fall back to
+    their label. The result keeps ``document`` as its shared source.
+    """
+    resolver = AnchorResolver(document)
+    for entity in result.entities:
+        entity.source_span = resolver.resolve(entity.source_text) or resolver.resolve(
+            entity.label
+        )
+        entity.source_text = None
+    for rel in result.relationships:
+        rel.source_span = resolver.resolve(rel.source_text)
+        rel.source_text = None
+    result.source_document = document
+    return result
+
+
+def shift_spans(result: ExtractionResult, offset: int) -> ExtractionResult:
+    """
+    Rebase the spans of a partial result onto a larger document, in place.
+
+    Used when a result was extracted from a slice of the document starting at
+    ``offset``; the slice-local source document is dropped.
+    """
+    if offset:
+        for item in (*result.entities, *result.relationships):
+            if item.source_span is not None:
+                start, end = item.source_span
+                item.source_span = (start + offset, end + offset)
+    result.source_document = None
+    return result
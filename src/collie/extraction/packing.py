@@ -0,0 +1,65 @@
+"""
+Packing of many small documents into a single extraction request.
+
+Short records such as catalogue cards are dwarfed by the system prompt and
+extraction instructions sent with every call. Packing groups consecutive
+documents into batches that fit a token budget so one call extracts them all.
+"""
+
+import re
+from typing import List, Sequence
+
+CHARS_PER_TOKEN = 4
+DEFAULT_PACK_TOKENS = 6000
+DEFAULT_PACK_DOCUMENTS = 25
+
+DOCUMENT_PATTERN = re.compile(r'<document id="(\d+)">\n(.*?)\n</document>', re.DOTALL)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a text, without a tokenizer."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def pack_documents(
+    texts: Sequence[str],
+    max_tokens: int = DEFAULT_PACK_TOKENS,
+    max_documents: int = DEFAULT_PACK_DOCUMENTS,
+) -> List[List[int]]:
+    """
+    Group documents into batches, preserving order.
+
+    Args:
+        texts: Documents to pack
+        max_tokens: Estimated token budget for the document text of one batch
+        max_documents: Maximum number of documents per batch
+
+    Returns:
+        Lists of document indices, one per batch. A document larger than the
+        budget gets a batch of its own.
+    """
+    if max_tokens <= 0 or max_documents <= 0:
+        raise ValueError("max_tokens and max_documents must be positive")
+
+    batches: List[List[int]] = []
+    batch: List[int] = []
+    batch_tokens = 0
+    for index, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if batch and (
+            batch_tokens + tokens > max_tokens or len(batch) >= max_documents
+        ):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(index)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def format_documents(texts: Sequence[str]) -> str:
+    """Render documents with numbered delimiters for a packed prompt."""
+    return "\n\n".join(
+        f'<document id="{i}">\n{text}\n</document>' for i, text in enumerate(texts)
+    )
@@ -0,0 +1,233 @@
+"""
+Throttling and retry utilities for LLM extraction calls.
+
+Provides a token-bucket rate limiter, a jittered exponential backoff retry
+policy used by the batch extraction API, and an AIMD concurrency limiter that
+adapts the number of in-flight model calls to the provider's capacity.
+"""
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Union
+
+import httpx
+from pydantic_ai.exceptions import ModelHTTPError
+
+TRANSIENT_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+OVERLOAD_STATUS_CODES = frozenset({429, 503, 529})
+
+
+class TokenBucket:
+    """
+    Asynchronous token-bucket rate limiter.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    Each call to :meth:`acquire` waits until enough tokens are available.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate: Tokens added per second (e.g. requests per second)
+            capacity: Maximum burst size. Defaults to ``max(rate, 1)``.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until ``tokens`` tokens are available and consume them."""
+        if tokens > self.capacity:
+            raise ValueError("cannot acquire more tokens than the bucket capacity")
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
+
+
+class RetryPolicy:
+    """Jittered exponential backoff for transient failures."""
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+    ):
+        """
+        Initialize the retry policy.
+
+        Args:
+            max_retries: Retries after the first attempt
+            base_delay: Backoff ceiling for the first retry, in seconds
+            max_delay: Upper bound on any single backoff, in seconds
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        """Return a "full jitter" delay for the given retry attempt (0-based)."""
+        ceiling = min(self.max_delay, self.base_delay * (2**attempt))
+        return random.uniform(0.0, ceiling)  # noqa: S311 - jitter, not crypto
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        """Whether a failed attempt should be retried."""
+        return attempt < self.max_retries and is_transient_error(error)
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Whether an error is worth retrying.
+
+    Rate limiting, server-side failures, timeouts and connection problems are
+    transient; validation errors and bad requests are not.
+    """
+    if isinstance(error, ModelHTTPError):
+        return error.status_code in TRANSIENT_STATUS_CODES
+    return isinstance(error, (httpx.TransportError, TimeoutError, ConnectionError))
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Whether an error signals that the provider is rate limiting or overloaded."""
+    return (
+        isinstance(error, ModelHTTPError) and error.status_code in OVERLOAD_STATUS_CODES
+    )
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD limiter for concurrent model calls.
+
+    The limit grows additively (by roughly one slot per ``limit`` successful
+    calls) while call latency stays within ``latency_tolerance`` times its
+    long-run baseline, and is cut multiplicatively by ``decrease_factor``
+    when a call fails with a rate-limit or overload response. Only the first
+    overload of a window shrinks the limit; calls that started before the
+    last decrease do not shrink it again.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            initial_limit: Concurrency limit to start with
+            min_limit: Lower bound on the limit
+            max_limit: Upper bound on the limit
+            decrease_factor: Multiplier applied to the limit on overload
+            latency_tolerance: Ratio of recent to baseline latency above
+                which the limit stops growing
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError(
+                "limits must satisfy 1 <= min_limit <= initial_limit <= max_limit"
+            )
+        if not 0.0 < decrease_factor < 1.0:
+            raise ValueError("decrease_factor must be between 0 and 1")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self._limit = float(initial_limit)
+        self._epoch = 0
+        self._condition = asyncio.Condition()
+        self.in_flight = 0
+        self.waiting = 0
+        self.requests = 0
+        self.successes = 0
+        self.errors = 0
+        self.overloads = 0
+        self.latency_baseline: Optional[float] = None
+        self.latency_recent: Optional[float] = None
+
+    @property
+    def limit(self) -> int:
+        """Current number of calls allowed in flight."""
+        return int(self._limit)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one concurrency slot for the duration of a model call."""
+        async with self._condition:
+            self.waiting += 1
+            try:
+                await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+            self.requests += 1
+            epoch = self._epoch
+
+        start = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self._on_error(e, epoch)
+            raise
+        else:
+            self._on_success(time.monotonic() - start)
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def _on_success(self, latency: float) -> None:
+        self.successes += 1
+        if self.latency_baseline is None:
+            self.latency_baseline = self.latency_recent = latency
+        else:
+            self.latency_recent = 0.7 * self.latency_recent + 0.3 * latency
+            self.latency_baseline = 0.95 * self.latency_baseline + 0.05 * latency
+        if self.latency_recent <= self.latency_tolerance * self.latency_baseline:
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+    def _on_error(self, error: BaseException, epoch: int) -> None:
+        self.errors += 1
+        if not is_overload_error(error):
+            return
+        self.overloads += 1
+        if epoch == self._epoch:
+            self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+            self._epoch += 1
+
+    def metrics(self) -> Dict[str, Union[int, float, None]]:
+        """Current limit, queue depth, error rates and latency estimates."""
+        finished = self.successes + self.errors
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "requests": self.requests,
+            "successes": self.successes,
+            "errors": self.errors,
+            "overloads": self.overloads,
+            "error_rate": self.errors / finished if finished else 0.0,
+            "overload_rate": self.overloads / finished if finished else 0.0,
+            "latency_baseline": self.latency_baseline,
+            "latency_recent": self.latency_recent,
+        }
@@ -0,0 +1,94 @@
+"""
+Token and latency accounting for model calls.
+
+Backends report the tokens of each request with :func:`record_usage`. The
+report goes to every enclosing :func:`track_usage` scope, so an extraction,
+a document in a batch and a whole job can each total the calls made on their
+behalf, including retries, re-asks and hedged duplicates. Scopes follow
+asyncio tasks through context variables and need no explicit plumbing.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from pydantic import BaseModel, Field
+
+
+class Usage(BaseModel):
+    """Tokens, requests and model time spent on one or more calls."""
+
+    requests: int = Field(0, description="Model requests sent")
+    input_tokens: int = Field(
+        0, description="Prompt tokens, including the system prompt"
+    )
+    output_tokens: int = Field(0, description="Completion tokens")
+    llm_seconds: float = Field(
+        0.0, description="Wall-clock time spent waiting for the model"
+    )
+    estimated: bool = Field(
+        False,
+        description="Whether some token counts were estimated rather than reported",
+    )
+
+    @property
+    def total_tokens(self) -> int:
+        """Input and output tokens together."""
+        return self.input_tokens + self.output_tokens
+
+    def add(self, other: "Usage") -> "Usage":
+        """Add another usage to this one, in place."""
+        self.requests += other.requests
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.llm_seconds += other.llm_seconds
+        self.estimated = self.estimated or other.estimated
+        return self
+
+    @classmethod
+    def from_metadata(cls, metadata: Dict[str, Any]) -> "Usage":
+        """Usage stored in an ExtractionResult's metadata; empty if there is none."""
+        return cls.model_validate(metadata.get("usage") or {})
+
+
+_current_usage: ContextVar[Optional[Usage]] = ContextVar("collie_usage", default=None)
+
+
+def current_usage() -> Optional[Usage]:
+    """The innermost usage scope, or None outside any scope."""
+    return _current_usage.get()
+
+
+def record_usage(
+    input_tokens: int, output_tokens: int, requests: int = 1, estimated: bool = False
+) -> None:
+    """Report the tokens of a model request to the current scope, if any."""
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.add(
+            Usage(
+                requests=requests,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                estimated=estimated,
+            )
+        )
+
+
+@contextmanager
+def track_usage() -> Iterator[Usage]:
+    """
+    Collect the usage of every call made inside the block.
+
+    The collected usage is also added to the enclosing scope when the block
+    exits, whether or not it raised.
+    """
+    usage = Usage()
+    outer = _current_usage.get()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+        if outer is not None:
+            outer.add(usage)
@@ -127,7 +127,7 @@ def _render_detailed(
     body_lines = []
 
     # Add all non-empty fields
-    for field_name, field_value in entity.dict().items():
+    for field_name, field_value in entity.model_dump().items():
         if field_value and field_name not in ["id", "class_code"]:
             friendly_name = _get_friendly_property_name(field_name, aliases)
             formatted_value = _format_uuid_for_display(field_value)
@@ -47,7 +47,7 @@ def entities_to_networkx(
         }
         
         if include_all_attributes:
-            entity_dict = entity.dict()
+            entity_dict = entity.model_dump()
             for key, value in entity_dict.items():
                 if key not in [node_id_field, "class_code"]:
                     node_data[key] = value
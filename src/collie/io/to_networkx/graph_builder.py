@@ -58,7 +58,7 @@ def to_networkx_graph(
                 "type": entity.type,
             })
             # Add any additional attributes
-            for key, value in entity.dict().items():
+            for key, value in entity.model_dump().items():
                 if key not in ["id", "class_code", "label", "notes", "type"]:
                     node_data[key] = value
         
@@ -235,6 +235,7 @@ def extraction_result_to_networkx(
     *,
     min_confidence: float = 0.5,
     include_relationships: bool = True,
+    graph: Optional[nx.DiGraph] = None,
 ) -> nx.Graph:
     """
     Convert an extraction result to a NetworkX graph.
@@ -243,11 +244,14 @@ def extraction_result_to_networkx(
         extraction_result: Result from AI extraction
         min_confidence: Minimum confidence threshold for including entities
         include_relationships: Whether to include relationships as edges
+        graph: Existing graph to extend, e.g. when consuming the partial
+            results of ``InformationExtractor.extract_stream()``
         
     Returns:
         NetworkX graph from extraction result
     """
-    graph = nx.DiGraph()
+    if graph is None:
+        graph = nx.DiGraph()
     
     # Add high-confidence entities as nodes
     for entity in extraction_result.entities:
@@ -258,7 +262,7 @@ def extraction_result_to_networkx(
                 label=entity.label,
                 description=entity.description,
                 confidence=entity.confidence,
-                source_text=entity.source_text,
+                source_text=extraction_result.source_text_of(entity),
                 **entity.properties
             )
     
@@ -275,7 +279,7 @@ def extraction_result_to_networkx(
                     property_code=rel.property_code,
                     property_label=rel.property_label,
                     confidence=rel.confidence,
-                    source_text=rel.source_text,
+                    source_text=extraction_result.source_text_of(rel),
                     **rel.properties
                 )
     
@@ -9,11 +9,29 @@ import argparse
 import asyncio
 import os
 import sys
+import time
 from pathlib import Path
 
 from dotenv import load_dotenv
 
-from collie.extraction import InformationExtractor
+from collie.extraction import (
+    BudgetScheduler,
+    CascadeBackend,
+    EntityLinkingIndex,
+    ExtractionCache,
+    HedgedBackend,
+    InformationExtractor,
+    PoolBackend,
+    PoolMember,
+    RecordingBackend,
+    ReplayBackend,
+    SegmentPrefilter,
+    StubBackend,
+    load_gazetteer,
+)
+from collie.extraction.chunking import DEFAULT_CHUNK_CHARS
+from collie.extraction.jobs import ExtractionJob
+from collie.extraction.throttling import AdaptiveConcurrencyLimiter
 from collie.io.to_markdown import to_markdown, MarkdownStyle, render_table
 from collie.io.to_networkx import to_networkx_graph, calculate_centrality_measures, find_communities
 from collie.visualization import plot_network_graph, create_network_summary
@@ -22,10 +40,17 @@ from collie.io.to_cypher import generate_cypher_script
 # Load environment variables from .env file
 load_dotenv()
 
+SAMPLE_TEXT = """
+        Albert Einstein was born on March 14, 1879, in Ulm, Germany. 
+        He developed the theory of relativity and won the Nobel Prize in Physics in 1921.
+        Einstein worked at the Institute for Advanced Study in Princeton, New Jersey.
+        He died on April 18, 1955, at Princeton Hospital.
+        """
+
 
 def check_api_key():
     """Check if GOOGLE_API_KEY is set and provide helpful error message if not."""
-    api_key = os.getenv("GOOGLE_API_KEY")
+    api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GOOGLE_API_KEYS")
     if not api_key:
         print("Error: GOOGLE_API_KEY environment variable is required.")
         print("Please set your Google API key:")
@@ -36,9 +61,105 @@ def check_api_key():
     return api_key
 
 
+def pool_api_keys() -> list[str]:
+    """API keys for --pool: comma-separated GOOGLE_API_KEYS, else GOOGLE_API_KEY."""
+    keys = os.getenv("GOOGLE_API_KEYS") or os.getenv("GOOGLE_API_KEY") or ""
+    return [key.strip() for key in keys.split(",") if key.strip()]
+
+
+def create_extractor(args) -> InformationExtractor:
+    """Create an extractor for the model backend and cache selected on the command line."""
+    cache = ExtractionCache(args.cache) if args.cache else None
+    prefilter = None
+    if args.prefilter is not None:
+        gazetteer = load_gazetteer(args.gazetteer) if args.gazetteer else None
+        prefilter = SegmentPrefilter(threshold=args.prefilter, gazetteer=gazetteer)
+    
+    options = {
+        "cache": cache,
+        "prefilter": prefilter,
+        "source_offsets": args.source_offsets,
+        "lenient": args.lenient,
+        "reask_rejected": args.reask,
+        "linking_index": EntityLinkingIndex(args.link_index) if args.link_index else None,
+    }
+    
+    if args.backend == "stub" and args.pool:
+        members = [
+            PoolMember(
+                StubBackend(latency=args.latency, jitter=args.jitter),
+                requests_per_minute=args.pool_rpm,
+                name=f"stub{i}",
+            )
+            for i in range(args.pool_size)
+        ]
+        extractor = InformationExtractor(backend=PoolBackend(members), **options)
+    elif args.backend == "stub":
+        extractor = InformationExtractor(
+            backend=StubBackend(latency=args.latency, jitter=args.jitter), **options
+        )
+    elif args.backend == "replay":
+        extractor = InformationExtractor(
+            backend=ReplayBackend(args.fixtures, latency=args.latency, jitter=args.jitter), **options
+        )
+    else:
+        # check_api_key accepts GOOGLE_API_KEYS alone, so default to its first key
+        keys = pool_api_keys()
+        extractor = InformationExtractor(api_key=keys[0] if keys else None, **options)
+        if args.pool:
+            models = args.pool_models.split(",") if args.pool_models else None
+            extractor.backend = extractor.create_pool_backend(keys, models, args.pool_rpm)
+        if args.escalation_model:
+            extractor.backend = CascadeBackend(
+                extractor.backend,
+                extractor.create_agent_backend(args.escalation_model),
+                min_confidence=args.escalation_threshold,
+            )
+        if args.backend == "record":
+            extractor.backend = RecordingBackend(extractor.backend, args.fixtures)
+    
+    if args.hedge:
+        extractor.backend = HedgedBackend(extractor.backend)
+    return extractor
+
+
+def add_backend_arguments(parser):
+    """Add model backend and cache options to a subcommand parser."""
+    parser.add_argument("--backend", choices=["google", "record", "replay", "stub"], default="google",
+                        help="Model backend: live Gemini calls, record them as fixtures, replay fixtures, or offline stub")
+    parser.add_argument("--fixtures", default="fixtures", help="Fixture directory for the record and replay backends")
+    parser.add_argument("--latency", type=float, default=0.0, help="Synthetic per-call latency in seconds for replay and stub backends")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Additional random per-call latency in seconds for replay and stub backends")
+    parser.add_argument("--hedge", action="store_true",
+                        help="Send a duplicate request when a call is slower than the recent p95 latency")
+    parser.add_argument("--pool", action="store_true",
+                        help="Balance calls across every key in GOOGLE_API_KEYS (comma-separated) and --pool-models, "
+                             "or across --pool-size simulated endpoints with the stub backend")
+    parser.add_argument("--pool-models", help="Comma-separated Gemini models served from every pooled key")
+    parser.add_argument("--pool-size", type=int, default=3, help="Number of simulated endpoints for --pool with the stub backend")
+    parser.add_argument("--pool-rpm", type=float, help="Requests-per-minute quota of each pool member")
+    parser.add_argument("--cache", help="SQLite file caching LLM responses between runs")
+    parser.add_argument("--link-index", help="SQLite file of canonical entity IDs, so entities keep their IDs across runs")
+    parser.add_argument("--prefilter", type=float, metavar="THRESHOLD",
+                        help="Skip segments whose local entity score is below THRESHOLD instead of calling the model")
+    parser.add_argument("--gazetteer", help="File with one place name per line, used by --prefilter")
+    parser.add_argument("--escalation-model",
+                        help="Re-run low-confidence calls on this stronger Gemini model (google and record backends)")
+    parser.add_argument("--escalation-threshold", type=float, default=0.7,
+                        help="Extraction confidence below which a call is escalated")
+    parser.add_argument("--lenient", action="store_true",
+                        help="Keep valid entities and relationships when part of the model output fails validation")
+    parser.add_argument("--reask", action="store_true",
+                        help="With --lenient, ask the model again for corrected versions of only the rejected items")
+    parser.add_argument("--source-offsets", action="store_true",
+                        help="Store source spans into the input text instead of per-entity snippets")
+
+
 async def complete_workflow_demo(text: str, output_dir: str = "output", 
                               visualize: bool = True, interactive: bool = True, 
-                              export_cypher: bool = True, confidence_threshold: float = 0.5):
+                              export_cypher: bool = True, confidence_threshold: float = 0.5,
+                              chunk_size: int = DEFAULT_CHUNK_CHARS,
+                              extractor: InformationExtractor | None = None):
     """
     Demonstrate the complete COLLIE workflow.
     
@@ -49,6 +170,8 @@ async def complete_workflow_demo(text: str, output_dir: str = "output",
         interactive: Whether to create interactive plots
         export_cypher: Whether to export Cypher scripts
         confidence_threshold: Minimum confidence for entities/relationships
+        chunk_size: Maximum characters per extraction call for long texts
+        extractor: Extractor to use; defaults to the Google Gemini backend
     """
     print("🚀 Starting COLLIE Complete Workflow Demo")
     print("=" * 50)
@@ -57,11 +180,13 @@ async def complete_workflow_demo(text: str, output_dir: str = "output",
     print("\n📝 Step 1: AI-powered Information Extraction")
     print("-" * 40)
     
-    extractor = InformationExtractor()
-    extraction_result = await extractor.extract_from_text(text)
+    extractor = extractor or InformationExtractor()
+    extraction_result = await extractor.extract_from_long_text(text, max_chunk_chars=chunk_size)
     
     print(f"✅ Extracted {len(extraction_result.entities)} entities")
     print(f"✅ Extracted {len(extraction_result.relationships)} relationships")
+    if extractor.cache:
+        print(f"✅ Response cache: {extractor.cache.hits} hits, {extractor.cache.misses} misses")
     
     # Step 2: Convert to CRM Entities
     print("\n🏗️ Step 2: Convert to CRM Entities")
@@ -263,8 +388,13 @@ async def handle_extract_command(args):
     print(f"🔍 Extracting entities from {'file' if args.file else 'text'}...")
     
     # Extract entities
-    extractor = InformationExtractor()
-    extraction_result = await extractor.extract_from_text(text)
+    extractor = create_extractor(args)
+    if args.map_reduce:
+        extraction_result = await extractor.extract_map_reduce(text, max_chunk_chars=args.chunk_size)
+    else:
+        extraction_result = await extractor.extract_from_long_text(text, max_chunk_chars=args.chunk_size)
+    if extractor.cache:
+        print(f"💾 Response cache: {extractor.cache.hits} hits, {extractor.cache.misses} misses")
     
     # Filter by confidence
     filtered_entities = [e for e in extraction_result.entities if e.confidence >= args.confidence]
@@ -294,8 +424,8 @@ async def handle_extract_command(args):
         
         # Save raw extraction results
         result_data = {
-            "entities": [e.model_dump() for e in filtered_entities],
-            "relationships": [r.model_dump() for r in filtered_relationships]
+            "entities": [e.model_dump(mode='json') for e in filtered_entities],
+            "relationships": [r.model_dump(mode='json') for r in filtered_relationships]
         }
         with open(output_dir / "extraction_result.json", "w") as f:
             json.dump(result_data, f, indent=2)
@@ -330,14 +460,13 @@ async def handle_analyze_command(args):
     
     # Convert to CRM entities
     from collie.models.base import CRMEntity
+    from collie.models.registry import parse_entities
     entities = []
     
     # Handle both canonical JSON format and raw extraction format
     if isinstance(data, list):
         # Canonical JSON format: [{"id": "...", "class_code": "...", ...}, ...]
-        for entity_data in data:
-            entity = CRMEntity(**entity_data)
-            entities.append(entity)
+        entities = parse_entities(data)
     elif isinstance(data, dict) and "entities" in data:
         # Raw extraction format: {"entities": [...], "relationships": [...]}
         for entity_data in data["entities"]:
@@ -438,7 +567,9 @@ async def handle_workflow_command(args):
                                visualize=run_visualize,
                                interactive=run_interactive,
                                export_cypher=run_cypher,
-                               confidence_threshold=args.confidence)
+                               confidence_threshold=args.confidence,
+                               chunk_size=args.chunk_size,
+                               extractor=create_extractor(args))
 
 
 async def handle_demo_command(args):
@@ -446,17 +577,107 @@ async def handle_demo_command(args):
     if args.einstein:
         await einstein_demo()
     elif args.sample:
-        sample_text = """
-        Albert Einstein was born on March 14, 1879, in Ulm, Germany. 
-        He developed the theory of relativity and won the Nobel Prize in Physics in 1921.
-        Einstein worked at the Institute for Advanced Study in Princeton, New Jersey.
-        He died on April 18, 1955, at Princeton Hospital.
-        """
-        await complete_workflow_demo(sample_text, args.output)
+        await complete_workflow_demo(SAMPLE_TEXT, args.output)
     else:
         print("Error: Specify either --einstein or --sample")
 
 
+async def handle_batch_command(args):
+    """Handle the batch command."""
+    paths = sorted(p for p in Path(args.input_dir).glob(args.pattern) if p.is_file())
+    if not paths:
+        print(f"❌ No files matching {args.pattern} in {args.input_dir}")
+        return
+    
+    extractor = create_extractor(args)
+    if args.estimate:
+        estimate = BudgetScheduler(extractor).estimate([p.read_text() for p in paths])
+        print(f"📊 {estimate['documents']} documents, about {estimate['total_tokens']:,} tokens "
+              f"({estimate['input_tokens']:,} input, {estimate['output_tokens']:,} output)")
+        return
+    
+    job = ExtractionJob(
+        extractor,
+        args.output,
+        max_concurrency=args.concurrency,
+        requests_per_second=args.rate,
+        max_tokens=args.max_tokens,
+        max_seconds=args.max_seconds,
+        priority=args.priority,
+    )
+    print(f"📦 Extracting {len(paths)} documents into {args.output} (Ctrl-C stops after documents in flight)...")
+    manifest = await job.run(paths)
+    
+    print(f"✅ {manifest.completed} of {manifest.total} documents done "
+          f"({manifest.resumed} from earlier runs), {manifest.failed} failed")
+    usage = manifest.usage
+    print(f"✅ {usage.requests} model requests, {usage.input_tokens:,} input and "
+          f"{usage.output_tokens:,} output tokens{' (estimated)' if usage.estimated else ''}, "
+          f"{usage.llm_seconds:.1f}s model time")
+    if manifest.status == "interrupted":
+        print("⏸️ Interrupted; run the same command again to resume")
+    if manifest.status == "budget_exhausted":
+        print(f"⏸️ Budget spent; {manifest.over_budget} documents left for a later run")
+    if manifest.status == "completed_with_failures":
+        print(f"⚠️ {manifest.failed} documents failed; run the same command again to retry them")
+    print(f"📄 Results: {job.results_path}")
+
+
+async def handle_benchmark_command(args):
+    """Handle the benchmark command."""
+    text = Path(args.file).read_text() if args.file else SAMPLE_TEXT
+    extractor = create_extractor(args)
+    if args.adaptive:
+        extractor.concurrency_limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=min(4, args.concurrency), max_limit=args.concurrency
+        )
+    
+    print(f"⏱️ Extracting {args.documents} documents with the {args.backend} backend "
+          f"(concurrency {args.concurrency})...")
+    
+    start = time.perf_counter()
+    entities = relationships = failed = 0
+    # Every document is the same text, so coalescing duplicates would skip the work being measured
+    documents = [text] * args.documents
+    if args.pack:
+        results = await extractor.extract_packed(
+            documents, max_batch_tokens=args.pack, max_concurrency=args.concurrency
+        )
+    else:
+        results = [result async for _, result in extractor.extract_many(
+            documents, max_concurrency=args.concurrency, deduplicate=False
+        )]
+    for result in results:
+        entities += len(result.entities)
+        relationships += len(result.relationships)
+        failed += result.extraction_metadata.get("extraction_method") == "llm_failed"
+    elapsed = time.perf_counter() - start
+    
+    print(f"✅ {args.documents} documents in {elapsed:.2f}s "
+          f"({args.documents / elapsed:.1f} docs/s, {entities / elapsed:.1f} entities/s)")
+    print(f"✅ {entities} entities, {relationships} relationships, {failed} failed documents")
+    usage = extractor.usage
+    print(f"✅ {usage.requests} model requests, {usage.input_tokens:,} input and "
+          f"{usage.output_tokens:,} output tokens{' (estimated)' if usage.estimated else ''}")
+    if extractor.prefilter is not None:
+        stats = extractor.prefilter.stats()
+        print(f"✅ Pre-filter skipped {stats['skipped']} of {stats['checked']} segments")
+    if isinstance(extractor.backend, HedgedBackend):
+        stats = extractor.backend.stats()
+        print(f"✅ Hedged {stats['hedges']} of {stats['calls']} calls, hedge won {stats['hedge_wins']} times")
+    if isinstance(extractor.backend, CascadeBackend):
+        stats = extractor.backend.stats()
+        print(f"✅ Escalated {stats['escalations']} of {stats['calls']} calls ({stats['escalation_rate']:.1%})")
+    if isinstance(extractor.backend, PoolBackend):
+        stats = extractor.backend.stats()
+        print(f"✅ Pool: {stats['failovers']} failovers; calls per member: "
+              + ", ".join(f"{m['name']}={m['calls']}" for m in stats["members"]))
+    if extractor.concurrency_limiter is not None:
+        metrics = extractor.concurrency_limiter.metrics()
+        print(f"✅ Adaptive concurrency settled at {metrics['limit']} "
+              f"({metrics['overloads']} overload responses, error rate {metrics['error_rate']:.1%})")
+
+
 async def main():
     """Main function for CLI."""
     parser = argparse.ArgumentParser(
@@ -468,6 +689,8 @@ Examples:
   collie extract --file einstein.md --output results/
   collie analyze --input entities.json --visualize --export-cypher
   collie workflow --file einstein.md --all --output einstein_results/
+  collie batch --input-dir corpus/ --output corpus_job/ --concurrency 16
+  collie benchmark --backend stub --documents 500 --latency 0.5 --concurrency 32
         """
     )
     
@@ -480,6 +703,10 @@ Examples:
     extract_parser.add_argument("--output", "-o", default="output", help="Output directory")
     extract_parser.add_argument("--confidence", type=float, default=0.5, help="Minimum confidence threshold")
     extract_parser.add_argument("--format", choices=["json", "markdown", "both"], default="both", help="Output format")
+    extract_parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_CHARS, help="Maximum characters per extraction call for long texts")
+    extract_parser.add_argument("--map-reduce", action="store_true",
+                                help="For long texts, add a document-wide relationship pass over the entities of all chunks")
+    add_backend_arguments(extract_parser)
     
     # Analyze command
     analyze_parser = subparsers.add_parser("analyze", help="Analyze extracted entities")
@@ -501,6 +728,8 @@ Examples:
     workflow_parser.add_argument("--interactive", action="store_true", help="Create interactive plots")
     workflow_parser.add_argument("--export-cypher", action="store_true", help="Export to Cypher script")
     workflow_parser.add_argument("--confidence", type=float, default=0.5, help="Minimum confidence threshold")
+    workflow_parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_CHARS, help="Maximum characters per extraction call for long texts")
+    add_backend_arguments(workflow_parser)
     
     # Demo commands
     demo_parser = subparsers.add_parser("demo", help="Run demo examples")
@@ -508,6 +737,30 @@ Examples:
     demo_parser.add_argument("--sample", action="store_true", help="Run sample text demo")
     demo_parser.add_argument("--output", "-o", default="demo_output", help="Output directory")
     
+    # Batch command (resumable corpus extraction)
+    batch_parser = subparsers.add_parser("batch", help="Extract a directory of documents with checkpointing and resume")
+    batch_parser.add_argument("--input-dir", "-i", required=True, help="Directory containing the documents")
+    batch_parser.add_argument("--pattern", default="*.txt", help="Glob pattern selecting documents in the directory")
+    batch_parser.add_argument("--output", "-o", default="batch_output", help="Job directory for results.jsonl and manifest.json")
+    batch_parser.add_argument("--concurrency", type=int, default=8, help="Maximum concurrent extraction calls")
+    batch_parser.add_argument("--rate", type=float, help="Maximum extraction calls started per second")
+    batch_parser.add_argument("--max-tokens", type=int, help="Token budget for this run; the most valuable documents go first")
+    batch_parser.add_argument("--max-seconds", type=float, help="Time budget for this run, in seconds")
+    batch_parser.add_argument("--priority", choices=["score", "density", "length", "input"], default="score",
+                              help="Document order under a budget: entity score, score per token, length or input order")
+    batch_parser.add_argument("--estimate", action="store_true", help="Only predict the tokens the run would use")
+    add_backend_arguments(batch_parser)
+    
+    # Benchmark command
+    benchmark_parser = subparsers.add_parser("benchmark", help="Measure end-to-end extraction throughput")
+    benchmark_parser.add_argument("--file", help="Document to extract repeatedly (defaults to the sample text)")
+    benchmark_parser.add_argument("--documents", type=int, default=100, help="Number of documents to extract")
+    benchmark_parser.add_argument("--concurrency", type=int, default=8, help="Maximum concurrent extraction calls")
+    benchmark_parser.add_argument("--pack", type=int, metavar="TOKENS",
+                        help="Pack several documents into each call, up to TOKENS estimated tokens of text")
+    benchmark_parser.add_argument("--adaptive", action="store_true", help="Adapt concurrency to latency and rate-limit responses, up to --concurrency")
+    add_backend_arguments(benchmark_parser)
+    
     args = parser.parse_args()
     
     if not args.command:
@@ -515,7 +768,7 @@ Examples:
         return
     
     # Check API key for commands that need it
-    if args.command in ["extract", "workflow"]:
+    if args.command in ["extract", "workflow", "batch", "benchmark"] and args.backend in ["google", "record"]:
         check_api_key()
     
     if args.command == "extract":
@@ -526,6 +779,10 @@ Examples:
         await handle_workflow_command(args)
     elif args.command == "demo":
         await handle_demo_command(args)
+    elif args.command == "batch":
+        await handle_batch_command(args)
+    elif args.command == "benchmark":
+        await handle_benchmark_command(args)
 
 
 def cli():
@@ -15,6 +15,14 @@ from .base import (
     E53_Place,
     E74_Group,
 )
+from .ids import EntityRef, IdMinter, configure_ids, mint_id
+from .registry import ModelRegistry, build_registry, model_for, parse_entities
+from .trusted import (
+    construct_entities,
+    construct_relations,
+    dump_snapshot,
+    load_snapshot,
+)
 
 __all__ = [
     "CRMEntity",
@@ -30,4 +38,16 @@ __all__ = [
     "E52_TimeSpan",
     "E53_Place",
     "E74_Group",
+    "EntityRef",
+    "IdMinter",
+    "ModelRegistry",
+    "build_registry",
+    "configure_ids",
+    "construct_entities",
+    "construct_relations",
+    "dump_snapshot",
+    "load_snapshot",
+    "mint_id",
+    "model_for",
+    "parse_entities",
 ]
@@ -4,9 +4,15 @@ Provides the foundation for all CIDOC CRM E-class models.
 """
 
 from typing import Any
-from uuid import UUID, uuid4
+from uuid import uuid4
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field
+
+from collie.models.ids import EntityRef
+
+# Version of the serialized entity and relation layout. Bump it whenever a
+# change to these models makes previously dumped records load differently.
+SCHEMA_VERSION = 1
 
 
 class CRMEntity(BaseModel):
@@ -21,7 +27,7 @@ class CRMEntity(BaseModel):
     - type: list of type assignments
     """
 
-    id: UUID = Field(
+    id: EntityRef = Field(
         default_factory=uuid4, description="Unique identifier for this entity"
     )
     class_code: str = Field(..., description="CIDOC CRM E-class code")
@@ -29,25 +35,8 @@ class CRMEntity(BaseModel):
     notes: str | None = Field(None, description="Additional textual notes")
     type: list[str] = Field(default_factory=list, description="Type assignments")
 
-    @validator("id", pre=True)
-    def convert_string_to_uuid(cls, v):
-        """Convert string IDs to UUIDs for backward compatibility."""
-        if isinstance(v, str):
-            try:
-                return UUID(v)
-            except ValueError:
-                # If string is not a valid UUID, create a deterministic UUID from the string
-                # This ensures the same string always produces the same UUID
-                import hashlib
-
-                namespace = UUID(
-                    "6ba7b810-9dad-11d1-80b4-00c04fd430c8"
-                )  # DNS namespace
-                return UUID(hashlib.md5(f"{namespace}{v}".encode()).hexdigest())
-        return v
-
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Base CIDOC CRM entity",
             "examples": [
                 {
@@ -58,6 +47,7 @@ class CRMEntity(BaseModel):
                 }
             ],
         }
+    )
 
 
 class CRMRelation(BaseModel):
@@ -67,26 +57,15 @@ class CRMRelation(BaseModel):
     Used internally for relationship expansion and Cypher emission.
     """
 
-    src: UUID = Field(..., description="Source entity ID")
+    src: EntityRef = Field(..., description="Source entity ID")
     type: str = Field(..., description="P-property code (e.g., 'P108')")
-    tgt: UUID = Field(..., description="Target entity ID")
+    tgt: EntityRef = Field(..., description="Target entity ID")
     props: dict[str, Any] | None = Field(
         None, description="Additional relationship properties"
     )
 
-    @validator("src", "tgt", pre=True)
-    def convert_string_to_uuid(cls, v):
-        """Convert string IDs to UUIDs for backward compatibility."""
-        if isinstance(v, str):
-            try:
-                return UUID(v)
-            except ValueError:
-                # If string is not a valid UUID, generate a new one
-                return uuid4()
-        return v
-
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "CRM relationship between entities",
             "examples": [
                 {
@@ -97,6 +76,7 @@ class CRMRelation(BaseModel):
                 }
             ],
         }
+    )
 
 
 class CRMValidationError(Exception):
@@ -117,14 +97,15 @@ class E5_Event(CRMEntity):
     class_code: str = "E5"
 
     # Shortcut fields
-    timespan: UUID | None = Field(None, description="Time-span entity ID")
-    took_place_at: UUID | None = Field(None, description="Place entity ID")
+    timespan: EntityRef | None = Field(None, description="Time-span entity ID")
+    took_place_at: EntityRef | None = Field(None, description="Place entity ID")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "CIDOC CRM E5: Event",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class E7_Activity(E5_Event):
@@ -132,11 +113,12 @@ class E7_Activity(E5_Event):
 
     class_code: str = "E7"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "CIDOC CRM E7: Activity",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class E12_Production(E7_Activity):
@@ -144,11 +126,12 @@ class E12_Production(E7_Activity):
 
     class_code: str = "E12"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "CIDOC CRM E12: Production",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class E8_Acquisition(E7_Activity):
@@ -156,11 +139,12 @@ class E8_Acquisition(E7_Activity):
 
     class_code: str = "E8"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "CIDOC CRM E8: Acquisition",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class E22_HumanMadeObject(CRMEntity):
@@ -169,13 +153,15 @@ class E22_HumanMadeObject(CRMEntity):
     class_code: str = "E22"
 
     # Shortcut fields
-    current_location: UUID | None = Field(
+    current_location: EntityRef | None = Field(
         None, description="Current location entity ID"
     )
-    produced_by: UUID | None = Field(None, description="Production event entity ID")
+    produced_by: EntityRef | None = Field(
+        None, description="Production event entity ID"
+    )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "CIDOC CRM E22: Human-Made Object",
             "canonical_fields": [
                 "label",
@@ -185,6 +171,7 @@ class E22_HumanMadeObject(CRMEntity):
                 "produced_by",
             ],
         }
+    )
 
 
 class E21_Person(CRMEntity):
@@ -193,15 +180,16 @@ class E21_Person(CRMEntity):
     class_code: str = "E21"
 
     # Shortcut fields
-    current_location: UUID | None = Field(
+    current_location: EntityRef | None = Field(
         None, description="Current location entity ID"
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "CIDOC CRM E21: Person",
             "canonical_fields": ["label", "type", "notes", "current_location"],
         }
+    )
 
 
 class E74_Group(CRMEntity):
@@ -209,11 +197,12 @@ class E74_Group(CRMEntity):
 
     class_code: str = "E74"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "CIDOC CRM E74: Group",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class E53_Place(CRMEntity):
@@ -221,11 +210,12 @@ class E53_Place(CRMEntity):
 
     class_code: str = "E53"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "CIDOC CRM E53: Place",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class E52_TimeSpan(CRMEntity):
@@ -234,13 +224,13 @@ class E52_TimeSpan(CRMEntity):
     class_code: str = "E52"
 
     # Shortcut fields
-    begin_of_the_begin: UUID | None = Field(
+    begin_of_the_begin: EntityRef | None = Field(
         None, description="Beginning time primitive ID"
     )
-    end_of_the_end: UUID | None = Field(None, description="End time primitive ID")
+    end_of_the_end: EntityRef | None = Field(None, description="End time primitive ID")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "CIDOC CRM E52: Time-Span",
             "canonical_fields": [
                 "label",
@@ -250,6 +240,7 @@ class E52_TimeSpan(CRMEntity):
                 "end_of_the_end",
             ],
         }
+    )
 
 
 class E42_Identifier(CRMEntity):
@@ -257,11 +248,12 @@ class E42_Identifier(CRMEntity):
 
     class_code: str = "E42"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "CIDOC CRM E42: Identifier",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class E35_Title(CRMEntity):
@@ -269,8 +261,9 @@ class E35_Title(CRMEntity):
 
     class_code: str = "E35"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "CIDOC CRM E35: Title",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
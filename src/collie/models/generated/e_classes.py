@@ -3,9 +3,10 @@ Auto-generated CIDOC CRM E-class models.
 Generated from YAML specifications in codegen/specs/
 """
 
-from uuid import UUID
+from pydantic import ConfigDict
 
 from collie.models.base import CRMEntity
+from collie.models.ids import EntityRef
 
 
 class EE1_CRMEntity(CRMEntity):
@@ -13,11 +14,12 @@ class EE1_CRMEntity(CRMEntity):
 
     class_code: str = "E1"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "CRM Entity",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE2_TemporalEntity(EE1_CRMEntity):
@@ -25,11 +27,12 @@ class EE2_TemporalEntity(EE1_CRMEntity):
 
     class_code: str = "E2"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Temporal Entity",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE3_ConditionState(EE2_TemporalEntity):
@@ -37,11 +40,12 @@ class EE3_ConditionState(EE2_TemporalEntity):
 
     class_code: str = "E3"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Condition State",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE4_Period(EE2_TemporalEntity):
@@ -49,11 +53,12 @@ class EE4_Period(EE2_TemporalEntity):
 
     class_code: str = "E4"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Period",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE5_Event(EE2_TemporalEntity):
@@ -61,14 +66,15 @@ class EE5_Event(EE2_TemporalEntity):
 
     class_code: str = "E5"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Event",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE6_Destruction(EE5_Event):
@@ -76,14 +82,15 @@ class EE6_Destruction(EE5_Event):
 
     class_code: str = "E6"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Destruction",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE7_Activity(EE5_Event):
@@ -91,14 +98,15 @@ class EE7_Activity(EE5_Event):
 
     class_code: str = "E7"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Activity",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE8_Acquisition(EE7_Activity):
@@ -106,14 +114,15 @@ class EE8_Acquisition(EE7_Activity):
 
     class_code: str = "E8"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Acquisition",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE9_Move(EE7_Activity):
@@ -121,14 +130,15 @@ class EE9_Move(EE7_Activity):
 
     class_code: str = "E9"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Move",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE10_TransferofCustody(EE7_Activity):
@@ -136,14 +146,15 @@ class EE10_TransferofCustody(EE7_Activity):
 
     class_code: str = "E10"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Transfer of Custody",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE11_Modification(EE7_Activity):
@@ -151,14 +162,15 @@ class EE11_Modification(EE7_Activity):
 
     class_code: str = "E11"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Modification",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE12_Production(EE7_Activity):
@@ -166,14 +178,15 @@ class EE12_Production(EE7_Activity):
 
     class_code: str = "E12"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Production",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE13_AttributeAssignment(EE7_Activity):
@@ -181,14 +194,15 @@ class EE13_AttributeAssignment(EE7_Activity):
 
     class_code: str = "E13"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Attribute Assignment",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE14_ConditionAssessment(EE13_AttributeAssignment):
@@ -196,14 +210,15 @@ class EE14_ConditionAssessment(EE13_AttributeAssignment):
 
     class_code: str = "E14"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Condition Assessment",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE15_IdentifierAssignment(EE13_AttributeAssignment):
@@ -211,14 +226,15 @@ class EE15_IdentifierAssignment(EE13_AttributeAssignment):
 
     class_code: str = "E15"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Identifier Assignment",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE16_Measurement(EE13_AttributeAssignment):
@@ -226,14 +242,15 @@ class EE16_Measurement(EE13_AttributeAssignment):
 
     class_code: str = "E16"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Measurement",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE17_TypeAssignment(EE13_AttributeAssignment):
@@ -241,14 +258,15 @@ class EE17_TypeAssignment(EE13_AttributeAssignment):
 
     class_code: str = "E17"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Type Assignment",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE18_PhysicalThing(EE1_CRMEntity):
@@ -256,11 +274,12 @@ class EE18_PhysicalThing(EE1_CRMEntity):
 
     class_code: str = "E18"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Physical Thing",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE19_PhysicalObject(EE18_PhysicalThing):
@@ -268,13 +287,14 @@ class EE19_PhysicalObject(EE18_PhysicalThing):
 
     class_code: str = "E19"
 
-    current_location: UUID | None = None
+    current_location: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Physical Object",
             "canonical_fields": ["label", "type", "notes", "current_location"],
         }
+    )
 
 
 class EE20_BiologicalObject(EE19_PhysicalObject):
@@ -282,13 +302,14 @@ class EE20_BiologicalObject(EE19_PhysicalObject):
 
     class_code: str = "E20"
 
-    current_location: UUID | None = None
+    current_location: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Biological Object",
             "canonical_fields": ["label", "type", "notes", "current_location"],
         }
+    )
 
 
 class EE21_Person(EE20_BiologicalObject):
@@ -296,13 +317,14 @@ class EE21_Person(EE20_BiologicalObject):
 
     class_code: str = "E21"
 
-    current_location: UUID | None = None
+    current_location: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Person",
             "canonical_fields": ["label", "type", "notes", "current_location"],
         }
+    )
 
 
 class EE22_HumanMadeObject(EE19_PhysicalObject):
@@ -310,11 +332,11 @@ class EE22_HumanMadeObject(EE19_PhysicalObject):
 
     class_code: str = "E22"
 
-    current_location: UUID | None = None
-    produced_by: UUID | None = None
+    current_location: EntityRef | None = None
+    produced_by: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Human-Made Object",
             "canonical_fields": [
                 "label",
@@ -324,6 +346,7 @@ class EE22_HumanMadeObject(EE19_PhysicalObject):
                 "produced_by",
             ],
         }
+    )
 
 
 class EE23_ConceptualObject(EE1_CRMEntity):
@@ -331,11 +354,12 @@ class EE23_ConceptualObject(EE1_CRMEntity):
 
     class_code: str = "E23"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Conceptual Object",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE24_PhysicalManMadeThing(EE18_PhysicalThing):
@@ -343,13 +367,14 @@ class EE24_PhysicalManMadeThing(EE18_PhysicalThing):
 
     class_code: str = "E24"
 
-    current_location: UUID | None = None
+    current_location: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Physical Man-Made Thing",
             "canonical_fields": ["label", "type", "notes", "current_location"],
         }
+    )
 
 
 class EE25_ManMadeFeature(EE24_PhysicalManMadeThing):
@@ -357,13 +382,14 @@ class EE25_ManMadeFeature(EE24_PhysicalManMadeThing):
 
     class_code: str = "E25"
 
-    current_location: UUID | None = None
+    current_location: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Man-Made Feature",
             "canonical_fields": ["label", "type", "notes", "current_location"],
         }
+    )
 
 
 class EE26_PhysicalFeature(EE18_PhysicalThing):
@@ -371,13 +397,14 @@ class EE26_PhysicalFeature(EE18_PhysicalThing):
 
     class_code: str = "E26"
 
-    current_location: UUID | None = None
+    current_location: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Physical Feature",
             "canonical_fields": ["label", "type", "notes", "current_location"],
         }
+    )
 
 
 class EE27_Site(EE26_PhysicalFeature):
@@ -385,13 +412,14 @@ class EE27_Site(EE26_PhysicalFeature):
 
     class_code: str = "E27"
 
-    current_location: UUID | None = None
+    current_location: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Site",
             "canonical_fields": ["label", "type", "notes", "current_location"],
         }
+    )
 
 
 class EE28_ConceptualObject(EE23_ConceptualObject):
@@ -399,11 +427,12 @@ class EE28_ConceptualObject(EE23_ConceptualObject):
 
     class_code: str = "E28"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Conceptual Object",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE29_DesignorProcedure(EE28_ConceptualObject):
@@ -411,11 +440,12 @@ class EE29_DesignorProcedure(EE28_ConceptualObject):
 
     class_code: str = "E29"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Design or Procedure",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE30_Right(EE28_ConceptualObject):
@@ -423,11 +453,12 @@ class EE30_Right(EE28_ConceptualObject):
 
     class_code: str = "E30"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Right",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE31_Document(EE28_ConceptualObject):
@@ -435,11 +466,12 @@ class EE31_Document(EE28_ConceptualObject):
 
     class_code: str = "E31"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Document",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE32_AuthorityDocument(EE31_Document):
@@ -447,11 +479,12 @@ class EE32_AuthorityDocument(EE31_Document):
 
     class_code: str = "E32"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Authority Document",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE33_LinguisticObject(EE28_ConceptualObject):
@@ -459,11 +492,12 @@ class EE33_LinguisticObject(EE28_ConceptualObject):
 
     class_code: str = "E33"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Linguistic Object",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE34_Inscription(EE33_LinguisticObject):
@@ -471,11 +505,12 @@ class EE34_Inscription(EE33_LinguisticObject):
 
     class_code: str = "E34"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Inscription",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE35_Title(EE33_LinguisticObject):
@@ -483,11 +518,12 @@ class EE35_Title(EE33_LinguisticObject):
 
     class_code: str = "E35"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Title",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE36_VisualItem(EE28_ConceptualObject):
@@ -495,11 +531,12 @@ class EE36_VisualItem(EE28_ConceptualObject):
 
     class_code: str = "E36"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Visual Item",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE37_Mark(EE36_VisualItem):
@@ -507,11 +544,12 @@ class EE37_Mark(EE36_VisualItem):
 
     class_code: str = "E37"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Mark",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE38_Image(EE36_VisualItem):
@@ -519,11 +557,12 @@ class EE38_Image(EE36_VisualItem):
 
     class_code: str = "E38"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Image",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE39_Actor(EE1_CRMEntity):
@@ -531,11 +570,12 @@ class EE39_Actor(EE1_CRMEntity):
 
     class_code: str = "E39"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Actor",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE40_LegalBody(EE39_Actor):
@@ -543,11 +583,12 @@ class EE40_LegalBody(EE39_Actor):
 
     class_code: str = "E40"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Legal Body",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE41_Appellation(EE28_ConceptualObject):
@@ -555,11 +596,12 @@ class EE41_Appellation(EE28_ConceptualObject):
 
     class_code: str = "E41"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Appellation",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE42_Identifier(EE28_ConceptualObject):
@@ -567,11 +609,12 @@ class EE42_Identifier(EE28_ConceptualObject):
 
     class_code: str = "E42"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Identifier",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE43_Place(EE1_CRMEntity):
@@ -579,11 +622,12 @@ class EE43_Place(EE1_CRMEntity):
 
     class_code: str = "E43"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Place",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE44_PlaceAppellation(EE41_Appellation):
@@ -591,11 +635,12 @@ class EE44_PlaceAppellation(EE41_Appellation):
 
     class_code: str = "E44"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Place Appellation",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE45_Address(EE44_PlaceAppellation):
@@ -603,11 +648,12 @@ class EE45_Address(EE44_PlaceAppellation):
 
     class_code: str = "E45"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Address",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE46_Section(EE43_Place):
@@ -615,11 +661,12 @@ class EE46_Section(EE43_Place):
 
     class_code: str = "E46"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Section",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE47_SpatialCoordinates(EE28_ConceptualObject):
@@ -627,11 +674,12 @@ class EE47_SpatialCoordinates(EE28_ConceptualObject):
 
     class_code: str = "E47"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Spatial Coordinates",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE48_PlaceName(EE44_PlaceAppellation):
@@ -639,11 +687,12 @@ class EE48_PlaceName(EE44_PlaceAppellation):
 
     class_code: str = "E48"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Place Name",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE49_TimeAppellation(EE41_Appellation):
@@ -651,11 +700,12 @@ class EE49_TimeAppellation(EE41_Appellation):
 
     class_code: str = "E49"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Time Appellation",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE50_Date(EE49_TimeAppellation):
@@ -663,11 +713,12 @@ class EE50_Date(EE49_TimeAppellation):
 
     class_code: str = "E50"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Date",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE51_ContactPoint(EE45_Address):
@@ -675,11 +726,12 @@ class EE51_ContactPoint(EE45_Address):
 
     class_code: str = "E51"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Contact Point",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE52_TimeSpan(EE1_CRMEntity):
@@ -687,11 +739,11 @@ class EE52_TimeSpan(EE1_CRMEntity):
 
     class_code: str = "E52"
 
-    begin_of_the_begin: UUID | None = None
-    end_of_the_end: UUID | None = None
+    begin_of_the_begin: EntityRef | None = None
+    end_of_the_end: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Time-Span",
             "canonical_fields": [
                 "label",
@@ -701,6 +753,7 @@ class EE52_TimeSpan(EE1_CRMEntity):
                 "end_of_the_end",
             ],
         }
+    )
 
 
 class EE53_Place(EE43_Place):
@@ -708,11 +761,12 @@ class EE53_Place(EE43_Place):
 
     class_code: str = "E53"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Place",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE54_Dimension(EE28_ConceptualObject):
@@ -720,11 +774,12 @@ class EE54_Dimension(EE28_ConceptualObject):
 
     class_code: str = "E54"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Dimension",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE55_Type(EE28_ConceptualObject):
@@ -732,11 +787,12 @@ class EE55_Type(EE28_ConceptualObject):
 
     class_code: str = "E55"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Type",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE56_Language(EE55_Type):
@@ -744,11 +800,12 @@ class EE56_Language(EE55_Type):
 
     class_code: str = "E56"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Language",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE57_Material(EE55_Type):
@@ -756,11 +813,12 @@ class EE57_Material(EE55_Type):
 
     class_code: str = "E57"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Material",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE58_MeasurementUnit(EE55_Type):
@@ -768,11 +826,12 @@ class EE58_MeasurementUnit(EE55_Type):
 
     class_code: str = "E58"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Measurement Unit",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE59_PrimitiveValue(EE1_CRMEntity):
@@ -780,11 +839,12 @@ class EE59_PrimitiveValue(EE1_CRMEntity):
 
     class_code: str = "E59"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Primitive Value",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE60_Number(EE59_PrimitiveValue):
@@ -792,11 +852,12 @@ class EE60_Number(EE59_PrimitiveValue):
 
     class_code: str = "E60"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Number",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE61_TimePrimitive(EE59_PrimitiveValue):
@@ -804,11 +865,12 @@ class EE61_TimePrimitive(EE59_PrimitiveValue):
 
     class_code: str = "E61"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Time Primitive",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE62_String(EE59_PrimitiveValue):
@@ -816,11 +878,12 @@ class EE62_String(EE59_PrimitiveValue):
 
     class_code: str = "E62"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "String",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE63_BeginningofExistence(EE5_Event):
@@ -828,14 +891,15 @@ class EE63_BeginningofExistence(EE5_Event):
 
     class_code: str = "E63"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Beginning of Existence",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE64_EndofExistence(EE5_Event):
@@ -843,14 +907,15 @@ class EE64_EndofExistence(EE5_Event):
 
     class_code: str = "E64"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "End of Existence",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE65_Creation(EE63_BeginningofExistence):
@@ -858,14 +923,15 @@ class EE65_Creation(EE63_BeginningofExistence):
 
     class_code: str = "E65"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Creation",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE66_Formation(EE63_BeginningofExistence):
@@ -873,14 +939,15 @@ class EE66_Formation(EE63_BeginningofExistence):
 
     class_code: str = "E66"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Formation",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE67_Birth(EE66_Formation):
@@ -888,14 +955,15 @@ class EE67_Birth(EE66_Formation):
 
     class_code: str = "E67"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Birth",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE68_Dissolution(EE64_EndofExistence):
@@ -903,14 +971,15 @@ class EE68_Dissolution(EE64_EndofExistence):
 
     class_code: str = "E68"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Dissolution",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE69_Death(EE64_EndofExistence):
@@ -918,14 +987,15 @@ class EE69_Death(EE64_EndofExistence):
 
     class_code: str = "E69"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Death",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE70_Thing(EE1_CRMEntity):
@@ -933,11 +1003,12 @@ class EE70_Thing(EE1_CRMEntity):
 
     class_code: str = "E70"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Thing",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE71_HumanMadeThing(EE70_Thing):
@@ -945,11 +1016,12 @@ class EE71_HumanMadeThing(EE70_Thing):
 
     class_code: str = "E71"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Human-Made Thing",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE72_LegalObject(EE70_Thing):
@@ -957,11 +1029,12 @@ class EE72_LegalObject(EE70_Thing):
 
     class_code: str = "E72"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Legal Object",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE73_InformationObject(EE70_Thing):
@@ -969,11 +1042,12 @@ class EE73_InformationObject(EE70_Thing):
 
     class_code: str = "E73"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Information Object",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE74_Group(EE39_Actor):
@@ -981,11 +1055,12 @@ class EE74_Group(EE39_Actor):
 
     class_code: str = "E74"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Group",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE75_ConceptualObjectAppellation(EE41_Appellation):
@@ -993,11 +1068,12 @@ class EE75_ConceptualObjectAppellation(EE41_Appellation):
 
     class_code: str = "E75"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Conceptual Object Appellation",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE76_ConceptualObjectIdentifier(EE42_Identifier):
@@ -1005,11 +1081,12 @@ class EE76_ConceptualObjectIdentifier(EE42_Identifier):
 
     class_code: str = "E76"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Conceptual Object Identifier",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE77_PersistentItem(EE1_CRMEntity):
@@ -1017,11 +1094,12 @@ class EE77_PersistentItem(EE1_CRMEntity):
 
     class_code: str = "E77"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Persistent Item",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE78_CuratedHolding(EE77_PersistentItem):
@@ -1029,11 +1107,12 @@ class EE78_CuratedHolding(EE77_PersistentItem):
 
     class_code: str = "E78"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Curated Holding",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE79_PartAddition(EE11_Modification):
@@ -1041,14 +1120,15 @@ class EE79_PartAddition(EE11_Modification):
 
     class_code: str = "E79"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Part Addition",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE80_PartRemoval(EE11_Modification):
@@ -1056,14 +1136,15 @@ class EE80_PartRemoval(EE11_Modification):
 
     class_code: str = "E80"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Part Removal",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE81_Transformation(EE11_Modification):
@@ -1071,14 +1152,15 @@ class EE81_Transformation(EE11_Modification):
 
     class_code: str = "E81"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Transformation",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE82_ActorAppellation(EE75_ConceptualObjectAppellation):
@@ -1086,11 +1168,12 @@ class EE82_ActorAppellation(EE75_ConceptualObjectAppellation):
 
     class_code: str = "E82"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Actor Appellation",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE83_TypeCreation(EE65_Creation):
@@ -1098,14 +1181,15 @@ class EE83_TypeCreation(EE65_Creation):
 
     class_code: str = "E83"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Type Creation",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE84_InformationCarrier(EE73_InformationObject):
@@ -1113,11 +1197,12 @@ class EE84_InformationCarrier(EE73_InformationObject):
 
     class_code: str = "E84"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Information Carrier",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE85_Joining(EE7_Activity):
@@ -1125,14 +1210,15 @@ class EE85_Joining(EE7_Activity):
 
     class_code: str = "E85"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Joining",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE86_Leaving(EE7_Activity):
@@ -1140,14 +1226,15 @@ class EE86_Leaving(EE7_Activity):
 
     class_code: str = "E86"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Leaving",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE87_CurationActivity(EE7_Activity):
@@ -1155,14 +1242,15 @@ class EE87_CurationActivity(EE7_Activity):
 
     class_code: str = "E87"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Curation Activity",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE88_PropositionalObject(EE28_ConceptualObject):
@@ -1170,11 +1258,12 @@ class EE88_PropositionalObject(EE28_ConceptualObject):
 
     class_code: str = "E88"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Propositional Object",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE89_PropositionalStatement(EE88_PropositionalObject):
@@ -1182,11 +1271,12 @@ class EE89_PropositionalStatement(EE88_PropositionalObject):
 
     class_code: str = "E89"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Propositional Statement",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE90_SymbolicObject(EE28_ConceptualObject):
@@ -1194,11 +1284,12 @@ class EE90_SymbolicObject(EE28_ConceptualObject):
 
     class_code: str = "E90"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Symbolic Object",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE91_KnowledgeObject(EE90_SymbolicObject):
@@ -1206,11 +1297,12 @@ class EE91_KnowledgeObject(EE90_SymbolicObject):
 
     class_code: str = "E91"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Knowledge Object",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE92_SpacetimeVolume(EE1_CRMEntity):
@@ -1218,11 +1310,12 @@ class EE92_SpacetimeVolume(EE1_CRMEntity):
 
     class_code: str = "E92"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Spacetime Volume",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE93_Presence(EE92_SpacetimeVolume):
@@ -1230,11 +1323,12 @@ class EE93_Presence(EE92_SpacetimeVolume):
 
     class_code: str = "E93"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Presence",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE94_Space(EE92_SpacetimeVolume):
@@ -1242,11 +1336,12 @@ class EE94_Space(EE92_SpacetimeVolume):
 
     class_code: str = "E94"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Space",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE95_SpacetimePrimitive(EE59_PrimitiveValue):
@@ -1254,11 +1349,12 @@ class EE95_SpacetimePrimitive(EE59_PrimitiveValue):
 
     class_code: str = "E95"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Spacetime Primitive",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE96_Purchase(EE8_Acquisition):
@@ -1266,14 +1362,15 @@ class EE96_Purchase(EE8_Acquisition):
 
     class_code: str = "E96"
 
-    timespan: UUID | None = None
-    took_place_at: UUID | None = None
+    timespan: EntityRef | None = None
+    took_place_at: EntityRef | None = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Purchase",
             "canonical_fields": ["label", "type", "notes", "timespan", "took_place_at"],
         }
+    )
 
 
 class EE97_MonetaryAmount(EE28_ConceptualObject):
@@ -1281,11 +1378,12 @@ class EE97_MonetaryAmount(EE28_ConceptualObject):
 
     class_code: str = "E97"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Monetary Amount",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE98_Currency(EE55_Type):
@@ -1293,11 +1391,12 @@ class EE98_Currency(EE55_Type):
 
     class_code: str = "E98"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Currency",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
 
 
 class EE99_ProductType(EE55_Type):
@@ -1305,8 +1404,9 @@ class EE99_ProductType(EE55_Type):
 
     class_code: str = "E99"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "description": "Product Type",
             "canonical_fields": ["label", "type", "notes"],
         }
+    )
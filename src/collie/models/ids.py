@@ -0,0 +1,110 @@
+"""
+Deterministic entity ID minting.
+
+Entities and relations accept legacy string identifiers ("obj_001") wherever
+a UUID is expected. Every such string is turned into a UUIDv5 over one
+configurable namespace, so an entity and the relations and shortcut fields
+that point at it agree on its ID. Conversions go through a bounded LRU
+cache, as bulk loads see the same identifiers over and over.
+"""
+
+from functools import lru_cache
+from typing import Annotated, Any
+from uuid import UUID, uuid5
+
+from pydantic import BeforeValidator
+
+# The namespace collie has always derived string IDs from (the RFC 4122 DNS namespace)
+DEFAULT_NAMESPACE = UUID("6ba7b810-9dad-11d1-80b4-00c04fd430c8")
+DEFAULT_CACHE_SIZE = 1 << 18
+
+
+class IdMinter:
+    """Converts identifier strings to UUIDs, minting UUIDv5s for non-UUID strings."""
+
+    def __init__(
+        self,
+        namespace: UUID = DEFAULT_NAMESPACE,
+        cache_size: int | None = DEFAULT_CACHE_SIZE,
+    ):
+        """
+        Args:
+            namespace: Namespace of the minted UUIDv5s
+            cache_size: Maximum number of cached conversions; None for unbounded
+        """
+        self.configure(namespace, cache_size)
+
+    def configure(self, namespace: UUID, cache_size: int | None) -> None:
+        """Switch namespace and cache size, emptying the cache."""
+        self.namespace = namespace
+        self.cache_size = cache_size
+        self._from_string = lru_cache(maxsize=cache_size)(self._convert)
+
+    def _convert(self, value: str) -> UUID:
+        try:
+            return UUID(value)
+        except ValueError:
+            return uuid5(self.namespace, value)
+
+    def mint(self, name: str) -> UUID:
+        """UUIDv5 of ``name``, whether or not it is itself a UUID string."""
+        return uuid5(self.namespace, name)
+
+    def coerce(self, value: Any) -> Any:
+        """
+        UUID for an ID value.
+
+        UUID strings are parsed, other strings are minted, and anything else
+        is returned unchanged for the field's own validation.
+        """
+        if isinstance(value, str):
+            return self._from_string(value)
+        return value
+
+    def cache_info(self):
+        """Hit and miss statistics of the conversion cache."""
+        return self._from_string.cache_info()
+
+
+_minter = IdMinter()
+
+
+def get_minter() -> IdMinter:
+    """The minter used by the CRM models."""
+    return _minter
+
+
+def configure_ids(
+    namespace: UUID | str | None = None, cache_size: int | None = DEFAULT_CACHE_SIZE
+) -> IdMinter:
+    """
+    Reconfigure the minter used by the CRM models.
+
+    Configure this once, before loading data: IDs minted under different
+    namespaces do not match.
+
+    Args:
+        namespace: Namespace of the minted UUIDv5s; the default namespace if None
+        cache_size: Maximum number of cached conversions; None for unbounded
+
+    Returns:
+        The new minter
+    """
+    if isinstance(namespace, str):
+        namespace = UUID(namespace)
+    _minter.configure(namespace or DEFAULT_NAMESPACE, cache_size)
+    return _minter
+
+
+def mint_id(name: str) -> UUID:
+    """UUIDv5 of ``name`` under the configured namespace."""
+    return _minter.mint(name)
+
+
+def coerce_id(value: Any) -> Any:
+    """Convert an ID value with the configured minter, see :meth:`IdMinter.coerce`."""
+    return _minter.coerce(value)
+
+
+# UUID field that also accepts legacy string identifiers
+EntityRef = Annotated[UUID, BeforeValidator(coerce_id)]
@@ -0,0 +1,148 @@
+"""
+Class-code to model-class registry.
+
+Canonical JSON only records an entity's ``class_code``. The registry maps
+every code to its model class, so stored entities can be loaded back as the
+right ``EE*`` subclass with a dictionary lookup instead of if/else chains.
+"""
+
+from collections.abc import Iterable, Mapping
+from functools import lru_cache
+from itertools import groupby
+from typing import Any
+
+from pydantic import TypeAdapter
+
+from collie.models import base
+from collie.models.base import CRMEntity
+from collie.models.generated import e_classes
+
+
+def model_class_code(model: type[CRMEntity]) -> str | None:
+    """Default ``class_code`` of a model class, or None if it has none."""
+    field = model.model_fields.get("class_code")
+    default = field.default if field is not None else None
+    return default if isinstance(default, str) else None
+
+
+def _entity_models(module) -> list[type[CRMEntity]]:
+    return [
+        obj
+        for obj in vars(module).values()
+        if isinstance(obj, type)
+        and issubclass(obj, CRMEntity)
+        and obj is not CRMEntity
+        and obj.__module__ == module.__name__
+    ]
+
+
+class ModelRegistry:
+    """
+    Mapping from CIDOC CRM class codes to entity model classes.
+
+    Records whose code is not registered are loaded as ``default``.
+    """
+
+    def __init__(
+        self,
+        models: Iterable[type[CRMEntity]] = (),
+        default: type[CRMEntity] = CRMEntity,
+    ):
+        self.default = default
+        self._models: dict[str, type[CRMEntity]] = {}
+        self._adapters: dict[type[CRMEntity], TypeAdapter] = {}
+        for model in models:
+            self.register(model)
+
+    def register(self, model: type[CRMEntity]) -> type[CRMEntity]:
+        """
+        Register a model class under its default ``class_code``.
+
+        A model registered later replaces an earlier one with the same code.
+        Returns the model, so this can be used as a class decorator.
+        """
+        code = model_class_code(model)
+        if code is None:
+            raise ValueError(f"{model.__name__} has no default class_code")
+        self._models[code] = model
+        return model
+
+    def get(self, class_code: str | None) -> type[CRMEntity]:
+        """Model class for a class code; ``default`` for unknown codes."""
+        return self._models.get(class_code, self.default)
+
+    def __contains__(self, class_code: object) -> bool:
+        return class_code in self._models
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def codes(self) -> list[str]:
+        """Registered class codes."""
+        return list(self._models)
+
+    def parse(self, record: Mapping[str, Any]) -> CRMEntity:
+        """Validate one record as the model class of its ``class_code``."""
+        return self.get(record.get("class_code")).model_validate(record)
+
+    def parse_many(self, records: Iterable[Mapping[str, Any]]) -> list[CRMEntity]:
+        """
+        Validate records as the model classes of their class codes.
+
+        Consecutive records of the same class are validated together in a
+        single call, so input sorted or grouped by class code loads fastest.
+        Output order matches input order.
+
+        Raises:
+            pydantic.ValidationError: If a record is invalid for its class
+        """
+        entities: list[CRMEntity] = []
+        for model, run in groupby(records, key=lambda r: self.get(r.get("class_code"))):
+            adapter = self._adapters.get(model)
+            if adapter is None:
+                adapter = self._adapters[model] = TypeAdapter(list[model])
+            entities.extend(adapter.validate_python(list(run)))
+        return entities
+
+
+def build_registry(prefer_wrappers: bool = False) -> ModelRegistry:
+    """
+    Registry of the generated ``EE*`` classes.
+
+    Args:
+        prefer_wrappers: Map the codes of the ergonomic wrappers in
+            ``collie.models.base`` (``E22_HumanMadeObject`` etc.) to the
+            wrappers instead of the generated classes
+    """
+    registry = ModelRegistry(_entity_models(e_classes))
+    if prefer_wrappers:
+        for model in _entity_models(base):
+            registry.register(model)
+    return registry
+
+
+@lru_cache(maxsize=None)
+def default_registry() -> ModelRegistry:
+    """Shared registry of the generated classes, built on first use."""
+    return build_registry()
+
+
+def model_for(class_code: str) -> type[CRMEntity]:
+    """Generated model class for a class code; ``CRMEntity`` for unknown codes."""
+    return default_registry().get(class_code)
+
+
+def parse_entities(
+    records: Iterable[Mapping[str, Any]], registry: ModelRegistry | None = None
+) -> list[CRMEntity]:
+    """
+    Load stored entity records as their typed model classes.
+
+    Args:
+        records: Entity dicts, e.g. canonical JSON loaded with ``json.load``
+        registry: Registry to dispatch with; the generated classes by default
+
+    Returns:
+        Entities in input order, each an instance of its class code's model
+    """
+    return (registry or default_registry()).parse_many(records)
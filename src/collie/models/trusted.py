@@ -0,0 +1,235 @@
+"""
+Trusted fast path for reloading serialized entities and relations.
+
+Records that collie dumped itself are already valid, so validating them again
+on reload only costs time. The constructors here build models directly from
+the stored fields, converting UUID strings and filling defaults, without
+running validators. Snapshots carry a schema version that is checked before
+anything is constructed, and a configurable fraction of records can still be
+validated as a spot check.
+"""
+
+import random
+from collections.abc import Callable, Iterable, Mapping
+from types import UnionType
+from typing import Annotated, Any, Union, get_args, get_origin
+from uuid import UUID
+
+from pydantic import BaseModel, TypeAdapter
+
+from collie.models.base import SCHEMA_VERSION, CRMEntity, CRMRelation
+from collie.models.registry import ModelRegistry, default_registry, parse_entities
+
+_new = object.__new__
+_setattr = object.__setattr__
+
+
+class _Plan:
+    """Per-model information needed to construct instances quickly."""
+
+    def __init__(self, model: type[BaseModel]):
+        self.fields = frozenset(model.model_fields)
+        self.uuid_fields = tuple(
+            name
+            for name, field in model.model_fields.items()
+            if _is_uuid(field.annotation)
+        )
+
+
+def _is_uuid(annotation: Any) -> bool:
+    if annotation is UUID:
+        return True
+    origin = get_origin(annotation)
+    if origin is Annotated:
+        return _is_uuid(get_args(annotation)[0])
+    if origin in (Union, UnionType):
+        return any(_is_uuid(arg) for arg in get_args(annotation))
+    return False
+
+
+_uuid_list = TypeAdapter(list[UUID])
+
+
+def _construct_all(
+    records: Iterable[Mapping[str, Any]],
+    model_of: Callable[[Mapping[str, Any]], type[BaseModel]],
+    sampler: "_Sampler",
+) -> list[BaseModel]:
+    plans: dict[type[BaseModel], _Plan] = {}
+    built = []
+    # UUID strings are converted at the end in one pydantic-core call, which
+    # is much faster than calling UUID() on each
+    uuid_targets: list[Any] = []
+    uuid_values: list[str] = []
+    for index, record in enumerate(records):
+        model = model_of(record)
+        plan = plans.get(model)
+        if plan is None:
+            plan = plans[model] = _Plan(model)
+        data = dict(record)
+        fields_set = set(data)
+        if fields_set != plan.fields:
+            for name in fields_set - plan.fields:
+                del data[name]
+            fields_set &= plan.fields
+            for name, field in model.model_fields.items():
+                if name not in data:
+                    data[name] = field.get_default(call_default_factory=True)
+        for name in plan.uuid_fields:
+            value = data[name]
+            if value.__class__ is str:
+                uuid_targets.append(data)
+                uuid_targets.append(name)
+                uuid_values.append(value)
+        instance = _new(model)
+        _setattr(instance, "__dict__", data)
+        _setattr(instance, "__pydantic_fields_set__", fields_set)
+        _setattr(instance, "__pydantic_extra__", None)
+        _setattr(instance, "__pydantic_private__", None)
+        sampler.offer(index, record, instance)
+        built.append(instance)
+
+    targets = iter(uuid_targets)
+    for uuid in _uuid_list.validate_python(uuid_values):
+        data = next(targets)
+        data[next(targets)] = uuid
+    sampler.check()
+    return built
+
+
+def check_schema_version(schema_version: int | None) -> None:
+    """
+    Refuse records dumped under another schema version.
+
+    Raises:
+        ValueError: If ``schema_version`` is not the current SCHEMA_VERSION
+    """
+    if schema_version != SCHEMA_VERSION:
+        raise ValueError(
+            f"Records have schema version {schema_version}, expected {SCHEMA_VERSION}; "
+            "load them with parse_entities instead"
+        )
+
+
+class _Sampler:
+    """Validates a random fraction of constructed records against their input."""
+
+    def __init__(self, rate: float, seed: int | None):
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.rate = rate
+        self._random = random.Random(seed)
+        self._samples: list[tuple[int, Mapping[str, Any], BaseModel]] = []
+
+    def offer(self, index: int, record: Mapping[str, Any], built: BaseModel) -> None:
+        if self.rate and self._random.random() < self.rate:
+            self._samples.append((index, record, built))
+
+    def check(self) -> None:
+        """Validate the sampled records; call once their UUIDs are converted."""
+        for index, record, built in self._samples:
+            # Raises pydantic.ValidationError for a record that is not valid at all
+            validated = type(built).model_validate(record)
+            if validated != built:
+                raise ValueError(
+                    f"Record {index} differs from its validated form; "
+                    "load the snapshot with parse_entities instead"
+                )
+        self._samples.clear()
+
+
+def construct_entities(
+    records: Iterable[Mapping[str, Any]],
+    schema_version: int | None = SCHEMA_VERSION,
+    registry: ModelRegistry | None = None,
+    sample_rate: float = 0.0,
+    seed: int | None = None,
+) -> list[CRMEntity]:
+    """
+    Build entities from trusted records without validating them.
+
+    Only use this for records collie serialized itself (``model_dump``
+    output). Lists in the records are reused by the entities, not copied.
+
+    Args:
+        records: Entity dicts
+        schema_version: SCHEMA_VERSION the records were dumped under
+        registry: Registry choosing each record's model class
+        sample_rate: Fraction of records to also validate, between 0 and 1
+        seed: Seed for choosing the sampled records
+
+    Returns:
+        Entities in input order, each an instance of its class code's model
+
+    Raises:
+        ValueError: On a schema version mismatch, or if a sampled record
+            constructs differently than it validates
+    """
+    check_schema_version(schema_version)
+    registry = registry or default_registry()
+    return _construct_all(
+        records,
+        lambda record: registry.get(record.get("class_code")),
+        _Sampler(sample_rate, seed),
+    )
+
+
+def construct_relations(
+    records: Iterable[Mapping[str, Any]],
+    schema_version: int | None = SCHEMA_VERSION,
+    sample_rate: float = 0.0,
+    seed: int | None = None,
+) -> list[CRMRelation]:
+    """
+    Build relations from trusted records without validating them.
+
+    Arguments and errors are as for :func:`construct_entities`.
+    """
+    check_schema_version(schema_version)
+    return _construct_all(
+        records, lambda _record: CRMRelation, _Sampler(sample_rate, seed)
+    )
+
+
+def dump_snapshot(
+    entities: Iterable[CRMEntity], relations: Iterable[CRMRelation] = ()
+) -> dict[str, Any]:
+    """JSON-ready snapshot of entities and relations, tagged with SCHEMA_VERSION."""
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "entities": [entity.model_dump(mode="json") for entity in entities],
+        "relations": [relation.model_dump(mode="json") for relation in relations],
+    }
+
+
+def load_snapshot(
+    snapshot: Mapping[str, Any],
+    trusted: bool = True,
+    sample_rate: float = 0.0,
+    seed: int | None = None,
+) -> tuple[list[CRMEntity], list[CRMRelation]]:
+    """
+    Load a snapshot written by :func:`dump_snapshot`.
+
+    Args:
+        snapshot: Snapshot dict, e.g. loaded with ``json.load``
+        trusted: Construct without validation; False validates every record
+        sample_rate: Fraction of records validated on the trusted path
+        seed: Seed for choosing the sampled records
+
+    Returns:
+        (entities, relations)
+    """
+    if not trusted:
+        return (
+            parse_entities(snapshot.get("entities", [])),
+            [CRMRelation.model_validate(r) for r in snapshot.get("relations", [])],
+        )
+    version = snapshot.get("schema_version")
+    entities = construct_entities(
+        snapshot.get("entities", []), version, sample_rate=sample_rate, seed=seed
+    )
+    relations = construct_relations(
+        snapshot.get("relations", []), version, sample_rate=sample_rate, seed=seed
+    )
+    return entities, relations
@@ -0,0 +1,14 @@
+"""Offline entity resolution for COLLIE."""
+
+from .blocking import candidate_pairs, entity_keys, normalize_label
+from .matching import score_pair
+from .resolver import EntityResolver, ResolutionResult
+
+__all__ = [
+    "EntityResolver",
+    "ResolutionResult",
+    "candidate_pairs",
+    "entity_keys",
+    "normalize_label",
+    "score_pair",
+]
@@ -0,0 +1,150 @@
+"""
+Pairwise scoring of candidate duplicates.
+
+Scoring runs in worker processes. The record features are shipped to each
+worker once, through the pool initializer, and the workers then receive only
+batches of index pairs, so the per-task pickling cost stays small.
+"""
+
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from difflib import SequenceMatcher
+
+from .blocking import EntityKey
+
+ScoredPair = tuple[int, int, float]
+
+# Score added when both records carry the same year
+YEAR_BONUS = 0.05
+
+_worker_keys: list[EntityKey] = []
+
+
+def _ratio(a: str, b: str, cutoff: float) -> float:
+    matcher = SequenceMatcher(None, a, b)
+    # The quick ratios are cheap upper bounds of the full ratio
+    if matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff:
+        return 0.0
+    return matcher.ratio()
+
+
+def label_similarity(a: EntityKey, b: EntityKey, cutoff: float = 0.0) -> float:
+    """
+    Similarity of two normalized labels, between 0 and 1.
+
+    The best of the character ratio on the labels as written, the character
+    ratio on their sorted tokens, and token overlap, so word order does not
+    matter. Character ratios that cannot reach ``cutoff`` are not computed
+    and count as 0.
+    """
+    if not a.label or not b.label:
+        return 0.0
+    if a.label == b.label or a.tokens == b.tokens:
+        return 1.0
+    tokens_a = set(a.label.split())
+    tokens_b = set(b.label.split())
+    best = len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+    for x, y in ((a.label, b.label), (a.tokens, b.tokens)):
+        best = max(best, _ratio(x, y, max(cutoff, best)))
+    return best
+
+
+def score_pair(a: EntityKey, b: EntityKey, cutoff: float = 0.0) -> float:
+    """
+    Probability-like score that two records describe the same entity.
+
+    Records of different classes never match, nor do labels carrying
+    different numbers ("Gallery 12" and "Gallery 13"). Matching years raise
+    the score slightly, and years more than a year apart rule the pair out.
+    Scores that cannot reach ``cutoff`` may be returned as 0.
+    """
+    if a.class_code != b.class_code:
+        return 0.0
+    numbers_a = {t for t in a.label.split() if t.isdigit()}
+    numbers_b = {t for t in b.label.split() if t.isdigit()}
+    if numbers_a != numbers_b:
+        return 0.0
+    bonus = 0.0
+    if a.year is not None and b.year is not None:
+        if abs(a.year - b.year) > 1:
+            return 0.0
+        if a.year == b.year:
+            bonus = YEAR_BONUS
+    return min(1.0, label_similarity(a, b, cutoff - bonus) + bonus)
+
+
+def score_batch(
+    keys: list[EntityKey], pairs: Iterable[tuple[int, int]], threshold: float
+) -> list[ScoredPair]:
+    """Scores of the pairs reaching ``threshold``."""
+    matches = []
+    for i, j in pairs:
+        score = score_pair(keys[i], keys[j], threshold)
+        if score >= threshold:
+            matches.append((i, j, score))
+    return matches
+
+
+def _init_worker(keys: list[EntityKey]) -> None:
+    global _worker_keys
+    _worker_keys = keys
+
+
+def _score_worker_batch(
+    pairs: list[tuple[int, int]], threshold: float
+) -> list[ScoredPair]:
+    return score_batch(_worker_keys, pairs, threshold)
+
+
+def _batches(
+    pairs: Iterable[tuple[int, int]], batch_size: int
+) -> Iterator[list[tuple[int, int]]]:
+    batch = []
+    for pair in pairs:
+        batch.append(pair)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def score_pairs(
+    keys: list[EntityKey],
+    pairs: Iterable[tuple[int, int]],
+    threshold: float,
+    processes: int | None = None,
+    batch_size: int = 5000,
+) -> Iterator[ScoredPair]:
+    """
+    Score candidate pairs, in parallel when ``processes`` is not 1.
+
+    Args:
+        keys: Features of all records, indexed by record index
+        pairs: Candidate (i, j) index pairs
+        threshold: Minimum score of the pairs returned
+        processes: Number of worker processes; None uses every CPU, 1 scores in-process
+        batch_size: Number of pairs sent to a worker per task
+
+    Yields:
+        (i, j, score) for every pair scoring at least ``threshold``
+    """
+    if processes == 1:
+        yield from score_batch(keys, pairs, threshold)
+        return
+
+    # Only a few batches per worker are queued at a time, so pairs are
+    # generated as fast as they are scored rather than all up front
+    max_in_flight = 2 * (processes or os.cpu_count() or 1)
+    in_flight: deque[Future] = deque()
+    with ProcessPoolExecutor(
+        max_workers=processes, initializer=_init_worker, initargs=(keys,)
+    ) as pool:
+        for batch in _batches(pairs, batch_size):
+            if len(in_flight) >= max_in_flight:
+                yield from in_flight.popleft().result()
+            in_flight.append(pool.submit(_score_worker_batch, batch, threshold))
+        while in_flight:
+            yield from in_flight.popleft().result()
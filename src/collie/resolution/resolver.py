@@ -0,0 +1,220 @@
+"""
+Entity resolution over a corpus of CRM entities.
+
+The resolver blocks the entities into candidate pairs, scores the pairs in a
+process pool, and groups matches into clusters with union-find. Each cluster
+is represented by its first entity in input order, and the result maps every
+merged ID to that canonical ID.
+"""
+
+import csv
+import logging
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from collie.models.base import CRMEntity, CRMRelation
+
+from .blocking import DEFAULT_BUCKET_YEARS, DEFAULT_WINDOW, candidate_pairs, entity_keys
+from .matching import score_pairs
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.9
+
+
+class ResolutionResult(BaseModel):
+    """Merge clusters and the ID remap table produced by entity resolution."""
+
+    clusters: list[list[UUID]] = Field(
+        default_factory=list,
+        description="Clusters of two or more IDs, canonical ID first",
+    )
+    id_map: dict[UUID, UUID] = Field(
+        default_factory=dict,
+        description="Canonical ID of every merged (non-canonical) ID",
+    )
+    candidate_pairs: int = Field(0, description="Number of pairs scored")
+    matched_pairs: int = Field(
+        0, description="Number of pairs at or above the threshold"
+    )
+
+    def canonical(self, entity_id: UUID) -> UUID:
+        """Canonical ID of an entity; IDs that were not merged map to themselves."""
+        return self.id_map.get(entity_id, entity_id)
+
+    def apply_to_entities(self, entities: Iterable[CRMEntity]) -> list[CRMEntity]:
+        """
+        Drop merged entities, folding what they add into their canonical entity.
+
+        The canonical entity keeps its own fields; a missing label or notes is
+        taken from the first duplicate that has one, and type assignments are
+        combined.
+        """
+        entities = list(entities)
+        duplicates: dict[UUID, list[CRMEntity]] = {}
+        for entity in entities:
+            canonical = self.id_map.get(entity.id)
+            if canonical is not None:
+                duplicates.setdefault(canonical, []).append(entity)
+
+        merged = []
+        for entity in entities:
+            if entity.id in self.id_map:
+                continue
+            others = duplicates.get(entity.id)
+            if others:
+                update = {
+                    "type": list(
+                        dict.fromkeys(entity.type + [t for o in others for t in o.type])
+                    )
+                }
+                for field in ("label", "notes"):
+                    if getattr(entity, field) is None:
+                        update[field] = next(
+                            (
+                                getattr(o, field)
+                                for o in others
+                                if getattr(o, field) is not None
+                            ),
+                            None,
+                        )
+                entity = entity.model_copy(update=update)
+            merged.append(entity)
+        return merged
+
+    def apply_to_relations(self, relations: Iterable[CRMRelation]) -> list[CRMRelation]:
+        """
+        Point relations at canonical IDs.
+
+        Relations that become duplicates of an earlier one (same source, type
+        and target) are dropped, as are relations between two entities that
+        were merged into one.
+        """
+        seen: set[tuple[UUID, str, UUID]] = set()
+        remapped = []
+        for relation in relations:
+            src = self.canonical(relation.src)
+            tgt = self.canonical(relation.tgt)
+            if src == tgt and relation.src != relation.tgt:
+                continue
+            key = (src, relation.type, tgt)
+            if key in seen:
+                continue
+            seen.add(key)
+            if src != relation.src or tgt != relation.tgt:
+                relation = relation.model_copy(update={"src": src, "tgt": tgt})
+            remapped.append(relation)
+        return remapped
+
+    def write_id_map(self, path: str | Path) -> None:
+        """Write the remap table as CSV with ``id,canonical_id`` columns."""
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "canonical_id"])
+            for entity_id, canonical in self.id_map.items():
+                writer.writerow([entity_id, canonical])
+
+
+class EntityResolver:
+    """
+    Find and merge duplicate CRM entities.
+
+    Only records sharing a class code and sorting within ``window`` of each
+    other on their normalized label are compared, which keeps the number of
+    comparisons linear in the number of entities.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        window: int = DEFAULT_WINDOW,
+        bucket_years: int = DEFAULT_BUCKET_YEARS,
+        processes: int | None = None,
+        batch_size: int = 5000,
+    ):
+        """
+        Args:
+            threshold: Minimum pair score for two entities to be merged
+            window: Sorted-neighbourhood window size
+            bucket_years: Width of the date buckets used for blocking
+            processes: Number of scoring processes; None uses every CPU, 1 scores in-process
+            batch_size: Number of pairs per scoring task
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        self.threshold = threshold
+        self.window = window
+        self.bucket_years = bucket_years
+        self.processes = processes
+        self.batch_size = batch_size
+
+    def resolve(self, entities: Iterable[CRMEntity]) -> ResolutionResult:
+        """
+        Cluster duplicate entities.
+
+        Args:
+            entities: Entities to resolve; IDs are expected to be unique
+
+        Returns:
+            ResolutionResult with the merge clusters and ID remap table
+        """
+        entities = list(entities)
+        keys = entity_keys(entities)
+        logger.info("Scoring candidate pairs among %s entities", len(entities))
+        scored = 0
+
+        def counted(pairs: Iterator[tuple[int, int]]) -> Iterator[tuple[int, int]]:
+            nonlocal scored
+            for pair in pairs:
+                scored += 1
+                yield pair
+
+        parent = list(range(len(entities)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        matched = 0
+        for i, j, _score in score_pairs(
+            keys,
+            counted(candidate_pairs(keys, self.window, self.bucket_years)),
+            self.threshold,
+            self.processes,
+            self.batch_size,
+        ):
+            matched += 1
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                # The earlier record stays the root, and so the canonical entity
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        logger.info("Scored %s candidate pairs, %s matched", scored, matched)
+
+        members: dict[int, list[int]] = {}
+        for index in range(len(entities)):
+            members.setdefault(find(index), []).append(index)
+
+        clusters = []
+        id_map = {}
+        for root, indices in members.items():
+            if len(indices) < 2:
+                continue
+            canonical = entities[root].id
+            clusters.append([entities[i].id for i in indices])
+            for i in indices[1:]:
+                id_map[entities[i].id] = canonical
+
+        return ResolutionResult(
+            clusters=clusters,
+            id_map=id_map,
+            candidate_pairs=scored,
+            matched_pairs=matched,
+        )
@@ -0,0 +1,1560 @@
+"""
+Unit tests for the extraction pipeline (no network access required).
+"""
+
+import argparse
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.usage import RunUsage
+
+from ...extraction.backends import (
+    AgentBackend,
+    CascadeBackend,
+    ExtractionBackend,
+    HedgedBackend,
+    PoolBackend,
+    PoolMember,
+    RecordingBackend,
+    ReplayBackend,
+    StubBackend,
+)
+from ...extraction.budget import BudgetScheduler
+from ...extraction.cache import ExtractionCache
+from ...extraction.chunking import split_into_chunks
+from ...extraction.extractor import InformationExtractor
+from ...extraction.incremental import DocumentManifest
+from ...extraction.jobs import ExtractionJob
+from ...extraction.label_index import LabelIndex
+from ...extraction.lenient import LenientCIDOCExtractionResult, parse_lenient
+from ...extraction.linking import EntityLinkingIndex, blocking_key
+from ...extraction.llm_models import (
+    CIDOCDocumentExtraction,
+    CIDOCExtractionResult,
+    CIDOCLinkedRelationship,
+    CIDOCLinkingResult,
+    CIDOCPackedExtractionResult,
+    CIDOCPerson,
+    CIDOCPlace,
+    CIDOCRelationship,
+)
+from ...extraction.mapreduce import (
+    EntityRoster,
+    resolve_linked_relationships,
+    select_context,
+)
+from ...extraction.merging import merge_results
+from ...extraction.offsets import AnchorResolver
+from ...extraction.packing import DOCUMENT_PATTERN, pack_documents
+from ...extraction.prefilter import SegmentPrefilter
+from ...extraction.throttling import (
+    AdaptiveConcurrencyLimiter,
+    RetryPolicy,
+    TokenBucket,
+)
+from ...extraction.usage import Usage, track_usage
+from ...io.to_networkx.graph_builder import extraction_result_to_networkx
+from ...extraction.models import (
+    ExtractedEntity,
+    ExtractedRelationship,
+    ExtractionResult,
+    PersonExtraction,
+    PlaceExtraction,
+)
+from ...main import add_backend_arguments, create_extractor
+
+
+def make_llm_result(text: str) -> CIDOCExtractionResult:
+    """Build a small structured result mentioning Einstein and Ulm."""
+    return CIDOCExtractionResult(
+        persons=[
+            CIDOCPerson(
+                label="Albert Einstein",
+                description="Physicist",
+                confidence=0.9,
+                source_text=text[:40],
+            )
+        ],
+        places=[
+            CIDOCPlace(
+                label="Ulm",
+                description="City in Germany",
+                place_type="City",
+                confidence=0.8,
+                source_text=text[:40],
+            )
+        ],
+        relationships=[
+            CIDOCRelationship(
+                source_label="Albert Einstein",
+                target_label="Ulm",
+                property_code="P98",
+                property_label="was born in",
+                description="Birthplace",
+                confidence=0.9,
+                source_text=text[:40],
+            )
+        ],
+        extraction_confidence=0.9,
+        total_entities=2,
+        total_relationships=1,
+    )
+
+
+class FakeRunResult(SimpleNamespace):
+    """Agent run result reporting 100 input and 20 output tokens."""
+
+    def __init__(self, output):
+        super().__init__(output=output)
+
+    def usage(self) -> RunUsage:
+        return RunUsage(requests=1, input_tokens=100, output_tokens=20)
+
+
+class FakeAgent:
+    """Stand-in for a PydanticAI agent that records prompts and concurrency."""
+
+    def __init__(self, delay: float = 0.0, failures: int = 0, status_code: int = 429):
+        self.delay = delay
+        self.failures = failures
+        self.status_code = status_code
+        self.prompts = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def run(self, prompt: str, output_type=None):
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failures:
+                self.failures -= 1
+                raise ModelHTTPError(self.status_code, "fake-model")
+        finally:
+            self.in_flight -= 1
+        if output_type is CIDOCPackedExtractionResult:
+            documents = [
+                CIDOCDocumentExtraction(
+                    document_id=int(i), **dict(make_llm_result(text))
+                )
+                for i, text in DOCUMENT_PATTERN.findall(prompt)
+            ]
+            return FakeRunResult(CIDOCPackedExtractionResult(documents=documents))
+        return FakeRunResult(make_llm_result(prompt))
+
+
+def make_extractor(agent: FakeAgent, **kwargs) -> InformationExtractor:
+    """Create an extractor backed by a fake agent."""
+    return InformationExtractor(backend=AgentBackend(agent, "fake-model"), **kwargs)
+
+
+def make_document(paragraphs: int = 12) -> str:
+    """Build a multi-paragraph document."""
+    return "\n\n".join(
+        f"Paragraph {i}. Albert Einstein was born in Ulm. " + "Filler text. " * 20
+        for i in range(paragraphs)
+    )
+
+
+class TestChunking:
+    """Test document chunking."""
+
+    def test_short_text_is_single_chunk(self):
+        """Test that short text is not split."""
+        chunks = split_into_chunks(
+            "Einstein was born in Ulm.", max_chars=100, overlap=0
+        )
+        assert len(chunks) == 1
+        assert chunks[0].text == "Einstein was born in Ulm."
+
+    def test_chunks_respect_size_and_cover_text(self):
+        """Test that chunks stay under the size limit and cover every paragraph."""
+        text = make_document()
+        chunks = split_into_chunks(text, max_chars=1000, overlap=400)
+
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert len(chunk.text) <= 1000
+            assert chunk.text == text[chunk.start : chunk.end]
+        for i in range(12):
+            assert any(f"Paragraph {i}." in chunk.text for chunk in chunks)
+
+    def test_chunks_overlap_on_paragraph_boundaries(self):
+        """Test that consecutive chunks share whole paragraphs."""
+        text = make_document()
+        chunks = split_into_chunks(text, max_chars=1000, overlap=400)
+
+        for previous, current in zip(chunks, chunks[1:], strict=False):
+            assert current.start < previous.end
+            assert current.text.startswith("Paragraph")
+
+    def test_oversized_paragraph_split_on_sentences(self):
+        """Test that a paragraph longer than the window is split on sentences."""
+        text = " ".join(f"Sentence number {i} is here." for i in range(100))
+        chunks = split_into_chunks(text, max_chars=200, overlap=0)
+
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert len(chunk.text) <= 200
+            assert chunk.text.startswith("Sentence")
+
+    def test_overlap_must_be_smaller_than_window(self):
+        """Test that an overlap as large as the window is rejected."""
+        with pytest.raises(ValueError):
+            split_into_chunks("a. " * 5000, max_chars=100, overlap=500)
+        with pytest.raises(ValueError):
+            split_into_chunks("a. " * 5000, max_chars=100, overlap=100)
+
+
+class TestMerging:
+    """Test merging of partial extraction results."""
+
+    def test_merge_deduplicates_entities_and_remaps_relationships(self):
+        """Test that duplicate entities collapse and relationships follow them."""
+        results = []
+        for confidence in (0.6, 0.9):
+            person = PersonExtraction(label="Albert Einstein", confidence=confidence)
+            place = PlaceExtraction(label="Ulm ", place_type="City", confidence=0.8)
+            rel = ExtractedRelationship(
+                source_id=person.id,
+                target_id=place.id,
+                property_code="P98",
+                property_label="was born in",
+                confidence=confidence,
+            )
+            results.append(
+                ExtractionResult(entities=[person, place], relationships=[rel])
+            )
+
+        first_person_id = results[0].entities[0].id
+        merged = merge_results(results)
+
+        assert len(merged.entities) == 2
+        assert len(merged.relationships) == 1
+        assert merged.entities[0].id == first_person_id
+        assert merged.entities[0].confidence == 0.9
+        assert merged.relationships[0].source_id == first_person_id
+        assert merged.relationships[0].confidence == 0.9
+
+        # The partial results themselves are left untouched
+        assert results[0].entities[0].confidence == 0.6
+        assert results[0].relationships[0].confidence == 0.6
+        assert results[1].relationships[0].source_id == results[1].entities[0].id
+
+
+class TestChunkedExtraction:
+    """Test chunked long-document extraction with a fake agent."""
+
+    def test_extract_from_text_uses_agent_output(self):
+        """Test single-call extraction converts the agent output."""
+        extractor = make_extractor(FakeAgent())
+        result = asyncio.run(extractor.extract_from_text("Einstein was born in Ulm."))
+
+        assert len(result.entities) == 2
+        assert len(result.relationships) == 1
+        assert result.extraction_metadata["extraction_method"] == "llm_structured"
+
+    def test_long_text_is_extracted_concurrently_and_merged(self):
+        """Test that chunks run concurrently and duplicates are merged."""
+        agent = FakeAgent(delay=0.01)
+        extractor = make_extractor(agent)
+        text = make_document()
+
+        result = asyncio.run(
+            extractor.extract_from_long_text(
+                text, max_chunk_chars=1000, chunk_overlap=400, max_concurrency=3
+            )
+        )
+
+        chunks = result.extraction_metadata["chunks"]
+        assert chunks > 1
+        assert len(agent.prompts) == chunks
+        assert agent.max_in_flight == 3
+        assert len(result.entities) == 2
+        assert len(result.relationships) == 1
+        assert result.extraction_metadata["failed_chunks"] == 0
+
+
+async def collect(async_iterator):
+    """Drain an async iterator into a list."""
+    return [item async for item in async_iterator]
+
+
+class TestBatchExtraction:
+    """Test the corpus-scale batch extraction API."""
+
+    def test_extract_many_bounded_concurrency(self, tmp_path):
+        """Test that every input is extracted with bounded concurrency."""
+        agent = FakeAgent(delay=0.01)
+        extractor = make_extractor(agent)
+        path = tmp_path / "doc.txt"
+        path.write_text("Einstein was born in Ulm.")
+        inputs = [f"Document {i} about Einstein." for i in range(10)] + [path]
+
+        results = asyncio.run(
+            collect(extractor.extract_many(inputs, max_concurrency=4))
+        )
+
+        assert sorted(index for index, _ in results) == list(range(11))
+        assert agent.max_in_flight == 4
+        assert any("Einstein was born in Ulm." in prompt for prompt in agent.prompts)
+        for _, result in results:
+            assert result.extraction_metadata["extraction_method"] == "llm_structured"
+
+    def test_extract_many_retries_transient_errors(self):
+        """Test that rate-limit errors are retried with backoff."""
+        agent = FakeAgent(failures=2, status_code=429)
+        extractor = make_extractor(agent)
+        policy = RetryPolicy(max_retries=3, base_delay=0.001)
+
+        results = asyncio.run(
+            collect(extractor.extract_many(["Einstein."], retry_policy=policy))
+        )
+
+        result = results[0][1]
+        assert result.extraction_metadata["extraction_method"] == "llm_structured"
+        assert result.extraction_metadata["attempts"] == 3
+
+    def test_extract_many_does_not_retry_permanent_errors(self):
+        """Test that client errors fail immediately with an llm_failed result."""
+        agent = FakeAgent(failures=1, status_code=400)
+        extractor = make_extractor(agent)
+        policy = RetryPolicy(max_retries=3, base_delay=0.001)
+
+        results = asyncio.run(
+            collect(extractor.extract_many(["Einstein."], retry_policy=policy))
+        )
+
+        assert results[0][1].extraction_metadata["extraction_method"] == "llm_failed"
+        assert len(agent.prompts) == 1
+
+    def test_extract_many_coalesces_duplicates(self):
+        """Test that identical inputs share one call and get independent copies."""
+        agent = FakeAgent(delay=0.01)
+        extractor = make_extractor(agent)
+        inputs = ["Obituary of Albert Einstein.", "Catalogue boilerplate."] * 5
+
+        results = dict(
+            asyncio.run(collect(extractor.extract_many(inputs, max_concurrency=4)))
+        )
+
+        assert len(agent.prompts) == 2
+        assert len(results) == 10
+        assert "duplicate_of" not in results[0].extraction_metadata
+        assert results[2].extraction_metadata["duplicate_of"] == 0
+        assert results[3].extraction_metadata["duplicate_of"] == 1
+        assert results[2].entities[0].label == "Albert Einstein"
+        assert results[2].entities[0] is not results[0].entities[0]
+
+    def test_extract_many_retries_failed_duplicates(self):
+        """Test that a failed first extraction is not reused for later duplicates."""
+        agent = FakeAgent(failures=1, status_code=400)
+        inputs = ["Albert Einstein.", "Albert Einstein."]
+
+        results = dict(
+            asyncio.run(
+                collect(make_extractor(agent).extract_many(inputs, max_concurrency=1))
+            )
+        )
+
+        assert len(agent.prompts) == 2
+        assert results[0].extraction_metadata["extraction_method"] == "llm_failed"
+        assert results[1].extraction_metadata["extraction_method"] == "llm_structured"
+        assert "duplicate_of" not in results[1].extraction_metadata
+
+    def test_extract_many_bounds_shared_results(self):
+        """Test that only the most recently finished results serve duplicates."""
+        inputs = [
+            "Albert Einstein.",
+            "Marie Curie.",
+            "Marie Curie.",
+            "Albert Einstein.",
+        ]
+
+        agent = FakeAgent()
+        asyncio.run(
+            collect(make_extractor(agent).extract_many(inputs, max_concurrency=1))
+        )
+        assert len(agent.prompts) == 2
+
+        agent = FakeAgent()
+        results = dict(
+            asyncio.run(
+                collect(
+                    make_extractor(agent).extract_many(
+                        inputs, max_concurrency=1, max_shared_results=1
+                    )
+                )
+            )
+        )
+        # Curie was still held when it came again; Einstein had been evicted
+        assert len(agent.prompts) == 3
+        assert results[2].extraction_metadata["duplicate_of"] == 1
+        assert "duplicate_of" not in results[3].extraction_metadata
+
+    def test_token_bucket_paces_acquisitions(self):
+        """Test that the token bucket limits the acquisition rate."""
+
+        async def acquire_all():
+            bucket = TokenBucket(rate=100.0, capacity=1.0)
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            for _ in range(6):
+                await bucket.acquire()
+            return loop.time() - start
+
+        assert asyncio.run(acquire_all()) >= 0.045
+
+
+class TestExtractionCache:
+    """Test the persistent LLM response cache."""
+
+    def test_cached_response_is_replayed(self, tmp_path):
+        """Test that a repeated call is served from the cache."""
+        cache_path = tmp_path / "cache.sqlite"
+        agent = FakeAgent()
+        extractor = make_extractor(agent, cache=ExtractionCache(cache_path))
+
+        first = asyncio.run(extractor.extract_from_text("Einstein was born in Ulm."))
+        # A fresh cache instance on the same file simulates a later run
+        extractor.cache = ExtractionCache(cache_path)
+        second = asyncio.run(extractor.extract_from_text("Einstein was born in Ulm."))
+
+        assert len(agent.prompts) == 1
+        assert first.extraction_metadata["cache_hit"] is False
+        assert second.extraction_metadata["cache_hit"] is True
+        assert [e.label for e in second.entities] == [e.label for e in first.entities]
+        assert extractor.cache.stats()["hits"] == 1
+
+    def test_key_depends_on_model_and_prompt(self):
+        """Test that the cache key changes with the model name and prompt."""
+        key = ExtractionCache.make_key("p", "s", "m1", CIDOCExtractionResult)
+        assert key == ExtractionCache.make_key("p", "s", "m1", CIDOCExtractionResult)
+        assert key != ExtractionCache.make_key("p", "s", "m2", CIDOCExtractionResult)
+        assert key != ExtractionCache.make_key("q", "s", "m1", CIDOCExtractionResult)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted at the size cap."""
+        cache = ExtractionCache(":memory:", max_entries=2)
+        output = make_llm_result("Einstein")
+        cache.put("a", output)
+        cache.put("b", output)
+        assert cache.get("a", CIDOCExtractionResult) is not None
+        cache.put("c", output)
+
+        assert len(cache) == 2
+        assert cache.get("b", CIDOCExtractionResult) is None
+        assert cache.get("a", CIDOCExtractionResult) is not None
+        assert cache.evictions == 1
+        assert cache.misses == 1
+
+
+def linear_label_lookup(entities, label):
+    """Reference implementation: linear exact scan, then substring scan."""
+    query = " ".join(label.lower().split())
+    if not query:
+        return None
+    for entity in entities:
+        if " ".join(entity.label.lower().split()) == query:
+            return entity
+    for entity in entities:
+        candidate = " ".join(entity.label.lower().split())
+        if candidate and (query in candidate or candidate in query):
+            return entity
+    return None
+
+
+class TestLabelIndex:
+    """Test indexed relationship endpoint resolution."""
+
+    def make_entities(self):
+        labels = [
+            "Albert Einstein",
+            "Einstein",
+            "Ulm",
+            "Ulm, Germany",
+            "Princeton University",
+            "Institute for Advanced Study",
+            "Nobel Prize in Physics",
+            "US",
+        ]
+        return [ExtractedEntity(class_code="E1", label=label) for label in labels]
+
+    def test_exact_match_is_case_and_whitespace_insensitive(self):
+        """Test exact lookups after normalization."""
+        index = LabelIndex(self.make_entities())
+        assert index.find("  einstein ").label == "Einstein"
+        assert index.find("ULM").label == "Ulm"
+
+    def test_partial_match_prefers_first_entity(self):
+        """Test substring lookups in both directions with deterministic ties."""
+        index = LabelIndex(self.make_entities())
+        assert index.find("Princeton").label == "Princeton University"
+        assert index.find("Dr. Albert Einstein").label == "Albert Einstein"
+        assert (
+            index.find("The Nobel Prize in Physics 1921").label
+            == "Nobel Prize in Physics"
+        )
+        assert index.find("Bern Patent Office") is None
+        assert index.find("") is None
+
+    def test_matches_linear_scan(self):
+        """Test that the index agrees with the linear reference lookup."""
+        entities = self.make_entities()
+        index = LabelIndex(entities)
+        queries = [
+            "Einstein",
+            "Albert",
+            "stein",
+            "Germany",
+            "ulm, germany, europe",
+            "US",
+            "u",
+            "Advanced",
+            "institute for advanced study at princeton",
+            "physics",
+            "Zurich",
+        ]
+        for query in queries:
+            assert index.find(query) is linear_label_lookup(entities, query), query
+
+
+class TestBackends:
+    """Test the record, replay and stub model backends."""
+
+    def test_record_then_replay(self, tmp_path):
+        """Test that recorded responses replay identically without the model."""
+        agent = FakeAgent()
+        recorder = InformationExtractor(
+            backend=RecordingBackend(AgentBackend(agent, "fake-model"), tmp_path)
+        )
+        recorded = asyncio.run(recorder.extract_from_text("Einstein was born in Ulm."))
+
+        replayer = InformationExtractor(backend=ReplayBackend(tmp_path, latency=0.001))
+        replayed = asyncio.run(replayer.extract_from_text("Einstein was born in Ulm."))
+
+        assert len(agent.prompts) == 1
+        assert [e.label for e in replayed.entities] == [
+            e.label for e in recorded.entities
+        ]
+        assert replayed.extraction_metadata["model"] == "replay"
+
+    def test_replay_missing_fixture_fails(self, tmp_path):
+        """Test that an unrecorded prompt yields an llm_failed result."""
+        extractor = InformationExtractor(backend=ReplayBackend(tmp_path))
+        result = asyncio.run(extractor.extract_from_text("Never recorded."))
+        assert result.extraction_metadata["extraction_method"] == "llm_failed"
+
+    def test_stub_backend_generates_valid_results(self, monkeypatch):
+        """Test the offline stub backend without an API key."""
+        monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+        extractor = InformationExtractor(backend=StubBackend())
+        result = asyncio.run(
+            extractor.extract_from_text(
+                "Albert Einstein was born in Ulm in 1879 and moved to Princeton in 1933."
+            )
+        )
+
+        labels = {e.label for e in result.entities}
+        assert {"Albert Einstein", "Ulm", "Princeton", "1879", "1933"} <= labels
+        assert result.extraction_metadata["model"] == "stub"
+        assert any(r.property_code == "P98" for r in result.relationships)
+        assert len(result.relationships) == 3
+
+
+class TestStreamingExtraction:
+    """Test incremental extraction results."""
+
+    def test_stream_yields_deduplicated_deltas(self):
+        """Test that each chunk yields only new entities and relationships."""
+        extractor = make_extractor(FakeAgent(delay=0.01))
+        text = make_document()
+
+        async def consume():
+            graph = None
+            deltas = []
+            async for delta in extractor.extract_stream(
+                text, max_chunk_chars=1000, chunk_overlap=400, max_concurrency=2
+            ):
+                deltas.append(delta)
+                graph = extraction_result_to_networkx(delta, graph=graph)
+            return deltas, graph
+
+        deltas, graph = asyncio.run(consume())
+
+        assert len(deltas) == deltas[0].extraction_metadata["chunks"]
+        assert sum(len(d.entities) for d in deltas) == 2
+        assert sum(len(d.relationships) for d in deltas) == 1
+        assert graph.number_of_nodes() == 2
+        assert graph.number_of_edges() == 1
+
+
+class CountingStubBackend(StubBackend):
+    """Stub backend that records the text of every extraction prompt."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    async def run(self, prompt: str, output_type=CIDOCExtractionResult):
+        self.calls.append(prompt)
+        return await super().run(prompt, output_type)
+
+
+class TestIncrementalExtraction:
+    """Test re-extraction of changed paragraphs only."""
+
+    paragraphs = [
+        "Albert Einstein moved to Bern in 1902.",
+        "Marie Curie worked in Paris in 1903.",
+        "Niels Bohr lectured in Copenhagen in 1922.",
+    ]
+
+    def test_only_changed_paragraphs_are_extracted(self, tmp_path):
+        """Test that unchanged paragraphs keep their entities and IDs."""
+        backend = CountingStubBackend()
+        extractor = InformationExtractor(backend=backend)
+
+        first, manifest = asyncio.run(
+            extractor.extract_incremental("\n\n".join(self.paragraphs))
+        )
+        assert len(backend.calls) == 3
+        assert len(manifest.segments) == 3
+
+        manifest.save(tmp_path / "manifest.json")
+        manifest = DocumentManifest.load(tmp_path / "manifest.json")
+
+        edited = list(self.paragraphs)
+        edited[1] = "Marie Curie worked in Warsaw in 1903."
+        edited.append("Lise Meitner fled to Stockholm in 1938.")
+        backend.calls.clear()
+        second, new_manifest = asyncio.run(
+            extractor.extract_incremental(
+                "\n\n".join(edited), previous=first, manifest=manifest
+            )
+        )
+
+        assert len(backend.calls) == 2
+        assert second.extraction_metadata["reused_segments"] == 2
+        assert second.extraction_metadata["extracted_segments"] == 2
+
+        first_ids = {(e.class_code, e.label): e.id for e in first.entities}
+        second_ids = {(e.class_code, e.label): e.id for e in second.entities}
+        # Unchanged and re-extracted known entities keep their IDs
+        assert (
+            second_ids[("E21", "Albert Einstein")]
+            == first_ids[("E21", "Albert Einstein")]
+        )
+        assert second_ids[("E21", "Marie Curie")] == first_ids[("E21", "Marie Curie")]
+        assert ("E53", "Paris") not in second_ids
+        assert ("E53", "Warsaw") in second_ids
+        assert ("E21", "Lise Meitner") in second_ids
+
+        entity_ids = set(second_ids.values())
+        assert all(
+            r.source_id in entity_ids and r.target_id in entity_ids
+            for r in second.relationships
+        )
+        assert len(new_manifest.segments) == 4
+
+        backend.calls.clear()
+        asyncio.run(
+            extractor.extract_incremental(
+                "\n\n".join(edited), previous=second, manifest=new_manifest
+            )
+        )
+        assert backend.calls == []
+
+    def test_failed_paragraphs_are_retried(self):
+        """Test that a failed paragraph is left out of the manifest."""
+        extractor = make_extractor(FakeAgent(failures=1, status_code=400))
+        text = "First paragraph.\n\nSecond paragraph."
+
+        result, manifest = asyncio.run(
+            extractor.extract_incremental(text, max_concurrency=1)
+        )
+
+        assert result.extraction_metadata["failed_segments"] == 1
+        assert len(manifest.segments) == 1
+
+
+class TestPrefilter:
+    """Test the local pre-filter stage."""
+
+    boilerplate = (
+        "Permission is hereby granted, free of charge, to any person obtaining a copy "
+        "of this software, to deal in the software without restriction."
+    )
+
+    def test_scores_entity_rich_text_above_boilerplate(self):
+        """Test that names, dates and gazetteer places raise the score."""
+        prefilter = SegmentPrefilter(gazetteer=["Bern", "New York"])
+
+        assert prefilter.score(self.boilerplate) < prefilter.threshold
+        assert prefilter.score("Albert Einstein moved to Bern in 1902.") >= 3.0
+        assert prefilter.score("he later sailed for new york.") == 1.0
+        assert prefilter.score("The weather was fine.") == 0.0
+
+    def test_rejected_segments_skip_the_model(self):
+        """Test that rejected chunks are not sent and are counted as saved calls."""
+        agent = FakeAgent()
+        extractor = make_extractor(agent, prefilter=SegmentPrefilter())
+        text = "\n\n".join(
+            [self.boilerplate * 3, "Albert Einstein was born in Ulm in 1879."] * 2
+        )
+
+        result = asyncio.run(
+            extractor.extract_from_long_text(text, max_chunk_chars=400, chunk_overlap=0)
+        )
+
+        assert result.extraction_metadata["chunks"] == 4
+        assert result.extraction_metadata["skipped_chunks"] == 2
+        assert len(agent.prompts) == 2
+        assert extractor.prefilter.stats() == {
+            "checked": 4,
+            "skipped": 2,
+            "sent": 2,
+            "skip_rate": 0.5,
+        }
+
+
+class TestSourceOffsets:
+    """Test source spans in place of duplicated snippets."""
+
+    def test_anchor_resolves_to_enclosing_sentence(self):
+        """Test exact and whitespace/case-insensitive anchor matches."""
+        text = "Einstein was born in Ulm.  He moved to\nBern in 1902. He died in 1955."
+        resolver = AnchorResolver(text)
+
+        start, end = resolver.resolve("born in Ulm")
+        assert text[start:end] == "Einstein was born in Ulm."
+        start, end = resolver.resolve("moved to bern")
+        assert text[start:end] == "He moved to\nBern in 1902."
+        assert resolver.resolve("Princeton") is None
+
+    def test_chunked_spans_point_into_shared_document(self):
+        """Test that chunk-local spans are rebased onto the whole document."""
+        extractor = make_extractor(FakeAgent(), source_offsets=True)
+        text = make_document()
+
+        result = asyncio.run(
+            extractor.extract_from_long_text(
+                text, max_chunk_chars=1000, chunk_overlap=400
+            )
+        )
+
+        assert result.source_document == text
+        assert "3 to 8 consecutive words" in extractor._create_extraction_prompt(text)
+        for item in (*result.entities, *result.relationships):
+            assert item.source_text is None
+        einstein = result.entities[0]
+        assert "Albert Einstein" in result.source_text_of(einstein)
+        assert einstein.source_span[0] == text.index("Albert Einstein")
+
+    def test_incremental_spans_follow_moved_paragraphs(self):
+        """Test that carried-over spans are moved with their paragraph."""
+        extractor = InformationExtractor(backend=StubBackend(), source_offsets=True)
+        paragraphs = TestIncrementalExtraction.paragraphs
+        first, manifest = asyncio.run(
+            extractor.extract_incremental("\n\n".join(paragraphs))
+        )
+
+        edited = "\n\n".join(["Lise Meitner fled to Stockholm in 1938."] + paragraphs)
+        second, _ = asyncio.run(
+            extractor.extract_incremental(edited, previous=first, manifest=manifest)
+        )
+
+        for entity in second.entities:
+            assert entity.label.split()[-1] in second.source_text_of(entity)
+
+
+class CapacityAgent(FakeAgent):
+    """Fake agent answering 429 whenever more than ``capacity`` calls are in flight."""
+
+    def __init__(self, capacity: int, delay: float = 0.005):
+        super().__init__(delay=delay)
+        self.capacity = capacity
+
+    async def run(self, prompt: str, output_type=None):
+        if self.in_flight >= self.capacity:
+            raise ModelHTTPError(429, "fake-model")
+        return await super().run(prompt, output_type)
+
+
+class TestAdaptiveConcurrency:
+    """Test the AIMD concurrency limiter."""
+
+    def test_limit_grows_while_calls_succeed(self):
+        """Test additive increase under stable latency."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=8)
+        extractor = make_extractor(FakeAgent(delay=0.001), concurrency_limiter=limiter)
+
+        asyncio.run(
+            collect(
+                extractor.extract_many(
+                    ["text"] * 100, max_concurrency=8, deduplicate=False
+                )
+            )
+        )
+
+        metrics = limiter.metrics()
+        assert metrics["limit"] == 8
+        assert metrics["successes"] == 100
+        assert metrics["in_flight"] == 0
+        assert metrics["error_rate"] == 0.0
+
+    def test_limit_backs_off_on_rate_limits(self):
+        """Test multiplicative decrease when the provider answers 429."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=16, max_limit=32)
+        agent = CapacityAgent(capacity=4)
+        extractor = make_extractor(agent, concurrency_limiter=limiter)
+
+        results = asyncio.run(
+            collect(
+                extractor.extract_many(
+                    ["text"] * 60,
+                    max_concurrency=32,
+                    retry_policy=RetryPolicy(
+                        max_retries=20, base_delay=0.001, max_delay=0.01
+                    ),
+                    deduplicate=False,
+                )
+            )
+        )
+
+        metrics = limiter.metrics()
+        assert all(
+            r.extraction_metadata["extraction_method"] == "llm_structured"
+            for _, r in results
+        )
+        assert metrics["overloads"] > 0
+        assert metrics["limit"] <= 8
+        assert agent.max_in_flight <= 4
+
+    def test_rejects_invalid_limits(self):
+        """Test parameter validation."""
+        with pytest.raises(ValueError):
+            AdaptiveConcurrencyLimiter(initial_limit=10, max_limit=5)
+
+
+class TestPromptPacking:
+    """Test packing of several short documents into one call."""
+
+    cards = [
+        f"Catalogue card {i}: portrait of Albert Einstein, Ulm." for i in range(10)
+    ]
+
+    def test_pack_documents_respects_budget_and_order(self):
+        """Test greedy batching by token budget and document count."""
+        texts = ["x" * 400, "x" * 400, "x" * 400, "x" * 4000, "x" * 40]
+
+        assert pack_documents(texts, max_tokens=250, max_documents=10) == [
+            [0, 1],
+            [2],
+            [3],
+            [4],
+        ]
+        assert pack_documents(texts, max_tokens=10_000, max_documents=2) == [
+            [0, 1],
+            [2, 3],
+            [4],
+        ]
+
+    def test_packed_results_are_split_per_document(self):
+        """Test that one call serves several documents, in input order."""
+        agent = FakeAgent()
+        extractor = make_extractor(agent)
+
+        results = asyncio.run(
+            extractor.extract_packed(self.cards, max_batch_documents=4)
+        )
+
+        assert len(agent.prompts) == 3
+        assert len(results) == 10
+        assert [r.extraction_metadata["packed_documents"] for r in results] == [
+            4
+        ] * 8 + [2] * 2
+        for card, result in zip(self.cards, results, strict=True):
+            assert (
+                result.extraction_metadata["extraction_method"]
+                == "llm_structured_packed"
+            )
+            assert result.entities[0].source_text == card[:40]
+
+    def test_stub_backend_and_cache_support_packing(self):
+        """Test packed output from the stub backend and replay from the cache."""
+        cache = ExtractionCache(":memory:")
+        extractor = InformationExtractor(backend=StubBackend(), cache=cache)
+        cards = ["Marie Curie lived in Paris.", "Niels Bohr lived in Copenhagen."]
+
+        first = asyncio.run(extractor.extract_packed(cards))
+        second = asyncio.run(extractor.extract_packed(cards))
+
+        assert [e.label for e in first[1].entities] == ["Niels Bohr", "Copenhagen"]
+        assert second[0].extraction_metadata["cache_hit"] is True
+        assert [e.label for e in second[0].entities] == ["Marie Curie", "Paris"]
+
+
+class ConfidenceBackend(StubBackend):
+    """Stub backend reporting low confidence for prompts containing a marker."""
+
+    def __init__(self, marker: str, model_name: str):
+        super().__init__(model_name=model_name)
+        self.marker = marker
+        self.calls = 0
+
+    async def run(self, prompt: str, output_type=CIDOCExtractionResult):
+        self.calls += 1
+        output = await super().run(prompt, output_type)
+        if self.marker in prompt:
+            output.extraction_confidence = 0.3
+        return output
+
+
+class TestCascadeBackend:
+    """Test two-tier cascaded extraction."""
+
+    def test_only_uncertain_chunks_escalate(self):
+        """Test that confident chunks stay on the cheap model."""
+        cheap = ConfidenceBackend(marker="illegible", model_name="cheap")
+        strong = ConfidenceBackend(marker="never", model_name="strong")
+        backend = CascadeBackend(cheap, strong, min_confidence=0.5)
+        extractor = InformationExtractor(backend=backend)
+        paragraphs = [
+            "Albert Einstein moved to Bern in 1902.",
+            "An illegible note mentions Marie Curie in 1903.",
+            "Niels Bohr lectured in Copenhagen in 1922.",
+            "Lise Meitner fled to Stockholm in 1938.",
+        ]
+
+        result = asyncio.run(
+            extractor.extract_from_long_text(
+                "\n\n".join(paragraphs), max_chunk_chars=60, chunk_overlap=0
+            )
+        )
+
+        assert result.extraction_metadata["chunks"] == 4
+        assert result.extraction_metadata["model"] == "cheap>strong"
+        assert cheap.calls == 4
+        assert strong.calls == 1
+        assert backend.stats() == {
+            "calls": 4,
+            "escalations": 1,
+            "escalation_rate": 0.25,
+        }
+
+    def test_low_entity_confidence_and_errors_escalate(self):
+        """Test escalation on uncertain entities and on primary failures."""
+        backend = CascadeBackend(
+            StubBackend(), StubBackend(), min_entity_confidence=0.75
+        )
+        output = StubBackend().generate("Albert Einstein was born in Ulm.")
+
+        # The stub rates places at 0.7
+        assert backend.needs_escalation(output)
+
+        failing = CascadeBackend(ReplayBackend("/nonexistent"), StubBackend())
+        extractor = InformationExtractor(backend=failing)
+        result = asyncio.run(
+            extractor.extract_from_text("Albert Einstein was born in Ulm.")
+        )
+
+        assert result.extraction_metadata["extraction_method"] == "llm_structured"
+        assert failing.stats()["escalations"] == 1
+
+
+def raw_item(kind: str, label: str, **overrides):
+    """Raw LLM output item as a dict."""
+    items = {
+        "person": {
+            "label": label,
+            "description": "Person",
+            "confidence": 0.9,
+            "source_text": label,
+        },
+        "place": {
+            "label": label,
+            "description": "Place",
+            "place_type": "City",
+            "confidence": 0.8,
+            "source_text": label,
+        },
+    }
+    return {**items[kind], **overrides}
+
+
+def raw_relationship(source: str, target: str, code: str):
+    """Raw LLM relationship as a dict."""
+    return {
+        "source_label": source,
+        "target_label": target,
+        "property_code": code,
+        "property_label": "was born in",
+        "description": "Birthplace",
+        "confidence": 0.9,
+        "source_text": source,
+    }
+
+
+class ScriptedBackend(ExtractionBackend):
+    """Backend returning predefined raw outputs in order."""
+
+    model_name = "scripted"
+
+    def __init__(self, *outputs):
+        self.outputs = list(outputs)
+        self.prompts = []
+
+    async def run(self, prompt: str, output_type=CIDOCExtractionResult):
+        self.prompts.append(prompt)
+        return output_type.model_validate(self.outputs.pop(0))
+
+
+class TestLenientParsing:
+    """Test partial acceptance of structured output."""
+
+    first_answer = {
+        "persons": [
+            raw_item("person", "Albert Einstein"),
+            raw_item("person", "Mileva", confidence=7),
+        ],
+        "places": [raw_item("place", "Ulm")],
+        "relationships": [
+            raw_relationship("Albert Einstein", "Ulm", "P98"),
+            raw_relationship("Albert Einstein", "Ulm", "born_in"),
+        ],
+        "extraction_confidence": 0.8,
+        "total_entities": 3,
+        "total_relationships": 2,
+    }
+
+    def test_parse_keeps_valid_items(self):
+        """Test that invalid items are rejected individually."""
+        raw = LenientCIDOCExtractionResult.model_validate(self.first_answer)
+
+        result, rejected = parse_lenient(raw)
+
+        assert [p.label for p in result.persons] == ["Albert Einstein"]
+        assert result.total_entities == 2
+        assert result.total_relationships == 1
+        assert [(r.field, r.index) for r in rejected] == [
+            ("persons", 1),
+            ("relationships", 1),
+        ]
+        assert "Property code must start with P" in rejected[1].errors[0]
+
+    def test_strict_mode_discards_everything(self):
+        """Test the default behaviour for comparison."""
+        extractor = InformationExtractor(backend=ScriptedBackend(self.first_answer))
+
+        result = asyncio.run(
+            extractor.extract_from_text("Albert Einstein was born in Ulm.")
+        )
+
+        assert result.extraction_metadata["extraction_method"] == "llm_failed"
+
+    def test_lenient_extraction_reasks_only_rejected_items(self):
+        """Test that the re-ask prompt lists only the failed items and recovers them."""
+        correction = {
+            "persons": [raw_item("person", "Mileva", confidence=0.7)],
+            "relationships": [raw_relationship("Albert Einstein", "Ulm", "P98")],
+        }
+        backend = ScriptedBackend(self.first_answer, correction)
+        extractor = InformationExtractor(
+            backend=backend, lenient=True, reask_rejected=True
+        )
+
+        result = asyncio.run(
+            extractor.extract_from_text("Albert Einstein was born in Ulm.")
+        )
+
+        metadata = result.extraction_metadata
+        assert len(backend.prompts) == 2
+        assert "born_in" in backend.prompts[1]
+        listing = backend.prompts[1].split("Rejected items:")[1]
+        assert '"label": "Mileva"' in listing
+        assert '"label": "Albert Einstein"' not in listing
+        assert len(metadata["rejected_items"]) == 2
+        # The corrected relationship duplicates the valid one and is not added twice
+        assert metadata["recovered_items"] == 1
+        assert sorted(e.label for e in result.entities) == [
+            "Albert Einstein",
+            "Mileva",
+            "Ulm",
+        ]
+        assert len(result.relationships) == 1
+
+    def test_lenient_output_under_cascade(self):
+        """Test that cascades judge lenient output by its valid items."""
+        uncertain = {**self.first_answer, "extraction_confidence": None}
+        backend = CascadeBackend(
+            ScriptedBackend(uncertain), StubBackend(), min_entity_confidence=0.85
+        )
+        extractor = InformationExtractor(backend=backend, lenient=True)
+
+        result = asyncio.run(
+            extractor.extract_from_text("Albert Einstein was born in Ulm.")
+        )
+
+        # Ulm is kept at 0.8, so the call escalates to the stub
+        assert result.extraction_metadata["extraction_method"] == "llm_structured"
+        assert backend.stats()["escalations"] == 1
+
+        confident = CascadeBackend(ScriptedBackend(self.first_answer), StubBackend())
+        extractor = InformationExtractor(backend=confident, lenient=True)
+        result = asyncio.run(
+            extractor.extract_from_text("Albert Einstein was born in Ulm.")
+        )
+
+        assert confident.stats()["escalations"] == 0
+        assert sorted(e.label for e in result.entities) == ["Albert Einstein", "Ulm"]
+
+
+class LatencyBackend(StubBackend):
+    """Stub backend whose n-th call takes ``latencies[n]`` seconds."""
+
+    def __init__(self, latencies):
+        super().__init__()
+        self.latencies = list(latencies)
+        self.started = 0
+        self.cancelled = 0
+
+    async def run(self, prompt: str, output_type=CIDOCExtractionResult):
+        delay = self.latencies[self.started % len(self.latencies)]
+        self.started += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return await super().run(prompt, output_type)
+
+
+class TestHedgedBackend:
+    """Test hedged requests."""
+
+    def test_slow_call_is_hedged_and_loser_cancelled(self):
+        """Test that a call slower than the observed p95 is duplicated."""
+        # 20 fast calls to learn the latency, then one slow call whose hedge is fast
+        inner = LatencyBackend([0.01] * 20 + [2.0, 0.01])
+        backend = HedgedBackend(inner, min_samples=20, max_extra_load=0.5)
+        extractor = InformationExtractor(backend=backend)
+
+        async def run():
+            for _ in range(20):
+                await extractor.extract_from_text("Albert Einstein was born in Ulm.")
+            start = asyncio.get_running_loop().time()
+            result = await extractor.extract_from_text(
+                "Albert Einstein was born in Ulm."
+            )
+            return result, asyncio.get_running_loop().time() - start
+
+        result, elapsed = asyncio.run(run())
+
+        assert result.extraction_metadata["extraction_method"] == "llm_structured"
+        assert elapsed < 0.5
+        assert inner.cancelled == 1
+        stats = backend.stats()
+        assert stats["hedges"] == 1
+        assert stats["hedge_wins"] == 1
+
+    def test_extra_load_is_capped(self):
+        """Test that hedging stops once the extra-load budget is spent."""
+        inner = LatencyBackend([0.01] * 5 + [0.05])
+        backend = HedgedBackend(inner, min_samples=5, max_extra_load=0.1)
+
+        async def run():
+            for _ in range(30):
+                await backend.run("Text: Albert Einstein\n\nExtract the following")
+
+        asyncio.run(run())
+
+        assert backend.stats()["hedges"] <= 3
+        assert inner.started <= 33
+
+
+class DownBackend(StubBackend):
+    """Stub backend whose calls all fail with an HTTP status code."""
+
+    def __init__(self, status_code: int):
+        super().__init__()
+        self.status_code = status_code
+        self.calls = 0
+
+    async def run(self, prompt: str, output_type=CIDOCExtractionResult):
+        self.calls += 1
+        raise ModelHTTPError(self.status_code, "fake-model")
+
+
+class TestPoolBackend:
+    """Test load balancing and failover across pooled endpoints."""
+
+    PROMPT = "Text: Albert Einstein was born in Ulm.\n\nExtract the following"
+
+    def test_routes_to_faster_member(self):
+        """Test that most calls go to the member with lower latency."""
+        slow, fast = LatencyBackend([0.05]), LatencyBackend([0.005])
+        backend = PoolBackend([slow, fast])
+
+        async def run():
+            for _ in range(20):
+                await backend.run(self.PROMPT)
+
+        asyncio.run(run())
+
+        assert fast.started >= 15
+        assert slow.started >= 1
+        assert backend.stats()["calls"] == 20
+
+    def test_failing_member_is_ejected_and_calls_fail_over(self):
+        """Test that failed calls are retried elsewhere and bad members leave rotation."""
+        overloaded, broken, healthy = DownBackend(429), DownBackend(500), StubBackend()
+        backend = PoolBackend([overloaded, broken, healthy], failure_threshold=2)
+        extractor = InformationExtractor(backend=backend)
+
+        async def run():
+            return [
+                await extractor.extract_from_text("Albert Einstein was born in Ulm.")
+                for _ in range(10)
+            ]
+
+        results = asyncio.run(run())
+
+        assert all(
+            r.extraction_metadata["extraction_method"] == "llm_structured"
+            for r in results
+        )
+        # Rate limited once, failing twice in a row, then out of rotation
+        assert overloaded.calls == 1
+        assert broken.calls == 2
+        stats = backend.stats()
+        assert stats["failovers"] == 3
+        assert [m["healthy"] for m in stats["members"]] == [False, False, True]
+
+    def test_permanent_errors_do_not_fail_over(self):
+        """Test that a bad request is raised instead of tried on every member."""
+        first, second = DownBackend(400), DownBackend(400)
+        backend = PoolBackend([first, second])
+
+        with pytest.raises(ModelHTTPError):
+            asyncio.run(backend.run(self.PROMPT))
+        assert first.calls + second.calls == 1
+
+    def test_quota_limits_member_share(self):
+        """Test that a member is not used beyond its per-minute quota."""
+        limited, unlimited = LatencyBackend([0.0]), LatencyBackend([0.01])
+        backend = PoolBackend([PoolMember(limited, requests_per_minute=3), unlimited])
+
+        async def run():
+            await asyncio.gather(*(backend.run(self.PROMPT) for _ in range(12)))
+
+        asyncio.run(run())
+
+        assert limited.started == 3
+        assert unlimited.started == 9
+        assert backend.stats()["members"][0]["remaining_quota"] == 0
+
+    def test_cli_uses_first_pooled_key_without_pool(self, monkeypatch):
+        """Test that GOOGLE_API_KEYS alone is enough for a single-key extractor."""
+        monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+        monkeypatch.setenv("GOOGLE_API_KEYS", "key-a, key-b")
+        parser = argparse.ArgumentParser()
+        add_backend_arguments(parser)
+
+        extractor = create_extractor(parser.parse_args([]))
+
+        assert extractor.api_key == "key-a"
+
+
+class TestExtractionJob:
+    """Test checkpointed, resumable extraction jobs."""
+
+    def test_resume_skips_completed_and_retries_failed(self, tmp_path):
+        """Test that a second run only redoes failed documents."""
+        documents = [f"Document {i} about Albert Einstein." for i in range(6)]
+        agent = FakeAgent(failures=2, status_code=400)
+        job = ExtractionJob(make_extractor(agent), tmp_path / "job", max_concurrency=1)
+
+        first = asyncio.run(job.run(documents))
+
+        assert (first.status, first.completed, first.failed) == (
+            "completed_with_failures",
+            4,
+            2,
+        )
+        assert len(job.completed_keys()) == 4
+
+        agent.prompts.clear()
+        second = asyncio.run(job.run(documents))
+
+        assert len(agent.prompts) == 2
+        assert (second.completed, second.failed, second.resumed) == (6, 0, 4)
+        assert len(dict(job.results())) == 6
+        assert job.load_manifest().status == "completed"
+
+    def test_stop_finishes_in_flight_and_resumes(self, tmp_path):
+        """Test graceful shutdown and tolerance of a truncated last line."""
+        documents = [f"Document {i} about Albert Einstein." for i in range(10)]
+        agent = FakeAgent(delay=0.01)
+        job = ExtractionJob(make_extractor(agent), tmp_path / "job", max_concurrency=2)
+        original_run = agent.run
+
+        async def stopping_run(prompt, output_type=None):
+            if len(agent.prompts) == 3:
+                job.stop()
+            return await original_run(prompt, output_type)
+
+        agent.run = stopping_run
+        manifest = asyncio.run(job.run(documents))
+
+        assert manifest.status == "interrupted"
+        assert manifest.completed == len(agent.prompts) == 4
+
+        with job.results_path.open("a") as f:
+            f.write('{"key": "text:trunc')
+        agent.run = original_run
+        manifest = asyncio.run(job.run(documents))
+
+        assert manifest.status == "completed"
+        assert manifest.resumed == 4
+        assert len(agent.prompts) == 10
+
+
+class TestUsageAccounting:
+    """Test token and latency accounting and budget scheduling."""
+
+    def test_job_usage_counts_duplicates_once(self, tmp_path):
+        """Test that coalesced duplicates add no usage to a job's manifest."""
+        agent = FakeAgent()
+        job = ExtractionJob(make_extractor(agent), tmp_path / "job")
+        documents = ["Albert Einstein."] * 3 + ["Marie Curie."]
+
+        manifest = asyncio.run(job.run(documents))
+
+        assert manifest.completed == 4
+        assert manifest.usage.requests == len(agent.prompts) == 2
+
+    def test_usage_is_recorded_per_result_and_aggregated(self):
+        """Test that reported tokens reach results, merged results and the extractor total."""
+        agent = FakeAgent(failures=1, status_code=429)
+        extractor = make_extractor(agent)
+        policy = RetryPolicy(max_retries=1, base_delay=0.001)
+
+        async def run():
+            with track_usage() as outer:
+                retried = await collect(
+                    extractor.extract_many(["Einstein."], retry_policy=policy)
+                )
+                long = await extractor.extract_from_long_text(
+                    make_document(), max_chunk_chars=600
+                )
+            return retried[0][1], long, outer
+
+        retried, long, outer = asyncio.run(run())
+
+        # The failed attempt is counted with an estimate, the retry with reported tokens
+        usage = Usage.from_metadata(retried.extraction_metadata)
+        assert usage.requests == 2
+        assert usage.input_tokens > 100
+        assert usage.output_tokens == 20
+        assert usage.estimated
+        long_usage = Usage.from_metadata(long.extraction_metadata)
+        chunks = long.extraction_metadata["chunks"]
+        assert (long_usage.requests, long_usage.input_tokens) == (chunks, 100 * chunks)
+        assert long_usage.llm_seconds >= 0.0
+        assert outer.requests == extractor.usage.requests == 2 + chunks
+
+    def test_token_budget_extracts_most_valuable_documents_first(self):
+        """Test that a token budget covers the highest-scoring documents and skips the rest."""
+        documents = [
+            "Terms and conditions apply to all of the following text.",
+            "Albert Einstein met Niels Bohr in Copenhagen in 1920.",
+            "Marie Curie and Pierre Curie worked in Paris in 1898.",
+            "See the table of contents for further information.",
+        ]
+        extractor = InformationExtractor(backend=StubBackend())
+        scheduler = BudgetScheduler(extractor, max_concurrency=1)
+        scheduler.max_tokens = int(2.5 * sum(scheduler.predict_tokens(documents[0])))
+
+        results = asyncio.run(collect(scheduler.run(documents)))
+
+        assert sorted(index for index, _ in results) == [1, 2]
+        assert scheduler.skipped == [0, 3]
+        assert scheduler.usage.requests == 2
+        assert scheduler.estimate(documents)["documents"] == 4
+
+    def test_job_manifest_aggregates_usage_under_budget(self, tmp_path):
+        """Test that a budgeted job stops early and totals usage across runs."""
+        documents = [f"Albert Einstein lived in Bern in {1900 + i}." for i in range(4)]
+        extractor = InformationExtractor(backend=StubBackend())
+        cost = sum(BudgetScheduler(extractor).predict_tokens(documents[0]))
+        job = ExtractionJob(
+            extractor, tmp_path / "job", max_concurrency=1, max_tokens=int(1.5 * cost)
+        )
+
+        first = asyncio.run(job.run(documents))
+
+        assert (first.status, first.completed, first.over_budget) == (
+            "budget_exhausted",
+            1,
+            3,
+        )
+        assert first.usage.requests == 1
+        assert first.usage.estimated
+
+        second = asyncio.run(job.run(documents))
+
+        assert second.completed == 2
+        assert second.usage.requests == 2
+
+
+class TestMapReduceExtraction:
+    """Test the two-phase map/reduce extraction mode."""
+
+    def make_entities(self):
+        return [
+            PersonExtraction(label="Marie Curie", confidence=0.9),
+            PlaceExtraction(label="Paris", place_type="City", confidence=0.9),
+            PlaceExtraction(label="Warsaw", place_type="City", confidence=0.9),
+        ]
+
+    def test_context_prefers_sentences_with_more_entities(self):
+        """Test that context selection keeps multi-entity sentences within the budget."""
+        roster = EntityRoster(self.make_entities())
+        document = (
+            "Marie Curie was a physicist. Nothing relevant here. "
+            "Marie Curie left Warsaw for Paris. Paris is large."
+        )
+
+        context = select_context(document, roster, max_chars=60)
+
+        assert [document[start:end] for start, end in context] == [
+            "Marie Curie left Warsaw for Paris.",
+            "Paris is large.",
+        ]
+        assert roster.mentions("marie curie in PARIS") == [1, 2]
+
+    def test_linked_relationships_use_roster_ids(self):
+        """Test that reduce output is mapped to entity IDs and bad IDs are dropped."""
+        entities = self.make_entities()
+        roster = EntityRoster(entities)
+        linking = CIDOCLinkingResult(
+            relationships=[
+                CIDOCLinkedRelationship(
+                    source_id=source_id,
+                    target_id=target_id,
+                    property_code="P74",
+                    property_label="has current or former residence",
+                    description="",
+                    confidence=0.8,
+                    source_text="",
+                )
+                for source_id, target_id in [(1, 2), (1, 9), (2, 2)]
+            ]
+        )
+
+        relationships = resolve_linked_relationships(roster, linking)
+
+        assert [(r.source_id, r.target_id) for r in relationships] == [
+            (entities[0].id, entities[1].id)
+        ]
+
+    def test_reduce_links_entities_from_different_chunks(self):
+        """Test that the reduce pass adds relationships the chunks could not see."""
+        filler = "Filler text without names. " * 20
+        document = "\n\n".join(
+            [
+                f"Marie Curie studied physics. {filler}",
+                f"Pierre Curie lived in Paris. {filler}",
+                f"Much later she returned. {filler}",
+                "Marie Curie also lived in Paris.",
+            ]
+        )
+        extractor = InformationExtractor(backend=StubBackend())
+
+        chunked = asyncio.run(
+            extractor.extract_from_long_text(document, max_chunk_chars=600)
+        )
+        result = asyncio.run(
+            extractor.extract_map_reduce(document, max_chunk_chars=600)
+        )
+
+        labels = {e.id: e.label for e in result.entities}
+        pairs = {
+            (labels[r.source_id], r.property_code, labels[r.target_id])
+            for r in result.relationships
+        }
+        assert ("Marie Curie", "P74", "Paris") in pairs
+        metadata = result.extraction_metadata
+        assert metadata["extraction_method"] == "llm_map_reduce"
+        assert metadata["linked_relationships"] == len(result.relationships) - len(
+            chunked.relationships
+        )
+        assert metadata["usage"]["requests"] == metadata["chunks"] + 1
+
+    def test_reduce_under_cascade(self):
+        """Test that linking results pass through a cascade without escalation checks."""
+        document = "Marie Curie studied physics.\n\nMarie Curie also lived in Paris."
+        backend = CascadeBackend(StubBackend(), StubBackend(), min_confidence=0.0)
+        extractor = InformationExtractor(backend=backend)
+
+        result = asyncio.run(
+            extractor.extract_map_reduce(document, max_chunk_chars=40, chunk_overlap=0)
+        )
+
+        metadata = result.extraction_metadata
+        assert "reduce_error" not in metadata
+        assert metadata["extraction_method"] == "llm_map_reduce"
+        assert backend.stats()["escalations"] == 0
+
+
+class TestEntityLinking:
+    """Test the persistent entity linking index."""
+
+    def test_entities_keep_ids_across_runs(self, tmp_path):
+        """Test that an entity seen in an earlier run reuses its canonical ID."""
+        path = tmp_path / "links.sqlite"
+        first_extractor = InformationExtractor(
+            backend=StubBackend(), linking_index=EntityLinkingIndex(path)
+        )
+        first = asyncio.run(
+            first_extractor.extract_from_text("Albert Einstein was born in Ulm.")
+        )
+        first_extractor.linking_index.close()
+
+        index = EntityLinkingIndex(path)
+        extractor = InformationExtractor(backend=StubBackend(), linking_index=index)
+        second = asyncio.run(
+            extractor.extract_from_text("Albert Einstein moved to Bern.")
+        )
+
+        first_ids = {e.label: e.id for e in first.entities}
+        second_ids = {e.label: e.id for e in second.entities}
+        assert second_ids["Albert Einstein"] == first_ids["Albert Einstein"]
+        assert second_ids["Bern"] not in first_ids.values()
+        assert second.relationships[0].source_id == first_ids["Albert Einstein"]
+        assert index.stats()["linked"] == 1
+        assert len(index) == 3
+
+    def test_key_year_separates_namesakes(self):
+        """Test that a differing key year keeps entities with the same label apart."""
+        index = EntityLinkingIndex(":memory:")
+        elder = PersonExtraction(
+            label="John Smith", properties={"birth_date": "1900-01-01"}
+        )
+        younger = PersonExtraction(
+            label="john  smith", properties={"birth_date": "1950"}
+        )
+        undated = PersonExtraction(label="John Smith.")
+
+        index.link([elder, younger])
+        previous_id = undated.id
+        remap = index.link([undated])
+
+        assert elder.id != younger.id
+        assert undated.id == elder.id
+        assert remap == {previous_id: elder.id}
+        assert blocking_key("E21", "John  Smith.") == blocking_key("E21", "john smith")
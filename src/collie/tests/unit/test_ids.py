@@ -0,0 +1,69 @@
+"""
+Unit tests for deterministic ID minting.
+"""
+
+from uuid import uuid4, uuid5
+
+import pytest
+
+from ...models.base import CRMEntity, CRMRelation, E22_HumanMadeObject
+from ...models.generated.e_classes import EE12_Production
+from ...models.ids import (
+    DEFAULT_NAMESPACE,
+    IdMinter,
+    configure_ids,
+    get_minter,
+    mint_id,
+)
+
+
+class TestIdMinting:
+    """Test string identifier conversion."""
+
+    def test_legacy_ids_are_consistent_across_models(self):
+        """Test that entities, relations and shortcut fields agree on string IDs."""
+        vase = E22_HumanMadeObject(id="obj_001", produced_by="prod_001")
+        production = EE12_Production(id="prod_001", class_code="E12")
+        relation = CRMRelation(src="prod_001", type="P108", tgt="obj_001")
+
+        assert vase.id == mint_id("obj_001") == uuid5(DEFAULT_NAMESPACE, "obj_001")
+        assert vase.id.version == 5
+        assert vase.produced_by == production.id == relation.src
+        assert relation.tgt == vase.id
+
+    def test_uuid_strings_and_objects_pass_through(self):
+        """Test that real UUIDs are not re-minted."""
+        value = uuid4()
+
+        assert CRMEntity(id=str(value), class_code="E1").id == value
+        assert CRMRelation(src=value, type="P1", tgt=str(value)).tgt == value
+
+    def test_conversions_are_cached(self):
+        """Test that repeated identifiers hit the LRU cache."""
+        minter = IdMinter(cache_size=2)
+
+        for _ in range(3):
+            minter.coerce("obj_001")
+        minter.coerce("obj_002")
+        minter.coerce("obj_003")
+
+        info = minter.cache_info()
+        assert info.hits == 2
+        assert info.currsize == 2
+
+    def test_configurable_namespace(self):
+        """Test that the namespace of minted IDs can be changed."""
+        namespace = uuid4()
+        try:
+            configure_ids(str(namespace))
+            assert CRMEntity(id="obj_001", class_code="E1").id == uuid5(
+                namespace, "obj_001"
+            )
+            assert get_minter().cache_info().currsize == 1
+        finally:
+            configure_ids()
+
+        assert CRMEntity(id="obj_001", class_code="E1").id == mint_id("obj_001")
+        with pytest.raises(ValueError):
+            configure_ids("not-a-namespace")
+        assert get_minter().namespace == DEFAULT_NAMESPACE
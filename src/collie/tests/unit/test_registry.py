@@ -0,0 +1,144 @@
+"""
+Unit tests for the class-code model registry.
+"""
+
+from uuid import UUID, uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from ...models.base import SCHEMA_VERSION, CRMEntity, CRMRelation, E22_HumanMadeObject
+from ...models.generated.e_classes import (
+    EE5_Event,
+    EE21_Person,
+    EE22_HumanMadeObject,
+)
+from ...models.registry import ModelRegistry, build_registry, model_for, parse_entities
+from ...models.trusted import (
+    construct_entities,
+    construct_relations,
+    dump_snapshot,
+    load_snapshot,
+)
+
+
+class TestModelRegistry:
+    """Test class-code dispatch."""
+
+    def test_generated_classes_registered(self):
+        """Test that every generated class is found by its code."""
+        registry = build_registry()
+
+        assert len(registry) == 99
+        assert model_for("E22") is EE22_HumanMadeObject
+        assert model_for("E999") is CRMEntity
+        assert build_registry(prefer_wrappers=True).get("E22") is E22_HumanMadeObject
+
+    def test_register_requires_class_code(self):
+        """Test that only models with a default class code can be registered."""
+        registry = ModelRegistry()
+
+        with pytest.raises(ValueError):
+            registry.register(CRMEntity)
+        assert registry.register(EE21_Person) is EE21_Person
+        assert "E21" in registry
+
+
+class TestParseEntities:
+    """Test bulk typed deserialization."""
+
+    def test_records_get_their_classes_in_order(self):
+        """Test dispatch across interleaved runs of classes."""
+        event_id = uuid4()
+        records = [
+            {"class_code": "E22", "label": "Vase"},
+            {"class_code": "E22", "label": "Bowl"},
+            {"class_code": "E5", "label": "Flood", "id": str(event_id)},
+            {"class_code": "E22", "label": "Cup"},
+            {"class_code": "X1", "label": "Unknown"},
+        ]
+
+        entities = parse_entities(records)
+
+        assert [type(e) for e in entities] == [
+            EE22_HumanMadeObject,
+            EE22_HumanMadeObject,
+            EE5_Event,
+            EE22_HumanMadeObject,
+            CRMEntity,
+        ]
+        assert [e.label for e in entities] == [
+            "Vase",
+            "Bowl",
+            "Flood",
+            "Cup",
+            "Unknown",
+        ]
+        assert entities[2].id == event_id
+
+    def test_round_trip_canonical_json(self):
+        """Test loading entities back from model_dump output."""
+        original = [
+            EE21_Person(label="Ada Lovelace", type=["E55:Mathematician"]),
+            EE22_HumanMadeObject(label="Analytical Engine", produced_by=uuid4()),
+        ]
+
+        loaded = parse_entities(e.model_dump(mode="json") for e in original)
+
+        assert loaded == original
+
+    def test_invalid_record_raises(self):
+        """Test that validation errors surface."""
+        with pytest.raises(ValidationError):
+            parse_entities([{"class_code": "E22", "type": "not-a-list"}])
+
+
+class TestTrustedConstruction:
+    """Test construction of trusted records without validation."""
+
+    def test_snapshot_round_trip(self):
+        """Test that constructed models equal the originals."""
+        vase = EE22_HumanMadeObject(
+            label="Vase", type=["E55:Vessel"], produced_by=uuid4()
+        )
+        person = EE21_Person(label="Potter")
+        relation = CRMRelation(
+            src=vase.id, type="P108", tgt=uuid4(), props={"role": "maker"}
+        )
+
+        entities, relations = load_snapshot(dump_snapshot([vase, person], [relation]))
+
+        assert entities == [vase, person]
+        assert isinstance(entities[0].produced_by, UUID)
+        assert relations == [relation]
+        assert load_snapshot(dump_snapshot([vase]), trusted=False)[0] == [vase]
+
+    def test_missing_and_extra_fields(self):
+        """Test that defaults are filled and unknown keys dropped."""
+        (entity,) = construct_entities(
+            [{"class_code": "E21", "label": "Ada", "legacy": 1}]
+        )
+
+        assert isinstance(entity, EE21_Person)
+        assert isinstance(entity.id, UUID)
+        assert entity.type == []
+        assert entity.model_fields_set == {"class_code", "label"}
+        assert not hasattr(entity, "legacy")
+
+    def test_schema_version_mismatch(self):
+        """Test that records of another schema version are refused."""
+        snapshot = dump_snapshot([EE21_Person(label="Ada")])
+        snapshot["schema_version"] = SCHEMA_VERSION + 1
+
+        with pytest.raises(ValueError, match="schema version"):
+            load_snapshot(snapshot)
+        with pytest.raises(ValueError, match="schema version"):
+            construct_relations([], schema_version=None)
+
+    def test_sampling_catches_bad_records(self):
+        """Test that sampled validation rejects records that are not trusted output."""
+        records = [{"class_code": "E22", "label": "Vase", "type": "not-a-list"}]
+
+        assert construct_entities(records)[0].type == "not-a-list"
+        with pytest.raises(ValidationError):
+            construct_entities(records, sample_rate=1.0)
@@ -0,0 +1,132 @@
+"""
+Unit tests for offline entity resolution.
+"""
+
+from uuid import uuid4
+
+from ...models.base import CRMEntity, CRMRelation
+from ...resolution import EntityResolver, candidate_pairs, entity_keys, normalize_label
+
+
+def person(label, notes=None, **kwargs):
+    return CRMEntity(class_code="E21", label=label, notes=notes, **kwargs)
+
+
+class TestBlocking:
+    """Test candidate pair generation."""
+
+    def test_normalize_label(self):
+        """Test case, accent and punctuation normalization."""
+        assert normalize_label("  Émile  ZOLA, ") == "emile zola"
+
+    def test_pairs_respect_class_and_date_buckets(self):
+        """Test that blocking never pairs across classes or distant dates."""
+        entities = [
+            person("Albert Einstein"),
+            person("Einstein, Albert"),
+            CRMEntity(class_code="E53", label="Albert Einstein"),
+            person("John Smith", notes="Born 1820"),
+            person("John Smith", notes="Born 1950"),
+        ]
+        pairs = list(candidate_pairs(entity_keys(entities)))
+
+        assert (0, 1) in pairs
+        assert (0, 2) not in pairs and (1, 2) not in pairs
+        assert (3, 4) not in pairs
+
+    def test_window_bounds_comparisons(self):
+        """Test that the number of pairs grows linearly with the entities."""
+        entities = [person(f"Person {i:05d}") for i in range(1000)]
+        pairs = list(candidate_pairs(entity_keys(entities), window=5))
+
+        assert len(pairs) <= 2 * 4 * len(entities)
+
+    def test_pairs_are_distinct_and_complete(self):
+        """Test that both passes together yield every windowed pair exactly once."""
+        names = [
+            "Anna Berg",
+            "Berg, Anna",
+            "Carl Dahl",
+            "Dahl Carl",
+            "Eva Berg",
+            "Anna Dahl",
+        ]
+        entities = [person(f"{names[i % 6]} {i % 4}") for i in range(48)]
+        keys = entity_keys(entities)
+
+        pairs = list(candidate_pairs(keys, window=3))
+
+        expected = set()
+        for field in ("label", "tokens"):
+            ordered = sorted(keys, key=lambda k: getattr(k, field))
+            for position, a in enumerate(ordered):
+                for b in ordered[position + 1 : position + 3]:
+                    expected.add((min(a.index, b.index), max(a.index, b.index)))
+        assert len(pairs) == len(set(pairs))
+        assert set(pairs) == expected
+
+
+class TestEntityResolver:
+    """Test clustering and ID remapping."""
+
+    def test_resolve_and_apply(self):
+        """Test merging duplicates in entities and relations."""
+        einstein = person("Albert Einstein", type=["E55:Physicist"])
+        duplicate = person("Einstein, Albert", notes="Born 1879 in Ulm")
+        ulm = CRMEntity(class_code="E53", label="Ulm")
+        other = person("Marie Curie")
+        relations = [
+            CRMRelation(src=einstein.id, type="P74", tgt=ulm.id),
+            CRMRelation(src=duplicate.id, type="P74", tgt=ulm.id),
+            CRMRelation(src=duplicate.id, type="P130", tgt=einstein.id),
+            CRMRelation(src=other.id, type="P11", tgt=duplicate.id),
+        ]
+
+        result = EntityResolver(processes=1).resolve([einstein, ulm, duplicate, other])
+
+        assert result.clusters == [[einstein.id, duplicate.id]]
+        assert result.id_map == {duplicate.id: einstein.id}
+
+        entities = result.apply_to_entities([einstein, ulm, duplicate, other])
+        assert [e.id for e in entities] == [einstein.id, ulm.id, other.id]
+        assert entities[0].notes == "Born 1879 in Ulm"
+        assert entities[0].type == ["E55:Physicist"]
+
+        remapped = result.apply_to_relations(relations)
+        assert [(r.src, r.type, r.tgt) for r in remapped] == [
+            (einstein.id, "P74", ulm.id),
+            (other.id, "P11", einstein.id),
+        ]
+
+    def test_process_pool_matches_in_process(self, tmp_path):
+        """Test that parallel scoring gives the same clusters."""
+        entities = []
+        for i in range(30):
+            entities.append(person(f"Archivist {i:02d} Example"))
+            entities.append(person(f"Example, Archivist {i:02d}"))
+
+        serial = EntityResolver(processes=1).resolve(entities)
+        parallel = EntityResolver(processes=2, batch_size=10).resolve(entities)
+
+        assert len(serial.clusters) == 30
+        assert parallel.clusters == serial.clusters
+        assert parallel.id_map == serial.id_map
+
+        path = tmp_path / "id_map.csv"
+        parallel.write_id_map(path)
+        lines = path.read_text().splitlines()
+        assert lines[0] == "id,canonical_id"
+        assert len(lines) == 31
+
+    def test_distinct_entities_not_merged(self):
+        """Test that namesakes from different periods stay apart."""
+        entities = [
+            person("John Smith", notes="1820"),
+            person("John Smith", notes="1950"),
+            person(f"Unrelated {uuid4()}"),
+        ]
+
+        result = EntityResolver(processes=1).resolve(entities)
+
+        assert result.clusters == []
+        assert result.id_map == {}